@@ -1,15 +1,42 @@
+import time
+STARTUP_ORIGIN = time.perf_counter()  # 启动耗时统计的起点（--profile-startup）
 import tkinter as tk
 import tkinter.font as tkfont
-from tkinter import ttk, messagebox
-import time
+from tkinter import ttk, messagebox, filedialog, simpledialog
+import math
 import random
 import os
-import json
-import pygame
+import copy
+import argparse
+import multiprocessing
+import socket
 import threading
+from audio_engine import AudioEngine
+from audio_scheduler import AudioScheduler
+from config_store import ConfigStore, ConfigError, DEFAULT_CONFIG, merge_config, validate
+from metrics import Metrics
+from plan import plan_sounds
+from session_journal import SessionJournal
+from sound_library import SoundLibrary
+from startup_profile import StartupProfile
+# 首帧之后或只在控制接口、小组、统计、设置窗口中用到的模块（control_server、debug_panel、group_sync、
+# history_store、profiles、sound_list、stats_view）在使用时才导入，不计入启动时的导入耗时
+from timer_engine import CATCH_UP_GRACE, build_timeline
+from timer_lifecycle import TimerLifecycle
+IMPORTS_DONE = time.perf_counter()
+
+# 窗口可见时界面刷新间隔（毫秒）
+RENDER_INTERVAL_MS = 200
+# 本地控制接口命令的处理间隔（毫秒）
+CONTROL_POLL_MS = 20
+# 发起小组会话时推迟开始的秒数，留给成员取得会话
+GROUP_START_DELAY = 3.0
 
 class TimerApp:
-    def __init__(self, root):
+    def __init__(self, root, control_port=None, metrics=False, startup=None):
+        """先画出主窗口：混音器和音频库在后台初始化，历史记录、断点恢复和控制接口在首帧之后再启动"""
+        self.startup = startup or StartupProfile(STARTUP_ORIGIN)
+        self.startup.mark("导入模块", STARTUP_ORIGIN, IMPORTS_DONE)
         self.root = root
         self.root.title("多阶段随机提醒计时器 @ZhiqianYu")
         self.root.geometry("480x425")
@@ -21,25 +48,26 @@ class TimerApp:
         self.mid_font = tkfont.Font(family="Segoe UI", size=12)
         self.root.option_add("*Font", self.default_font)
 
-        # 初始化pygame用于音频播放
-        pygame.mixer.init()
-        self.audio_cache = {}  # 缓存音频对象
+        # 热路径指标（默认关闭，F12 打开调试面板）
+        self.metrics = Metrics(enabled=metrics)
+        self.render_due = None  # 下一次界面刷新的预定时间（perf_counter），仅在指标开启时记录
+
+        # 初始化音频引擎（低延迟混音器 + 预解码音频库），pygame 的导入和混音器初始化在后台进行
+        self.audio = AudioEngine()
+        self.audio.metrics = self.metrics
+        self.metrics.add_source("audio_cache", self.audio.cache.stats)
+        threading.Thread(target=self.audio.init_mixer, args=(self.startup,), daemon=True, name="audio-init").start()
+        # 时间线上的提示音提前交给专用音频线程，到截止时刻准时播放
+        self.audio_scheduler = AudioScheduler(self.audio, grace=CATCH_UP_GRACE)
 
         
         # 默认设置
-        self.config = {
-            "total_time": {"hours": 8, "minutes": 0, "seconds": 0},
-            "stage_time": {"hours": 1, "minutes": 30, "seconds": 0},
-            "random_reminder": {"min": 5, "max": 10},
-            "short_break": {"minutes": 0, "seconds": 10},
-            "stage_break": {"minutes": 10, "seconds": 20},
-            "sounds": {
-                "start": "",
-                "random": [],
-                "stage_break_start": "",
-                "total_end": ""
-            }
-        }
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+        self.config_store = ConfigStore("config.json")
+        self.config_store.on_error = lambda e: self.root.after(
+            0, lambda: messagebox.showerror("错误", f"保存配置文件失败: {str(e)}"))
+        self.profiles = None  # 配置方案在首帧之后读取
+        self.profile_var = tk.StringVar()
         
         # 初始化控件变量
         self.total_hours = tk.StringVar()
@@ -59,15 +87,91 @@ class TimerApp:
         # 初始化计时器状态
         self.timer_running = False
         self.paused = False
+        self.pause_started = None
+        self.lifecycle = TimerLifecycle()    # 计时线程的唯一拥有者，重置后旧线程不会再推进计时
+        self.timer_lock = threading.Lock()   # 保护截止时间，计时线程与界面线程共享
+        
+        # 界面刷新状态：所有控件只在 Tk 线程的 render 中更新
+        self.render_job = None
+        self.rendered = {}  # 控件上次显示的值，用于只更新有变化的控件
+        self.window_visible = True
         
         # 创建目录
         self.create_directories()
         
-        # 设置用户界面
-        self.setup_ui()
+        # 提示音库索引：后台扫描一次，之后增量监视文件变化
+        self.library = SoundLibrary()
+        self.library.add_listener(self.on_sound_files_changed)
+        self.library_started = time.perf_counter()
+        self.library.start()
+        
+        # 设置用户界面（提示音设置窗口在第一次打开时才创建）
+        with self.startup.phase("界面"):
+            self.setup_ui()
         
         # 加载配置
-        self.load_config()
+        with self.startup.phase("配置"):
+            self.load_config()
+        
+        # 后台预解码已配置的提示音
+        self.audio.cache.set_budget(self.config.get("audio_cache_mb", 64) * 1024 * 1024)
+        self.audio.set_target_db(self.config.get("audio_target_db", DEFAULT_CONFIG["audio_target_db"]))
+        self.audio.preload(self.config.get("sounds", {}))
+        
+        # 关闭窗口前写入尚未保存的配置
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # 最小化时暂停界面刷新，恢复时立即刷新
+        self.root.bind("<Unmap>", self.on_window_unmap)
+        self.root.bind("<Map>", self.on_window_map)
+        self.metrics_panel = None
+        self.root.bind("<F12>", lambda e: self.open_metrics_panel())
+        
+        self.history = None
+        self.session_id = None
+        self.journal = SessionJournal()
+        self.control = None
+        # 小组同步：本机作为协调者发布会话，或作为成员跟随协调者
+        self.group_coordinator = None
+        self.group_client = None
+        self.group_version = None  # 正在跟随的小组会话
+        self.session_config = None
+        self.session_seed = None
+        # 窗口画出后再读取配置方案、打开历史数据库、检查断点和启动控制接口
+        self.root.after_idle(lambda: self.root.after(0, self.finish_startup, control_port))
+
+    def finish_startup(self, control_port):
+        """首帧之后的启动步骤"""
+        self.startup.mark("首帧", STARTUP_ORIGIN)
+
+        with self.startup.phase("配置方案"):
+            self.load_profiles()
+
+        # 会话历史（后台批量写入）
+        with self.startup.phase("历史记录"):
+            self.open_history()
+
+        # 本地控制接口（仅在指定端口时启动）
+        if control_port:
+            self.start_control_server(control_port)
+
+        # 检查上次是否有未完成的计时
+        self.offer_resume()
+
+    def open_history(self):
+        """打开会话历史数据库：首帧之后打开，在此之前就开始计时或打开统计页时提前打开"""
+        if self.history is None:
+            from history_store import HistoryStore
+            self.history = HistoryStore()
+            self.history.start()
+        return self.history
+
+    def print_startup_report(self):
+        """后台线程：等混音器和音频库都就绪后打印启动耗时报告"""
+        self.audio.ready.wait()
+        self.library.ready.wait()
+        self.startup.mark("音频库扫描", self.library_started, self.library.ready_at)
+        print(self.startup.report())
     
     def create_directories(self):
         """创建音频文件夹"""
@@ -80,55 +184,220 @@ class TimerApp:
             os.makedirs(os.path.join("notification", directory), exist_ok=True)
     
     def load_config(self):
-        """加载配置文件"""
+        """加载配置文件（自动迁移旧版本并校验）"""
         try:
-            CONFIG_FILE = "config.json"  # Define the configuration file path
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    self.config = json.load(f)
-        
-            # 应用时间设置到界面控件
-            self.total_hours.set(self.config["total_time"]["hours"])
-            self.total_minutes.set(self.config["total_time"]["minutes"])
-            self.total_seconds.set(self.config["total_time"]["seconds"])
-            
-            self.stage_hours.set(self.config["stage_time"]["hours"])
-            self.stage_minutes.set(self.config["stage_time"]["minutes"])
-            self.stage_seconds.set(self.config["stage_time"]["seconds"])
-            
-            self.random_min.set(self.config["random_reminder"]["min"])
-            self.random_max.set(self.config["random_reminder"]["max"])
-            
-            self.short_break_minutes.set(self.config["short_break"]["minutes"])
-            self.short_break_seconds.set(self.config["short_break"]["seconds"])
-            
-            self.stage_break_minutes.set(self.config["stage_break"]["minutes"])
-            self.stage_break_seconds.set(self.config["stage_break"]["seconds"])
-            
-            # 确保音频设置也被加载
-            if "sounds" in self.config:
-                self.sound_vars = self.config["sounds"]
-        except Exception as e:
-            messagebox.showerror("错误", f"加载配置文件失败: {str(e)}")
+            self.config = self.config_store.load()
+        except (OSError, ConfigError) as e:
+            messagebox.showerror("错误", f"加载配置文件失败，已使用默认设置: {str(e)}")
+            self.config = copy.deepcopy(DEFAULT_CONFIG)
+        self.apply_config_to_ui()
+
+    def load_profiles(self):
+        """读取配置方案列表，之后才启用方案选择和方案菜单"""
+        from profiles import ProfileStore
+        self.profiles = ProfileStore()
+        self.profiles.on_error = lambda e: self.root.after(
+            0, lambda: messagebox.showerror("错误", f"保存配置方案失败: {str(e)}"))
+        try:
+            self.profiles.load()
+        except (OSError, ConfigError) as e:
+            messagebox.showerror("错误", f"加载配置方案失败: {str(e)}")
+        self.refresh_profile_selector()
+        self.profile_combo["state"] = "readonly"
+        self.profile_menu_button["state"] = "normal"
+
+    def active_profile(self):
+        """当前方案名，没有选择方案（或方案尚未读取）时为 default"""
+        return (self.profiles.active if self.profiles is not None else None) or "default"
+
+    def refresh_profile_selector(self):
+        self.profile_combo["values"] = self.profiles.names()
+        self.profile_var.set(self.profiles.active or "")
+
+    def switch_profile(self, event=None):
+        """切换到选中的方案：只替换内存中的配置并刷新控件，不重新扫描提示音"""
+        from profiles import apply_profile
+
+        name = self.profile_var.get()
+        if name not in self.profiles.profiles or name == self.profiles.active:
+            return
+        self.config = apply_profile(self.config, self.profiles.get(name))
+        self.apply_config_to_ui()
+        self.sync_sound_lists()
+        self.save_config()
+        self.audio.preload(self.config["sounds"])
+        self.profiles.set_active(name)
+
+    def sync_sound_lists(self):
+        """设置窗口打开时，让提示音列表的选中项与当前配置一致"""
+        if not (hasattr(self, 'sound_window') and self.sound_window.winfo_exists()):
+            return
+        for config_key, (folder, sound_list) in self.sound_lists.items():
+            value = self.config["sounds"].get(config_key)
+            sound_list.set_selected(value if sound_list.multiple else [value] if value else [])
+
+    def save_profile(self, save_as=False):
+        """把界面上的设置保存到当前方案（或另存为新方案）"""
+        name = self.profiles.active
+        if save_as or not name:
+            name = simpledialog.askstring("保存方案", "方案名称：", parent=self.root)
+            if not name or not name.strip():
+                return
+        if not self.read_time_settings():
+            return
+        try:
+            self.profiles.put(name, self.config)
+        except (OSError, ConfigError) as e:
+            messagebox.showerror("错误", f"保存配置方案失败: {str(e)}")
+            return
+        self.refresh_profile_selector()
+
+    def delete_profile(self):
+        name = self.profiles.active
+        if not name or not messagebox.askyesno("删除方案", f"确定删除方案“{name}”吗？"):
+            return
+        try:
+            self.profiles.delete(name)
+        except OSError as e:
+            messagebox.showerror("错误", f"保存配置方案失败: {str(e)}")
+        self.refresh_profile_selector()
+
+    def import_profiles(self):
+        path = filedialog.askopenfilename(title="导入方案", filetypes=[("JSON 文件", "*.json")])
+        if not path:
+            return
+        try:
+            names = self.profiles.import_file(path)
+        except (OSError, ConfigError) as e:
+            messagebox.showerror("错误", f"导入方案失败: {str(e)}")
+            return
+        self.refresh_profile_selector()
+        messagebox.showinfo("成功", f"已导入 {len(names)} 个方案")
+
+    def export_profiles(self):
+        if not self.profiles.names():
+            messagebox.showinfo("提示", "还没有保存任何方案")
+            return
+        path = filedialog.asksaveasfilename(title="导出方案", defaultextension=".json",
+                                            initialfile="profiles-export.json", filetypes=[("JSON 文件", "*.json")])
+        if not path:
+            return
+        try:
+            self.profiles.export(path)
+        except OSError as e:
+            messagebox.showerror("错误", f"导出方案失败: {str(e)}")
+
+    def apply_config_to_ui(self):
+        """应用时间设置到界面控件"""
+        self.total_hours.set(self.config["total_time"]["hours"])
+        self.total_minutes.set(self.config["total_time"]["minutes"])
+        self.total_seconds.set(self.config["total_time"]["seconds"])
+        
+        self.stage_hours.set(self.config["stage_time"]["hours"])
+        self.stage_minutes.set(self.config["stage_time"]["minutes"])
+        self.stage_seconds.set(self.config["stage_time"]["seconds"])
+        
+        self.random_min.set(self.config["random_reminder"]["min"])
+        self.random_max.set(self.config["random_reminder"]["max"])
+        
+        self.short_break_minutes.set(self.config["short_break"]["minutes"])
+        self.short_break_seconds.set(self.config["short_break"]["seconds"])
+        
+        self.stage_break_minutes.set(self.config["stage_break"]["minutes"])
+        self.stage_break_seconds.set(self.config["stage_break"]["seconds"])
     
     def save_config(self):
-        """保存配置到文件（仅当内容变化时）"""
+        """保存配置到文件（校验后防抖写入，内容无变化时跳过），返回配置是否有效"""
         try:
-            CONFIG_FILE = "config.json"
-            new_config = json.dumps(self.config, ensure_ascii=False, indent=4)
-
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    current = f.read()
-                    if current.strip() == new_config.strip():
-                        print("配置无变化，跳过保存")
-                        return  # 无需保存
-
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                f.write(new_config)
-            print("配置文件已成功保存！")
-        except Exception as e:
+            self.config_store.save(self.config)
+            return True
+        except ConfigError as e:
             messagebox.showerror("错误", f"保存配置文件失败: {str(e)}")
+            return False
+
+    def on_close(self):
+        """关闭主窗口前写入尚未保存的配置"""
+        self.config_store.flush()
+        if self.profiles is not None:
+            self.profiles.flush()
+        self.lifecycle.stop()
+        self.audio_scheduler.cancel()
+        self.audio.stop_all()
+        self.leave_group()
+        if self.control is not None:
+            self.control.stop()
+        if self.history is not None:
+            self.history.close()
+        self.root.destroy()
+
+    def open_metrics_panel(self):
+        """打开热路径指标调试面板，已打开时提到前面"""
+        if self.metrics_panel is not None and self.metrics_panel.window.winfo_exists():
+            self.metrics_panel.window.lift()
+            return
+        from debug_panel import MetricsPanel
+        self.metrics_panel = MetricsPanel(self.root, self.metrics)
+
+    def start_control_server(self, port):
+        """启动本地控制接口，命令在 Tk 线程中轮询执行"""
+        from control_server import ControlServer
+        try:
+            self.control = ControlServer(port=port)
+        except OSError as e:
+            messagebox.showerror("错误", f"控制接口启动失败: {str(e)}")
+            return
+        self.control.metrics_text = self.metrics.to_prometheus
+        self.control.start()
+        print(f"控制接口已启动: http://127.0.0.1:{port}")
+        self.poll_control()
+
+    def poll_control(self):
+        """执行控制接口排队的命令"""
+        self.control.process_commands(self.handle_control_command)
+        self.root.after(CONTROL_POLL_MS, self.poll_control)
+
+    def handle_control_command(self, command, payload):
+        """在 Tk 线程中执行控制命令，与点击按钮的效果相同，返回当前状态"""
+        if command == "start" and self.main_button_state == "ready":
+            self.start_timer()
+        elif command == "pause" and self.main_button_state == "running":
+            self.handle_main_button()
+        elif command == "resume" and self.main_button_state == "paused":
+            self.handle_main_button()
+        elif command == "reset" and self.main_button_state != "ready":
+            self.stop_timer()
+        elif command == "config":
+            self.update_config(payload)
+        return self.snapshot()
+
+    def update_config(self, changes):
+        """合并部分配置，校验后应用到界面并保存（下次开始计时时生效）"""
+        self.config = merge_config(self.config, changes)
+        self.apply_config_to_ui()
+        self.save_config()
+        # 响度目标变化时按新目标重新导入已配置的提示音
+        self.audio.set_target_db(self.config.get("audio_target_db", DEFAULT_CONFIG["audio_target_db"]),
+                                 self.audio.configured_paths(self.config["sounds"]))
+        self.audio.preload(self.config["sounds"])
+
+    def snapshot(self, event=None):
+        """当前状态，用于控制接口的查询和推送"""
+        state = {"event": event, "status": self.main_button_state, "phase": "ready",
+                 "total_left": 0, "stage_left": 0, "break_left": 0}
+        if self.timer_running:
+            with self.timer_lock:
+                current = self.timeline.state_at(self.session_elapsed(), self.timeline_index)
+            state.update(phase=current.phase, total_left=math.ceil(current.total_left),
+                         stage_left=math.ceil(current.stage_left), break_left=math.ceil(current.break_left))
+        return state
+
+    def publish(self, event=None):
+        """记录事件到会话历史，并向控制接口的订阅者推送状态变化（任意线程可调用）"""
+        session = self.session_id
+        if event is not None and session is not None:
+            self.history.record(session, event, self.session_elapsed())
+        if self.control is not None:
+            self.control.broadcast(self.snapshot(event))
 
     
     def setup_ui(self):
@@ -273,8 +542,38 @@ class TimerApp:
         # 提示音设置按钮
         self.settings_button = ttk.Button(control_frame, text="设置", command=self.open_settings_window)
         self.settings_button.pack(side=tk.LEFT, padx=5)
+
+        # 右侧：小组同步和配置方案选择
+        group_menu_button = ttk.Menubutton(control_frame, text="小组", width=4)
+        group_menu = tk.Menu(group_menu_button, tearoff=False)
+        group_menu.add_command(label="发起小组会话…", command=self.host_group)
+        group_menu.add_command(label="加入小组会话…", command=self.join_group)
+        group_menu.add_command(label="退出小组", command=self.leave_group)
+        group_menu_button["menu"] = group_menu
+        group_menu_button.pack(side=tk.RIGHT, padx=5)
+
+        # 配置方案在首帧之后读取，读取前禁用
+        profile_menu_button = self.profile_menu_button = ttk.Menubutton(control_frame, text="方案", width=4,
+                                                                        state="disabled")
+        profile_menu = tk.Menu(profile_menu_button, tearoff=False)
+        profile_menu.add_command(label="保存到当前方案", command=self.save_profile)
+        profile_menu.add_command(label="另存为新方案…", command=lambda: self.save_profile(save_as=True))
+        profile_menu.add_command(label="删除当前方案", command=self.delete_profile)
+        profile_menu.add_separator()
+        profile_menu.add_command(label="导入…", command=self.import_profiles)
+        profile_menu.add_command(label="导出…", command=self.export_profiles)
+        profile_menu_button["menu"] = profile_menu
+        profile_menu_button.pack(side=tk.RIGHT, padx=5)
+
+        self.profile_combo = ttk.Combobox(control_frame, textvariable=self.profile_var, state="disabled", width=10)
+        self.profile_combo.pack(side=tk.RIGHT)
+        self.profile_combo.bind("<<ComboboxSelected>>", self.switch_profile)
     
     def open_settings_window(self):
+        if self.library.scanning:
+            # 首次扫描尚未发布文件列表，列表不完整时保存会丢掉已选的提示音
+            messagebox.showinfo("提示", "正在扫描提示音文件，请稍后再打开设置。")
+            return
         # 检查是否有任何可用音频文件
         has_audio = self.check_notification_audio_files()
         if not has_audio:
@@ -294,16 +593,22 @@ class TimerApp:
 
         self.sound_window = tk.Toplevel(self.root)
         self.sound_window.title("设置和关于")
-        self.sound_window.geometry("400x335")
+        self.sound_window.geometry("460x335")
         self.sound_window.resizable(False, False)
         self.sound_window.protocol("WM_DELETE_WINDOW", self.close_sound_settings)
 
         notebook = ttk.Notebook(self.sound_window)
         notebook.pack(fill=tk.BOTH, expand=True)
 
-        self.sound_vars = {}
+        self.sound_lists = {}
         self.refresh_sound_tabs(notebook)
 
+        # 统计页签：切换到该页签时才读取汇总数据
+        from stats_view import StatsView
+        stats_view = StatsView(notebook, self.open_history())
+        notebook.add(stats_view, text="统计")
+        notebook.bind("<<NotebookTabChanged>>",
+                      lambda e: stats_view.refresh() if notebook.select() == str(stats_view) else None)
         
         # 添加版权和联系信息页签
         about_frame = ttk.Frame(notebook)
@@ -351,62 +656,34 @@ class TimerApp:
         button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
 
         ttk.Button(button_frame, text="保存", command=self.save_sound_settings).pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="刷新音频列表", command=lambda: self.refresh_sound_tabs(notebook)).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="刷新音频列表", command=lambda: self.rescan_sound_tabs(notebook)).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="关闭", command=self.close_sound_settings).pack(side=tk.LEFT, padx=10)
 
 
     def setup_sound_list(self, parent, folder, config_key, multiple=True):
-        """设置音频列表"""
-        folder_path = os.path.join("notification", folder)
-        audio_files = [f for f in os.listdir(folder_path) if f.lower().endswith(('.mp3', '.wav'))]
-
-        list_frame = ttk.Frame(parent)
-        list_frame.pack(fill=tk.BOTH, expand=False, padx=20, pady=20)
-
-        canvas = tk.Canvas(list_frame, height=200, width=150)
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="n")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        if not hasattr(self, 'sound_vars'):
-            self.sound_vars = {}
+        """设置音频列表（虚拟化列表，只创建可见行）"""
+        from sound_list import VirtualSoundList
 
         selected_files = self.config["sounds"].get(config_key, [] if multiple else "")
-        
-        for file in audio_files:
-            frame = ttk.Frame(scrollable_frame)
-            frame.pack(fill=tk.X, pady=2)
-
-            # 修正这里：根据配置文件严格选择文件是否勾选
-            if multiple:
-                is_selected = file in selected_files
-            else:
-                is_selected = file == selected_files
-
-            var = tk.BooleanVar(value=is_selected)
-            chk = ttk.Checkbutton(frame, text=file, variable=var)
-            chk.pack(side=tk.LEFT, padx=5)
-            self.sound_vars[f"{config_key}_{file}"] = var  # 使用组合key避免冲突
+        # 根据配置文件严格选择文件是否勾选
+        if multiple:
+            selected = set(selected_files)
+        else:
+            selected = {selected_files} if selected_files else set()
 
-            play_btn = ttk.Button(frame, text="播放",
-                                command=lambda f=file, folder=folder: self.play_sound(os.path.join("notification", folder, f)))
-            play_btn.pack(side=tk.RIGHT, padx=5)
+        sound_list = VirtualSoundList(
+            parent, self.library.files(folder), selected, multiple,
+            on_play=lambda f: self.play_sound(folder, f),
+        )
+        sound_list.pack(fill=tk.BOTH, expand=False, padx=5, pady=10)
+        self.sound_lists[config_key] = (folder, sound_list)
 
     def refresh_sound_tabs(self, notebook):
-        """刷新音频标签页"""
-        # 清除已有的标签页
-        for tab in notebook.tabs():
-            notebook.forget(tab)
+        """刷新音频标签页：首次打开时创建，之后只更新列表内容"""
+        if self.sound_lists:
+            for folder, sound_list in self.sound_lists.values():
+                sound_list.set_files(self.library.files(folder))
+            return
 
         # 创建并添加标签页
         tabs_info = [
@@ -417,58 +694,44 @@ class TimerApp:
         ]
 
         for tab_name, folder, config_key, multiple in tabs_info:
-            frame = ttk.Frame(notebook, padding=(50, 5))  # 设置左右间距为10，上下间距为5
+            frame = ttk.Frame(notebook, padding=(20, 5))  # 设置左右间距为20，上下间距为5
             notebook.add(frame, text=tab_name)
             self.setup_sound_list(frame, folder, config_key, multiple)
 
-    def play_sound(self, file_path):
-        """播放音频预览"""
-        try:
-            # 停止当前播放的音频
-            pygame.mixer.music.stop()
-            pygame.mixer.music.unload()
-            
-            # 加载并播放新音频
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-        except Exception as e:
-            messagebox.showerror("错误", f"无法播放音频: {str(e)}")
+    def rescan_sound_tabs(self, notebook):
+        """立即增量扫描音频文件夹（在后台线程中），完成后刷新标签页"""
+        def rescan():
+            self.library.refresh()
+            self.root.after(0, lambda: self.refresh_sound_tabs(notebook) if notebook.winfo_exists() else None)
+        threading.Thread(target=rescan, daemon=True).start()
+
+    def play_sound(self, folder, name):
+        """播放音频预览（与提醒共用已解码的音频库）；按音频库索引判断文件是否存在，不在 Tk 线程中访问磁盘"""
+        info = self.library.get(folder, name)
+        if info is None:
+            messagebox.showerror("错误", f"无法播放音频: 文件不存在 {os.path.join('notification', folder, name)}")
+            return
+        self.audio.preview(info.path, (info.path, info.mtime_ns, info.size))
     
     def save_sound_settings(self):
         """保存音频设置"""
         new_sound_config = {}
 
-        audio_types = {
-            "start": ("notis", False),
-            "random": ("notis", True),
-            "stage_break_start": ("pause", False),
-            "total_end": ("pause", False)
-        }
-
-        for key, (folder, multiple) in audio_types.items():
-            folder_path = os.path.join("notification", folder)
-            audio_files = [f for f in os.listdir(folder_path) if f.lower().endswith(('.mp3', '.wav'))]
-
-            if multiple:
-                selected_files = [
-                    file for file in audio_files
-                    if self.sound_vars.get(f"{key}_{file}", tk.BooleanVar()).get()
-                ]
+        for key, (_, sound_list) in self.sound_lists.items():
+            selected_files = sound_list.get_selected()
+            if sound_list.multiple:
                 new_sound_config[key] = selected_files
             else:
-                selected_file = next((
-                    file for file in audio_files
-                    if self.sound_vars.get(f"{key}_{file}", tk.BooleanVar()).get()
-                ), "")
-                new_sound_config[key] = selected_file
+                new_sound_config[key] = selected_files[0] if selected_files else ""
 
         self.config["sounds"] = new_sound_config
         self.save_config()
+        self.audio.preload(new_sound_config)
         messagebox.showinfo("成功", "音频设置已保存")
 
 
-    def start_timer(self):
-        """开始计时"""
+    def read_time_settings(self):
+        """把界面上的时间设置写入配置，输入无效时提示并返回 False"""
         try:
             # 获取所有设置值
             total_h = int(self.total_hours.get())
@@ -492,72 +755,123 @@ class TimerApp:
             if (total_h == 0 and total_m == 0 and total_s == 0) or \
                (stage_h == 0 and stage_m == 0 and stage_s == 0):
                 messagebox.showerror("错误", "请完整设置总时间和阶段时间！")
-                return
+                return False
             
             # 更新配置
             self.config["total_time"] = {"hours": total_h, "minutes": total_m, "seconds": total_s}
             self.config["stage_time"] = {"hours": stage_h, "minutes": stage_m, "seconds": stage_s}
-            self.config["random_reminder"] = {"min": random_min, "max": random_max}
+            # 保留 distribution 等高级设置，只更新界面上的两项
+            self.config["random_reminder"].update(min=random_min, max=random_max)
             self.config["short_break"] = {"minutes": short_break_m, "seconds": short_break_s}
             self.config["stage_break"] = {"minutes": stage_break_m, "seconds": stage_break_s}
-            
-            # 保存配置
-            self.save_config()
-            
-            # 计算总时间（秒）
-            self.total_time_left = total_h * 3600 + total_m * 60 + total_s
-            # 计算阶段时间（秒）
-            self.stage_time_left = stage_h * 3600 + stage_m * 60 + stage_s
-            # 设置初始状态
-            self.current_state = "stage"
-            # 计算下一次随机提醒时间
-            min_seconds = random_min * 60
-            max_seconds = random_max * 60
-            self.next_reminder = random.randint(min_seconds, max_seconds)
-            
-            # 如果计时器已经在运行，就不要重新启动
-            if not self.timer_running:
-                self.timer_running = True
-                self.paused = False  # 确保计时器未暂停
-                # 播放计时开始音
-                self.play_notification("start")
-                # 启动计时器线程
-                threading.Thread(target=self.timer_loop, daemon=True).start()
-                
-                # 更新按钮状态
-                self.stop_button.config(state=tk.NORMAL)
-                
-                # 更新状态标签
-                self.status_label.config(text="状态: 计时中 - 阶段计时")
+            return True
         except ValueError as e:
             messagebox.showerror("错误", f"请输入有效的数字: {str(e)}")
+            return False
+
+    def start_timer(self):
+        """开始计时"""
+        if not self.read_time_settings():
+            return
+
+        # 保存配置
+        if not self.save_config():
+            return
+
+        # 如果计时器已经在运行，就不要重新启动
+        if not self.timer_running:
+            # 作为小组协调者时推迟几秒开始，所有成员在同一时刻开始
+            elapsed = -GROUP_START_DELAY if self.group_coordinator is not None else 0.0
+            self.begin_session(self.config, random.randrange(2 ** 32), elapsed)
     
+    def begin_session(self, config, seed, elapsed=0.0, paused=False, session=None):
+        """按配置和随机种子开始会话；elapsed 大于 0 时从断点恢复，小于 0 时在 -elapsed 秒后开始（小组会话），
+        session 为恢复前的历史会话编号"""
+        # 预先生成整个会话的时间线，之后只按 monotonic 时间查询状态
+        timeline = build_timeline(config, seed)
+        # 先作废可能仍在运行的旧计时线程，再替换共享状态
+        self.lifecycle.stop()
+        now = time.monotonic()
+        with self.timer_lock:
+            self.timeline = timeline
+            self.timeline_index = timeline.index_at(elapsed)
+            self.current_state = timeline.state_at(elapsed, self.timeline_index).phase
+            self.session_start = now - elapsed
+            self.session_config = copy.deepcopy(config)  # 小组协调者在服务线程中发布
+            self.session_seed = seed
+            self.audio_scheduler.reset()
+
+        if session is None:
+            session = self.open_history().begin_session(seed, self.active_profile())
+        else:
+            self.open_history().resume_session(session, self.active_profile())
+        self.session_id = session
+        self.journal.begin(copy.deepcopy(config), seed, elapsed, paused, session)
+        if config.get("plan"):
+            # 计划中各阶段单独指定的提示音也提前解码
+            self.audio.preload(plan_sounds(config["plan"]))
+
+        self.timer_running = True
+        self.paused = paused
+        self.pause_started = now
+        if elapsed == 0:
+            # 播放计时开始音
+            self.play_notification("start", timeline.sound_file(0))
+        elif elapsed < 0:
+            # 小组会话：开始音在约定的时刻播放
+            sound_file = self.choose_sound("start", timeline.sound_file(0))
+            if not self.audio_scheduler.arm(("start", seed), now - elapsed, "start", sound_file):
+                self.root.after(int(-elapsed * 1000), self.play_notification, "start", timeline.sound_file(0))
+        # 启动本会话的计时线程
+        self.lifecycle.start(self.timer_loop)
+        
+        # 更新按钮状态
+        self.update_widget(self.stop_button, "state", tk.NORMAL)
+        self.update_widget(self.main_button, "text", "继续" if paused else "暂停")
+        self.main_button_state = "paused" if paused else "running"
+        
+        # 启动界面刷新
+        self.schedule_render(0)
+        self.publish("resumed" if elapsed else "started")
+
+    def offer_resume(self):
+        """启动时发现未完成的会话，询问是否从断点继续"""
+        recovered = SessionJournal.recover(self.journal.path)
+        if recovered is None:
+            return
+        elapsed = recovered["elapsed"]
+        if messagebox.askyesno("恢复计时", f"检测到上次未完成的计时（已进行 {self.format_time(int(elapsed))}），是否继续？"):
+            try:
+                self.begin_session(recovered["config"], recovered["seed"], elapsed, recovered["paused"],
+                                   recovered["session"])
+                return
+            except (KeyError, TypeError, ValueError) as e:
+                messagebox.showerror("错误", f"恢复计时失败: {str(e)}")
+        if recovered["session"] is not None:
+            try:
+                focus = build_timeline(recovered["config"], recovered["seed"]).stage_seconds(elapsed)
+            except (KeyError, TypeError, ValueError):
+                focus = None
+            self.open_history().end_session(recovered["session"], elapsed, False, focus)
+        self.journal.finish()
+
     def stop_timer(self):
         """停止计时"""
-        self.timer_running = False  # 停止计时器线程
+        # 在修改暂停状态之前记录，已计时时间才准确
+        self.end_history_session(completed=False, last_event="reset")
+        self.lifecycle.stop()  # 作废计时线程的代号并立即唤醒，使其退出
+        with self.timer_lock:
+            self.audio_scheduler.cancel()
+        self.timer_running = False
         self.paused = False  # 重置暂停状态
-        
-        # 重置计时器状态和时间变量
-        self.total_time_left = 0
-        self.stage_time_left = 0
-        self.break_time_left = 0
+        self.journal.finish()
         
         # 停止当前播放的音频
-        pygame.mixer.music.stop()
-        
-        # 重置显示
-        self.total_time_label.config(text="00:00:00")
-        self.stage_time_label.config(text="00:00:00")
-        self.break_time_label.config(text="00:00:00")
-        self.total_progress["value"] = 0
-        self.stage_progress["value"] = 0
-        
-        # 更新按钮状态
-        self.main_button.config(state=tk.NORMAL)
-        self.stop_button.config(state=tk.DISABLED)
+        self.audio.stop_preview()
         
-        # 更新状态标签
-        self.status_label.config(text="状态: 就绪")
+        # 重置显示和按钮状态
+        self.reset_timer_ui()
+        self.publish("reset")
     
     def get_state_label(self):
         """获取当前状态的标签文本"""
@@ -569,188 +883,368 @@ class TimerApp:
             return "阶段休息"
         return "就绪"
     
-    def play_notification(self, sound_type):
-        try:
-            # 停止当前播放的音频
-            pygame.mixer.music.stop()
-
-            file_path = None
-            if sound_type == "random" and self.config["sounds"]["random"]:
-                sound_file = random.choice(self.config["sounds"]["random"])
-                file_path = os.path.join("notification", "notis", sound_file)
-            elif sound_type in self.config["sounds"] and self.config["sounds"][sound_type]:
-                sound_file = self.config["sounds"][sound_type]
-                folder = "notis" if sound_type in ["start", "random"] else "pause"
-                file_path = os.path.join("notification", folder, sound_file)
-
-            if not file_path or not os.path.exists(file_path):
-                print(f"音频文件未找到: {file_path}")
-                return
-
-            # 使用缓存播放
-            if file_path not in self.audio_cache:
-                self.audio_cache[file_path] = pygame.mixer.Sound(file_path)
-
-            sound = self.audio_cache[file_path]
-            sound.play()
-
-        except Exception as e:
-            print(f"播放音频失败: {str(e)}")
+    def choose_sound(self, sound_type, setting=None):
+        """事件要播放的文件名（随机提醒从列表中随机选一个），未设置时返回空字符串"""
+        if setting is None:
+            setting = self.config["sounds"].get(sound_type, "")
+        if sound_type == "random":
+            return random.choice(setting) if setting else ""
+        return setting
+
+    def play_notification(self, sound_type, setting=None):
+        """在事件专用声道上播放提示音（不访问磁盘，不阻塞计时线程）；setting 为计划中单独指定的提示音"""
+        # 停止当前试听的音频
+        self.audio.stop_preview()
+
+        sound_file = self.choose_sound(sound_type, setting)
+        if not sound_file:
+            print(f"未设置提示音: {sound_type}")
+            return
+        self.audio.play(sound_type, sound_file)
 
     
-    def timer_loop(self):
-        initial_total_time = self.total_time_left
-        initial_stage_time = self.stage_time_left
-        initial_short_break_time = self.config["short_break"]["minutes"] * 60 + self.config["short_break"]["seconds"]
-        initial_stage_break_time = self.config["stage_break"]["minutes"] * 60 + self.config["stage_break"]["seconds"]
-
-        while self.timer_running:
-            if not self.paused:
-                # 总时间倒计时
-                if self.total_time_left > 0:
-                    self.total_time_left -= 1
-                    progress = (initial_total_time - self.total_time_left) / initial_total_time * 100
-                    self.total_progress["value"] = progress
-
-                # 状态判断与执行
-                if self.current_state == "stage":
-                    if self.stage_time_left > 0:
-                        self.stage_time_left -= 1
-                        self.next_reminder -= 1
-
-                        stage_progress = (initial_stage_time - self.stage_time_left) / initial_stage_time * 100
-                        self.stage_progress["value"] = stage_progress
-
-                        if self.next_reminder <= 0:
-                            self.play_notification("random")
-                            self.current_state = "short_break"
-                            self.break_time_left = initial_short_break_time
-                            # 暂停阶段计时
-                            self.stage_progress["value"] = 0
-
-                    if self.stage_time_left <= 0:
-                        self.play_notification("stage_break_start")
-                        self.current_state = "stage_break"
-                        self.break_time_left = initial_stage_break_time
-                        self.stage_progress["value"] = 0
-
-                elif self.current_state == "short_break":
-                    if self.break_time_left > 0:
-                        self.break_time_left -= 1
-                        break_progress = (initial_short_break_time - self.break_time_left) / initial_short_break_time * 100
-                        self.stage_progress["value"] = break_progress
-                    else:
-                        self.play_notification("start")
-                        self.current_state = "stage"
-                        min_seconds = self.config["random_reminder"]["min"] * 60
-                        max_seconds = self.config["random_reminder"]["max"] * 60
-                        self.next_reminder = random.randint(min_seconds, max_seconds)
-                        self.stage_progress["value"] = 0
-
-                elif self.current_state == "stage_break":
-                    if self.break_time_left > 0:
-                        self.break_time_left -= 1
-                        break_progress = (initial_stage_break_time - self.break_time_left) / initial_stage_break_time * 100
-                        self.stage_progress["value"] = break_progress
-                    else:
-                        self.play_notification("start")
-                        self.current_state = "stage"
-                        self.stage_time_left = initial_stage_time
-                        min_seconds = self.config["random_reminder"]["min"] * 60
-                        max_seconds = self.config["random_reminder"]["max"] * 60
-                        self.next_reminder = random.randint(min_seconds, max_seconds)
-                        self.stage_progress["value"] = 0
-
-                # 总计时结束判断
-                if self.total_time_left <= 0:
-                    self.play_notification("total_end")
+    def timer_loop(self, token):
+        """计时主循环：按时间线上的绝对截止时间推进并播放提示音，只在下一个截止点唤醒，不操作任何控件
+
+        只有当前代号（token）的线程会推进计时；会话被重置或重新开始后，旧线程在下一次检查时退出。
+        """
+        while True:
+            if self.paused:
+                # 暂停期间不轮询，等待继续或重置唤醒
+                if not token.wait():
+                    return
+                continue
+
+            with self.timer_lock:
+                if not self.lifecycle.is_current(token):
+                    return
+                timeline = self.timeline
+                now = time.monotonic()
+                elapsed = now - self.session_start
+                previous = self.timeline_index
+                self.timeline_index = self.timeline.index_at(elapsed, previous)
+                events = self.timeline.events_between(previous, self.timeline_index)
+                self.current_state = self.timeline.state_at(elapsed, self.timeline_index).phase
+                finished = self.current_state == "finished"
+                next_offset = self.timeline.next_offset(self.timeline_index)
+                timeout = None if next_offset is None else next_offset - elapsed
+                # 除阶段切换外，每隔一段时间也写一次检查点
+                timeout = min(timeout, self.journal.interval) if timeout is not None else None
+                if not self.paused:
+                    # 在锁内安排，暂停和重置在同一把锁下取消，不会留下过期的安排
+                    self.arm_upcoming(token, timeline, self.timeline_index, self.session_start)
+                    # 检查点同样在锁内写入，不会覆盖已重置、已暂停或新会话的记录
+                    if not finished:
+                        self.journal.checkpoint(elapsed, boundary=self.timeline_index != previous)
+
+            metrics = self.metrics
+            if metrics.enabled:
+                # 处理到期事件时相对截止点迟到了多久
+                for offset, _, _ in events:
+                    metrics.observe("tick_lateness_seconds", max(elapsed - offset, 0.0))
+
+            # 已交给音频线程的提示音由其准时播放，这里只播放没有安排上的
+            # 卡顿或休眠后一次性追赶多个截止点时，只播放仍然“及时”的提示音，过期的只保留最后一个
+            with self.timer_lock:
+                if not self.lifecycle.is_current(token):
+                    return  # 计算完成后会话被重置，不再播放和推送
+            scheduler = self.audio_scheduler
+            due = [event for event in events if not scheduler.claimed((token.generation,) + event[:2])]
+            recent = [(name, setting) for offset, name, setting in due if elapsed - offset <= CATCH_UP_GRACE]
+            if not recent and events and len(due) == len(events):
+                recent = [events[-1][1:]]
+            for name, setting in recent:
+                self.play_notification(name, setting)
+            for _, name, _ in events:
+                self.publish(name)
+
+            if finished:
+                # 界面由 render 在 Tk 线程中检测到结束后重置
+                # 在锁内确认仍是当前会话再收尾，避免与同时开始的新会话交错
+                with self.timer_lock:
+                    if not self.lifecycle.is_current(token):
+                        return
                     self.timer_running = False
-                    break
-
-                self.update_time_display()
-
-            time.sleep(1)
-
-        self.reset_timer_ui()
+                    self.lifecycle.release(token)
+                    self.journal.finish()
+                    self.end_history_session(completed=True)
+                return
 
-    
-    def update_time_display(self):
-        """更新时间显示"""
-        # 更新总时间显示
-        total_h = self.total_time_left // 3600
-        total_m = (self.total_time_left % 3600) // 60
-        total_s = self.total_time_left % 60
-        total_time_str = f"{total_h:02d}:{total_m:02d}:{total_s:02d}"
-
-        # 更新阶段时间显示
-        if self.current_state == "stage" or self.current_state == "short_break":
-            # 在阶段计时和短休息时，阶段计时显示始终为剩余时间
-            stage_h = self.stage_time_left // 3600
-            stage_m = (self.stage_time_left % 3600) // 60
-            stage_s = self.stage_time_left % 60
-            stage_time_str = f"{stage_h:02d}:{stage_m:02d}:{stage_s:02d}"
-        else:
-            # 阶段休息时阶段计时显示00:00:00
-            stage_time_str = "00:00:00"
+            if not token.wait(max(timeout, 0)):
+                return
 
-        # 休息时间显示
-        if self.current_state in ["short_break", "stage_break"]:
-            break_h = self.break_time_left // 3600
-            break_m = (self.break_time_left % 3600) // 60
-            break_s = self.break_time_left % 60
-            break_time_str = f"{break_h:02d}:{break_m:02d}:{break_s:02d}"
-        else:
-            break_time_str = "00:00:00"
+    def arm_upcoming(self, token, timeline, index, session_start):
+        """把下一个截止点的提示音交给音频线程，由其提前准备并在截止时刻播放（持有 timer_lock 时调用）"""
+        next_offset = timeline.next_offset(index)
+        if next_offset is None:
+            return
+        last = timeline.index_at(next_offset, index + 1)
+        for offset, name, setting in timeline.events_between(index, last):
+            sound_file = self.choose_sound(name, setting)
+            self.audio_scheduler.arm((token.generation, offset, name), session_start + offset, name, sound_file)
+
+    def end_history_session(self, completed, last_event=None):
+        """在会话历史中记录会话结束（可附带最后一个事件）"""
+        session, self.session_id = self.session_id, None
+        if session is not None:
+            elapsed = self.session_elapsed()
+            if last_event is not None:
+                self.history.record(session, last_event, elapsed)
+            self.history.end_session(session, elapsed, completed, self.timeline.stage_seconds(elapsed))
+
+    def shift_session_start(self, delta):
+        """暂停恢复后将会话起点整体后移"""
+        with self.timer_lock:
+            self.session_start += delta
+
+    @staticmethod
+    def format_time(seconds):
+        """将秒数格式化为 HH:MM:SS"""
+        h = seconds // 3600
+        m = (seconds % 3600) // 60
+        s = seconds % 60
+        return f"{h:02d}:{m:02d}:{s:02d}"
+
+    def session_elapsed(self):
+        """当前会话已计时的秒数，暂停期间停留在暂停时刻"""
+        now = self.pause_started if self.paused else time.monotonic()
+        return now - self.session_start
+
+    def schedule_render(self, delay=RENDER_INTERVAL_MS):
+        """安排下一次界面刷新，已有待执行的刷新或窗口最小化时不重复安排"""
+        if self.render_job is None and self.window_visible:
+            self.render_job = self.root.after(delay, self.render)
+            if self.metrics.enabled:
+                self.render_due = time.perf_counter() + delay / 1000
+
+    def render(self):
+        """在 Tk 线程中批量刷新界面：读取时间线状态快照，只更新有变化的控件"""
+        self.render_job = None
+        metrics = self.metrics
+        if metrics.enabled:
+            started = time.perf_counter()
+            if self.render_due is not None:
+                metrics.observe("ui_apply_seconds", max(started - self.render_due, 0.0))
+                self.render_due = None
+
+        if not self.timer_running:
+            # 计时线程已结束（总计时结束）
+            if self.main_button_state != "ready":
+                self.reset_timer_ui()
+            return
 
-        # 更新到界面
-        self.root.after(0, lambda: self.total_time_label.config(text=total_time_str))
-        self.root.after(0, lambda: self.stage_time_label.config(text=stage_time_str))
-        self.root.after(0, lambda: self.break_time_label.config(text=break_time_str))
+        with self.timer_lock:
+            state = self.timeline.state_at(self.session_elapsed(), self.timeline_index)
+
+        self.update_widget(self.total_time_label, "text", self.format_time(math.ceil(state.total_left)))
+        # 阶段休息时阶段计时显示00:00:00，短休息时阶段计时冻结
+        self.update_widget(self.stage_time_label, "text", self.format_time(math.ceil(state.stage_left)))
+        self.update_widget(self.break_time_label, "text", self.format_time(math.ceil(state.break_left)))
+        self.update_widget(self.total_progress, "value", round(state.total_progress, 1))
+        self.update_widget(self.stage_progress, "value", round(state.phase_progress, 1))
+
+        status = "已暂停" if self.paused else "计时中"
+        self.update_widget(self.status_label, "text", f"状态: {status} - {self.get_state_label()}")
+
+        if metrics.enabled:
+            metrics.observe("ui_render_seconds", time.perf_counter() - started)
+
+        # 暂停时画面静止，继续时再重新安排刷新
+        if not self.paused:
+            self.schedule_render()
+
+    def update_widget(self, widget, option, value):
+        """仅当值变化时才写入控件，减少 Tcl 调用"""
+        key = (str(widget), option)
+        if self.rendered.get(key) != value:
+            self.rendered[key] = value
+            widget[option] = value
+
+    def on_window_unmap(self, event):
+        """窗口最小化时停止界面刷新"""
+        if event.widget is self.root:
+            self.window_visible = False
+            if self.render_job is not None:
+                self.root.after_cancel(self.render_job)
+                self.render_job = None
+
+    def on_window_map(self, event):
+        """窗口恢复时立即刷新一次"""
+        if event.widget is self.root and not self.window_visible:
+            self.window_visible = True
+            self.schedule_render(0)
 
     
     def close_sound_settings(self):
         """关闭提示音设置窗口并停止音乐播放"""
-        pygame.mixer.music.stop()  # 停止当前播放的音频
+        self.audio.stop_preview()  # 停止当前播放的音频
         if hasattr(self, 'sound_window') and self.sound_window.winfo_exists():
             self.sound_window.destroy()
 
     def reset_timer_ui(self):
-        """重置计时器结束时的UI状态"""
-        self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
-        self.root.after(0, lambda: self.main_button.config(text="开始"))
+        """重置计时器结束时的UI状态（在 Tk 线程中调用）"""
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
         self.main_button_state = "ready"
-        self.status_label.config(text="状态: 就绪")
-        self.total_progress["value"] = 0
-        self.stage_progress["value"] = 0
+        self.update_widget(self.main_button, "text", "开始")
+        self.update_widget(self.main_button, "state", tk.NORMAL)
+        self.update_widget(self.stop_button, "state", tk.DISABLED)
+        self.update_widget(self.status_label, "text", "状态: 就绪")
+        self.update_widget(self.total_time_label, "text", "00:00:00")
+        self.update_widget(self.stage_time_label, "text", "00:00:00")
+        self.update_widget(self.break_time_label, "text", "00:00:00")
+        self.update_widget(self.total_progress, "value", 0)
+        self.update_widget(self.stage_progress, "value", 0)
+
+    # ---------- 小组同步 ----------
+
+    def host_group(self):
+        """作为协调者在局域网发布本机的会话，之后开始的计时会同步到所有成员"""
+        from group_sync import DEFAULT_PORT, GroupCoordinator
+
+        if self.group_coordinator is not None:
+            messagebox.showinfo("小组", "本机已经是小组协调者")
+            return
+        port = simpledialog.askinteger("发起小组会话", "UDP 端口：", parent=self.root,
+                                       initialvalue=DEFAULT_PORT, minvalue=1, maxvalue=65535)
+        if port is None:
+            return
+        self.leave_group()
+        coordinator = GroupCoordinator(self.group_session)
+        try:
+            coordinator.serve(port=port)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法监听端口 {port}: {str(e)}")
+            return
+        self.group_coordinator = coordinator
+        messagebox.showinfo("小组", f"成员请加入 {socket.gethostname()}:{port}。\n"
+                                    f"按“开始”后所有成员将在 {GROUP_START_DELAY:g} 秒后同时开始。")
+
+    def group_session(self):
+        """协调者发布的当前会话（在小组服务线程中调用）"""
+        with self.timer_lock:
+            if not self.timer_running or self.session_seed is None:
+                return None
+            session = {"version": self.session_seed, "config": self.session_config, "seed": self.session_seed,
+                       "start": self.session_start, "paused": self.paused}
+            if self.paused:
+                # 暂停期间开始时刻尚未顺延，另外发布冻结的已用时间
+                session["elapsed"] = self.pause_started - self.session_start
+            return session
+
+    def join_group(self):
+        """作为成员跟随协调者的会话"""
+        address = simpledialog.askstring("加入小组会话", "协调者地址（主机 或 主机:端口）：", parent=self.root)
+        if not address or not address.strip():
+            return
+        from group_sync import GroupClient, GroupError, UdpTransport, parse_address
+
+        try:
+            host, port = parse_address(address)
+        except GroupError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        self.leave_group()
+        self.group_client = GroupClient(UdpTransport(host, port))
+        threading.Thread(target=self.run_group_client, args=(self.group_client,), daemon=True).start()
+
+    def run_group_client(self, client):
+        """后台线程：先测量一次时钟偏移，成功后开始跟随"""
+        from group_sync import GroupError
+
+        try:
+            offset, delay = client.sync()
+        except GroupError as e:
+            self.root.after(0, lambda: messagebox.showerror("错误", f"加入小组失败: {str(e)}"))
+            self.root.after(0, self.leave_group)
+            return
+        print(f"已加入小组：时钟偏移 {offset * 1000:+.1f} ms，往返延迟 {delay * 1000:.1f} ms")
+        client.follow(lambda session: self.root.after(0, self.apply_group_session, client, session))
+
+    def apply_group_session(self, client, session):
+        """按协调者发布的会话调整本地计时（在 Tk 线程中调用）"""
+        if client is not self.group_client:
+            return  # 已退出或换了协调者
+        if session is None:
+            if self.group_version is not None and self.timer_running:
+                self.stop_timer()
+            self.group_version = None
+            return
+        now = time.monotonic()
+        if not self.timer_running or session["version"] != self.group_version:
+            try:
+                config = validate(session["config"])
+            except ConfigError as e:
+                print(f"小组会话的配置无效: {str(e)}")
+                return
+            if self.timer_running:
+                self.stop_timer()
+            self.group_version = session["version"]
+            elapsed = session["elapsed"] if session["paused"] else now - session["local_start"]
+            self.begin_session(config, session["seed"], elapsed, session["paused"])
+            return
+        if session["paused"] != self.paused:
+            self.handle_main_button()  # 跟随协调者暂停 / 继续
+        if session["paused"]:
+            return  # 继续后协调者发布顺延后的开始时刻，届时再对齐
+        # 以协调者的开始时刻为准（重新测量偏移或协调者继续计时后会变化）
+        with self.timer_lock:
+            delta = session["local_start"] - self.session_start
+        if abs(delta) > 0.001:
+            self.shift_session_start(delta)
+            self.lifecycle.wake()
+            self.schedule_render(0)
+
+    def leave_group(self):
+        """停止协调者或成员（本地计时继续）"""
+        if self.group_coordinator is not None:
+            self.group_coordinator.stop()
+            self.group_coordinator = None
+        if self.group_client is not None:
+            client, self.group_client = self.group_client, None
+            threading.Thread(target=client.stop, daemon=True).start()
+        self.group_version = None
 
     def check_notification_audio_files(self):
         """检查 notification 文件夹中是否有任一音频文件"""
-        base_path = os.path.join(os.getcwd(), "notification")
-        subfolders = ["notis", "pause"]
-        for sub in subfolders:
-            folder = os.path.join(base_path, sub)
-            if os.path.isdir(folder):
-                files = [f for f in os.listdir(folder) if f.lower().endswith(('.mp3', '.wav'))]
-                if files:
-                    return True  # 有至少一个音频文件
-        return False
+        return self.library.has_any()
+
+    def on_sound_files_changed(self, changes):
+        """音频文件被修改或删除时丢弃旧的解码缓存，运行期间新增或变化的文件在后台导入（在监视线程中调用）"""
+        for kind, info in changes:
+            if kind != "added":
+                self.audio.cache.invalidate(info.path)
+        # 首次扫描报告的是全部已有文件，不为此在每次启动时创建进程池；已有文件用 audio_import.py 处理
+        if self.library.ready.is_set():
+            self.audio.import_sounds([info.path for kind, info in changes if kind != "removed"])
     
     def handle_main_button(self):
         if self.main_button_state == "ready":
             self.start_timer()
-            self.main_button.config(text="暂停")
-            self.main_button_state = "running"
         elif self.main_button_state == "running":
-            self.paused = True
-            pygame.mixer.music.stop()
-            self.status_label.config(text=f"状态: 已暂停 - {self.get_state_label()}")
-            self.main_button.config(text="继续")
+            with self.timer_lock:
+                # 暂停时刻与暂停标志一起设置，计时线程不会读到旧的暂停时刻
+                self.pause_started = time.monotonic()
+                self.paused = True
+                self.audio_scheduler.cancel()
+            self.journal.checkpoint(self.session_elapsed(), paused=True, boundary=True)
+            self.audio.stop_preview()
+            self.update_widget(self.status_label, "text", f"状态: 已暂停 - {self.get_state_label()}")
+            self.update_widget(self.main_button, "text", "继续")
             self.main_button_state = "paused"
+            self.publish("paused")
         elif self.main_button_state == "paused":
-            self.paused = False
-            self.status_label.config(text=f"状态: 计时中 - {self.get_state_label()}")
-            self.main_button.config(text="暂停")
+            with self.timer_lock:
+                # 暂停期间的时长整体顺延到会话起点上
+                self.session_start += time.monotonic() - self.pause_started
+                self.paused = False
+            self.journal.checkpoint(self.session_elapsed(), boundary=True)
+            self.lifecycle.wake()
+            self.update_widget(self.main_button, "text", "暂停")
             self.main_button_state = "running"
+            self.schedule_render(0)
+            self.publish("resumed")
 
 # 使用说明内容
 instruction_text = """
@@ -770,6 +1264,21 @@ instruction_text = """
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = TimerApp(root)
+    # 打包成 .exe 后，导入提示音的进程池子进程不会再次启动界面
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器")
+    parser.add_argument("--control-port", type=int, default=None,
+                        help="在 127.0.0.1 的该端口启动本地控制接口（HTTP）")
+    parser.add_argument("--metrics", action="store_true",
+                        help="启动时开启热路径指标（也可在 F12 调试面板中开启）")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="打印启动各步骤（导入、混音器、界面、配置等）的耗时")
+    args = parser.parse_args()
+
+    startup = StartupProfile(STARTUP_ORIGIN)
+    with startup.phase("创建窗口"):
+        root = tk.Tk()
+    app = TimerApp(root, control_port=args.control_port, metrics=args.metrics, startup=startup)
+    if args.profile_startup:
+        threading.Thread(target=app.print_startup_report, daemon=True).start()
     root.mainloop()
\ No newline at end of file
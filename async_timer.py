@@ -0,0 +1,166 @@
+"""
+asyncio 版计时核心：同一条预先生成的时间线，以异步迭代器的形式输出带类型的事件。
+
+    timer = AsyncTimer(config, seed=42)
+    async for event in timer.events():
+        ...  # PhaseStarted / Reminder / SessionEnded
+
+pause()/resume()/cancel() 都是协程，可以在同一事件循环中的其他任务里 await；
+不需要为每个计时器开线程。Tk 界面通过 TkBridge 在后台线程运行事件循环并在 Tk 线程中接收事件。
+"""
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from timer_engine import build_timeline
+
+
+@dataclass(frozen=True)
+class PhaseStarted:
+    """进入新阶段（stage / stage_break）"""
+    phase: str
+    offset: float
+    sound: str
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """随机提醒，随后进入短休息"""
+    offset: float
+    sound: str
+
+
+@dataclass(frozen=True)
+class SessionEnded:
+    """会话结束；cancelled=True 表示被取消而非总计时结束"""
+    offset: float
+    cancelled: bool = False
+
+
+class AsyncTimer:
+    """一个会话的异步计时器"""
+
+    def __init__(self, config, seed=None, clock=time.monotonic):
+        self.timeline = build_timeline(config, seed)
+        self.clock = clock
+        self.start = None
+        self.index = 0
+        self.paused_at = None
+        self.cancelled = False
+        self.changed = None  # 暂停/继续/取消时唤醒 events()
+
+    def elapsed(self):
+        if self.start is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else self.clock()
+        return now - self.start
+
+    def state(self):
+        """当前状态（timer_engine.SessionState）"""
+        return self.timeline.state_at(self.elapsed(), self.index)
+
+    def make_event(self, index):
+        offset, phase, sound = self.timeline.entry(index)
+        if phase == "finished":
+            return SessionEnded(offset)
+        if sound == "random":
+            return Reminder(offset, sound)
+        return PhaseStarted(phase, offset, sound)
+
+    async def events(self):
+        """按时间顺序输出事件，直到会话结束或被取消"""
+        self.changed = asyncio.Event()
+        self.start = self.clock()
+        yield self.make_event(0)
+        while True:
+            if self.cancelled:
+                yield SessionEnded(self.elapsed(), cancelled=True)
+                return
+            if self.paused_at is not None:
+                timeout = None
+            else:
+                next_offset = self.timeline.next_offset(self.index)
+                if next_offset is None:
+                    return
+                timeout = next_offset - self.elapsed()
+            if timeout is None or timeout > 0:
+                # 睡到下一个截止点，或被暂停/继续/取消提前唤醒
+                try:
+                    await asyncio.wait_for(self.changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self.changed.clear()
+                continue
+
+            previous = self.index
+            self.index = self.timeline.index_at(self.elapsed(), previous)
+            for i in range(previous + 1, self.index + 1):
+                yield self.make_event(i)
+
+    async def pause(self):
+        """暂停，返回暂停时的状态"""
+        if self.paused_at is None and self.start is not None:
+            self.paused_at = self.clock()
+            self.notify()
+        return self.state()
+
+    async def resume(self):
+        """继续，暂停的时长整体顺延"""
+        if self.paused_at is not None:
+            self.start += self.clock() - self.paused_at
+            self.paused_at = None
+            self.notify()
+        return self.state()
+
+    async def cancel(self):
+        """取消会话，events() 输出 SessionEnded(cancelled=True) 后结束"""
+        self.cancelled = True
+        self.notify()
+
+    def notify(self):
+        if self.changed is not None:
+            self.changed.set()
+
+
+class TkBridge:
+    """在后台线程中运行 AsyncTimer，事件通过队列在 Tk 线程中交给 callback(event)"""
+
+    def __init__(self, root, timer, callback, poll_ms=50):
+        self.root = root
+        self.timer = timer
+        self.callback = callback
+        self.poll_ms = poll_ms
+        self.queue = queue.Queue()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.poll()
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.consume())
+        self.loop.close()
+
+    async def consume(self):
+        async for event in self.timer.events():
+            self.queue.put(event)
+
+    def poll(self):
+        """在 Tk 线程中取出事件，会话结束后停止轮询"""
+        while True:
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.callback(event)
+            if isinstance(event, SessionEnded):
+                return
+        self.root.after(self.poll_ms, self.poll)
+
+    def call(self, coro):
+        """从 Tk 线程调用 pause()/resume()/cancel() 等协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
@@ -0,0 +1,106 @@
+"""
+已解码音频的 LRU 缓存：按 (路径, 修改时间, 文件大小) 作为键，按字节预算淘汰最久未使用的音频。
+
+同名文件被替换后修改时间或大小会变化，旧的解码结果随之失效。
+"""
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_key(path):
+    """缓存键：路径 + 修改时间（纳秒）+ 文件大小"""
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+class AudioCache:
+    """带字节预算的 LRU 缓存，线程安全"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.entries = OrderedDict()  # 键 -> (音频对象, 字节数)，末尾为最近使用
+        self.latest = {}              # 路径 -> 当前有效的键
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """按键查找，命中时移到最近使用"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_latest(self, path):
+        """按路径查找当前有效的音频，不访问磁盘"""
+        with self.lock:
+            key = self.latest.get(path)
+        if key is None:
+            with self.lock:
+                self.misses += 1
+            return None
+        return self.get(key)
+
+    def put(self, key, value, size):
+        """放入缓存并淘汰超出预算的旧项；单个音频超过预算时不缓存，返回 False"""
+        path = key[0]
+        with self.lock:
+            old_key = self.latest.get(path)
+            if old_key is not None and old_key != key:
+                # 文件已被替换，旧的解码结果作废
+                self.remove(old_key)
+            if size > self.budget:
+                return False
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (value, size)
+            self.latest[path] = key
+            self.bytes += size
+            self.evict()
+            return True
+
+    def invalidate(self, path):
+        """移除某个路径的缓存（文件被删除或修改时调用）"""
+        with self.lock:
+            key = self.latest.get(path)
+            if key is not None:
+                self.remove(key)
+
+    def set_budget(self, budget):
+        """调整字节预算，立即淘汰超出部分"""
+        with self.lock:
+            self.budget = budget
+            self.evict()
+
+    def stats(self):
+        """命中/未命中/淘汰次数及占用，用于调整预算"""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "budget": self.budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # 以下方法需在持有锁时调用
+
+    def remove(self, key):
+        _, size = self.entries.pop(key)
+        self.bytes -= size
+        if self.latest.get(key[0]) == key:
+            del self.latest[key[0]]
+
+    def evict(self):
+        while self.bytes > self.budget and self.entries:
+            key = next(iter(self.entries))
+            self.remove(key)
+            self.evictions += 1
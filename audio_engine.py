@@ -0,0 +1,241 @@
+"""
+音频引擎：后台预先解码所有已配置的提示音，播放时只从内存中取出并在专用声道上播放。
+
+- 每种提示音事件（start/random/stage_break_start/total_end）占用一个保留声道，互不打断；
+- 试听使用单独的保留声道，并与提醒共用同一个已解码的音频库；
+- 播放只读取文件的修改时间和大小（一次 stat，不解码）、不阻塞调用线程，未预加载或已变化的文件会在后台解码后再播放；
+- 已解码音频存放在按字节预算淘汰的 LRU 缓存中，文件被替换后自动重新解码；
+- 已由 audio_import 处理过的文件直接读取磁盘上的 PCM 缓存，不再解码；
+- pygame 在初始化混音器时才导入；初始化可以在后台线程中进行，完成前的播放请求等初始化完成后再播放。
+"""
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+from audio_cache import AudioCache, file_key
+from metrics import Metrics
+
+# 每种提示音事件对应的保留声道编号，试听使用最后一个保留声道
+EVENT_CHANNELS = {"start": 0, "random": 1, "stage_break_start": 2, "total_end": 3}
+PREVIEW_CHANNEL = len(EVENT_CHANNELS)
+
+# 混音器参数：较小的缓冲区可以降低出声延迟（512 采样 @ 44.1kHz ≈ 11.6 毫秒）
+MIXER_FREQUENCY = 44100
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+# 已解码音频缓存的默认字节预算
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def sound_folder(sound_type):
+    """提示音事件对应的子文件夹"""
+    return "notis" if sound_type in ["start", "random"] else "pause"
+
+
+class AudioEngine:
+    """提示音的预加载、缓存和播放"""
+
+    def __init__(self, base_dir="notification", budget=DEFAULT_BUDGET):
+        self.base_dir = base_dir
+        self.pygame = None
+        self.ready = threading.Event()  # 混音器初始化结束（成功或失败）
+        self.channels = {}
+        self.cache = AudioCache(budget)  # 已解码的 Sound
+        self.pcm = None                  # 处理后的 PCM 磁盘缓存，混音器初始化后按实际格式创建
+        self.pcm_lock = threading.Lock()  # 保护 pcm 和 target_dbfs，混音器初始化在后台线程中进行
+        self.target_dbfs = None          # 响度目标，None 为 audio_import 的默认值
+        # 播放请求→声道开始播放 的耗时；实际出声还要再加上混音器缓冲区的时长
+        self.metrics = Metrics()
+
+    # ---------- 初始化 ----------
+
+    def init_mixer(self, startup=None):
+        """导入 pygame 并初始化低延迟混音器，预留每种事件的声道；结束后设置 ready
+
+        startup 为 StartupProfile 时分别记录导入和初始化的耗时。
+        """
+        if self.pygame is not None:
+            return
+        phase = startup.phase if startup is not None else lambda name: nullcontext()
+        try:
+            with phase("导入 pygame"):
+                try:
+                    import pygame
+                except ImportError as e:
+                    print(f"无法导入 pygame，提示音不可用: {str(e)}")
+                    return
+            with phase("初始化混音器"):
+                self.start_mixer(pygame)
+        except Exception as e:
+            print(f"初始化混音器失败: {str(e)}")
+        finally:
+            self.ready.set()
+
+    def start_mixer(self, pygame):
+        pygame.mixer.pre_init(MIXER_FREQUENCY, -16, MIXER_CHANNELS, MIXER_BUFFER)
+        pygame.mixer.init()
+        reserved = PREVIEW_CHANNEL + 1
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + 4))
+        pygame.mixer.set_reserved(reserved)
+        self.channels = {index: pygame.mixer.Channel(index) for index in range(reserved)}
+        frequency, size, channels = pygame.mixer.get_init()
+        if size == -16:
+            with self.pcm_lock:
+                self.pcm = self.new_pcm_cache(frequency, channels)
+        self.pygame = pygame
+
+    def new_pcm_cache(self, frequency, channels):
+        """按混音器的实际格式和当前响度目标创建 PCM 磁盘缓存（需持有 pcm_lock）"""
+        # 只在需要时导入，缺少 audioop 也不影响读取已有的缓存和播放
+        from audio_import import TARGET_DBFS, PcmCache, PcmFormat
+        target = TARGET_DBFS if self.target_dbfs is None else self.target_dbfs
+        return PcmCache(PcmFormat(frequency, channels, target))
+
+    def set_target_db(self, target_dbfs, paths=()):
+        """设置提示音导入的响度目标（config.json 的 audio_target_db）；混音器已就绪且目标变化时按新目标重新导入 paths"""
+        with self.pcm_lock:
+            if target_dbfs == self.target_dbfs:
+                return
+            self.target_dbfs = target_dbfs
+            if self.pcm is None:
+                return
+            self.pcm = self.new_pcm_cache(self.pcm.fmt.frequency, self.pcm.fmt.channels)
+        self.import_sounds(paths)
+
+    def sound_path(self, sound_type, sound_file):
+        """提示音文件的完整路径"""
+        return os.path.join(self.base_dir, sound_folder(sound_type), sound_file)
+
+    def configured_paths(self, sounds):
+        """配置中所有提示音文件的路径"""
+        paths = []
+        for sound_type, value in sounds.items():
+            files = value if isinstance(value, list) else [value]
+            paths.extend(self.sound_path(sound_type, f) for f in files if f)
+        return paths
+
+    # ---------- 预加载 ----------
+
+    def preload(self, sounds):
+        """在后台线程中解码配置中的所有提示音"""
+        paths = self.configured_paths(sounds)
+        threading.Thread(target=self.load_all, args=(paths,), daemon=True).start()
+
+    def load_all(self, paths):
+        self.ready.wait()
+        if self.pygame is None:
+            return
+        for path in paths:
+            self.load(path)
+
+    def load(self, path):
+        """确保文件的最新版本已解码并缓存；返回 Sound 或 None"""
+        try:
+            key = file_key(path)
+        except OSError:
+            print(f"音频文件未找到: {path}")
+            self.cache.invalidate(path)
+            return None
+        sound = self.cache.get(key)
+        if sound is not None:
+            return sound
+        pcm = self.pcm.read(key) if self.pcm is not None else None
+        try:
+            if pcm is not None:
+                sound = self.pygame.mixer.Sound(buffer=pcm)
+            else:
+                sound = self.pygame.mixer.Sound(path)
+        except Exception as e:
+            print(f"解码音频失败: {path} {str(e)}")
+            return None
+        if not self.cache.put(key, sound, self.sound_bytes(sound)):
+            print(f"音频超过缓存预算，不缓存: {path}")
+        return sound
+
+    def import_sounds(self, paths):
+        """在后台把新增或变化的文件处理成 PCM 缓存，已加载的旧版本随后被替换"""
+        threading.Thread(target=self.run_import, args=(paths,), daemon=True).start()
+
+    def run_import(self, paths):
+        self.ready.wait()  # 缓存格式取决于混音器的实际格式
+        if self.pcm is None:
+            return
+        try:
+            imported = self.pcm.import_files(paths)
+        except ImportError as e:
+            print(f"无法导入提示音，使用原始文件: {str(e)}")
+            return
+        for path in imported:
+            if self.cache.get_latest(path) is not None:
+                self.cache.invalidate(path)
+                self.load(path)
+
+    def sound_bytes(self, sound):
+        """按混音器格式估算已解码音频占用的字节数"""
+        frequency, size, channels = self.pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+    # ---------- 播放 ----------
+
+    def play(self, sound_type, sound_file):
+        """在事件的专用声道上播放提示音，不阻塞调用线程"""
+        if not sound_file:
+            return
+        path = self.sound_path(sound_type, sound_file)
+        self.play_path(path, EVENT_CHANNELS.get(sound_type, 0))
+
+    def prepare(self, sound_type, sound_file):
+        """提前取出要播放的音频（文件被替换时重新加载），失败时返回 None；由预先安排的播放调用"""
+        return self.load(self.sound_path(sound_type, sound_file))
+
+    def preview(self, path, key=None):
+        """在试听声道上播放，使用同一个音频库；key 为音频库索引中的 file_key，给出时不访问磁盘"""
+        self.play_path(path, PREVIEW_CHANNEL, key)
+
+    def play_path(self, path, channel_index, key=None):
+        requested = time.perf_counter()
+        if self.pygame is None:
+            if not self.ready.is_set():
+                # 混音器仍在后台初始化：初始化完成后再播放
+                threading.Thread(target=self.load_and_play, args=(path, channel_index, requested), daemon=True).start()
+            return
+        # 只做一次 stat：文件被替换后键随之变化，不会播放旧版本（不解码）
+        try:
+            key = key or file_key(path)
+        except OSError:
+            print(f"音频文件未找到: {path}")
+            self.cache.invalidate(path)
+            return
+        sound = self.cache.get(key)
+        if sound is None:
+            # 未预加载、已被淘汰或文件已变化：在后台解码后再播放，调用线程不等待解码
+            print(f"音频未缓存，后台解码: {path}")
+            threading.Thread(target=self.load_and_play, args=(path, channel_index, requested), daemon=True).start()
+            return
+        self.channels[channel_index].play(sound)
+        metrics = self.metrics
+        if metrics.enabled:
+            metrics.observe("audio_start_seconds", time.perf_counter() - requested)
+
+    def load_and_play(self, path, channel_index, requested):
+        self.ready.wait()
+        if self.pygame is None:
+            return
+        sound = self.load(path)
+        if sound is not None:
+            self.channels[channel_index].play(sound)
+            metrics = self.metrics
+            if metrics.enabled:
+                metrics.observe("audio_start_seconds", time.perf_counter() - requested)
+
+    def stop_preview(self):
+        """停止试听"""
+        if self.pygame is not None:
+            self.channels[PREVIEW_CHANNEL].stop()
+
+    def stop_all(self):
+        """停止所有声道（程序退出前调用）"""
+        if self.pygame is not None:
+            self.pygame.mixer.stop()
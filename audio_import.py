@@ -0,0 +1,325 @@
+"""
+提示音导入：把 notification 下新增或变化的音频离线处理成混音器格式的 PCM 缓存。
+
+- 在进程池中并行处理：wav 用标准库 wave 解码，其他格式（mp3）用 pygame 的解码器；
+- 去掉首尾静音，把响度（RMS）归一到统一的目标值（峰值不超过上限），
+  再转换为混音器的采样率、声道数和 16 位采样；
+- 结果按 文件内容哈希 + 处理参数 存在 sound_cache/ 下，同样内容的文件只处理一次；
+- 运行时只需读出原始 PCM 交给 mixer.Sound(buffer=...)，不再解码，播放时也不做任何处理。
+
+也可以手动运行（响度目标读取 config.json 的 audio_target_db，与程序使用同一缓存）：
+    python audio_import.py            # 处理新增或变化的文件
+    python audio_import.py --force    # 全部重新处理
+"""
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import warnings
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+from config_store import DEFAULT_CONFIG, ConfigError, load_config, write_atomic
+from sound_library import AUDIO_EXTENSIONS, SOUND_FOLDERS, file_checksum
+
+with warnings.catch_warnings():
+    # audioop 在 Python 3.13 中移除，需要安装 audioop-lts；没有时只能读取已有的缓存，不能导入
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:
+        audioop = None
+
+PCM_CACHE_DIR = "sound_cache"
+INDEX_FILE = "index.json"
+
+# 处理流程有变化时加一，旧的缓存随之失效
+PIPELINE_VERSION = 1
+
+SAMPLE_WIDTH = 2          # 16 位采样
+TARGET_DBFS = -20.0       # 响度归一的默认目标 RMS（config.json 的 audio_target_db）
+PEAK_DBFS = -1.0          # 归一后峰值的上限
+SILENCE_DBFS = -50.0      # 低于该峰值的首尾片段视为静音
+WINDOW_SECONDS = 0.01     # 静音检测的窗口长度
+FULL_SCALE = 32767
+
+
+def db_to_amplitude(db):
+    return FULL_SCALE * 10 ** (db / 20)
+
+
+class PcmFormat:
+    """PCM 缓存的格式和处理参数"""
+
+    def __init__(self, frequency, channels, target_dbfs=TARGET_DBFS):
+        self.frequency = frequency
+        self.channels = channels
+        self.target_dbfs = float(target_dbfs)  # -20 与 -20.0 对应同一个缓存文件
+
+    @property
+    def tag(self):
+        """参与缓存文件命名的参数，任一变化都会重新处理"""
+        return f"v{PIPELINE_VERSION}:{self.frequency}:{self.channels}:{self.target_dbfs}:{SILENCE_DBFS}:{PEAK_DBFS}"
+
+    def cache_name(self, checksum):
+        digest = hashlib.blake2b(f"{checksum}:{self.tag}".encode("ascii"), digest_size=16)
+        return digest.hexdigest() + ".pcm"
+
+
+# ---------- 处理流程（在子进程中运行） ----------
+
+_mixer_format = None  # 子进程中 pygame 混音器已初始化的格式
+
+
+def decode_with_pygame(path, fmt):
+    """用 pygame 解码 wav 以外的格式，直接得到混音器格式的 16 位 PCM"""
+    global _mixer_format
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # 子进程只解码，不打开声卡
+    import pygame
+
+    if _mixer_format != (fmt.frequency, fmt.channels):
+        pygame.mixer.quit()
+        pygame.mixer.init(fmt.frequency, -16, fmt.channels, allowedchanges=0)
+        _mixer_format = (fmt.frequency, fmt.channels)
+    return pygame.mixer.Sound(path).get_raw(), fmt.frequency, fmt.channels
+
+
+def decode_wav(path):
+    """用标准库读取 wav，返回 (16 位 PCM, 采样率, 声道数)"""
+    with wave.open(path, "rb") as w:
+        width = w.getsampwidth()
+        channels = w.getnchannels()
+        rate = w.getframerate()
+        frames = w.readframes(w.getnframes())
+    if width == 1:
+        frames = audioop.bias(frames, 1, -128)  # 8 位 wav 为无符号采样
+    if width != SAMPLE_WIDTH:
+        frames = audioop.lin2lin(frames, width, SAMPLE_WIDTH)
+    return frames, rate, channels
+
+
+def convert_format(frames, rate, channels, fmt):
+    """转换声道数和采样率"""
+    if channels != fmt.channels:
+        if channels == 1 and fmt.channels == 2:
+            frames = audioop.tostereo(frames, SAMPLE_WIDTH, 1, 1)
+        elif channels == 2 and fmt.channels == 1:
+            frames = audioop.tomono(frames, SAMPLE_WIDTH, 0.5, 0.5)
+        else:
+            raise ValueError(f"不支持的声道数: {channels}")
+    if rate != fmt.frequency:
+        frames, _ = audioop.ratecv(frames, SAMPLE_WIDTH, fmt.channels, rate, fmt.frequency, None)
+    return frames
+
+
+def trim_silence(frames, fmt):
+    """按窗口峰值去掉首尾静音，两端各保留一个窗口"""
+    frame_bytes = SAMPLE_WIDTH * fmt.channels
+    window = max(1, int(fmt.frequency * WINDOW_SECONDS)) * frame_bytes
+    threshold = db_to_amplitude(SILENCE_DBFS)
+    count = (len(frames) + window - 1) // window
+
+    def loud(i):
+        return audioop.max(frames[i * window:(i + 1) * window], SAMPLE_WIDTH) > threshold
+
+    start = next((i for i in range(count) if loud(i)), None)
+    if start is None:
+        return b""
+    end = next(i for i in range(count - 1, start - 1, -1) if loud(i))
+    return frames[max(0, start - 1) * window:(end + 2) * window]
+
+
+def normalize(frames, fmt):
+    """把 RMS 调到目标值，增益受峰值上限约束；返回 (PCM, 增益 dB)"""
+    rms = audioop.rms(frames, SAMPLE_WIDTH)
+    peak = audioop.max(frames, SAMPLE_WIDTH)
+    if not rms or not peak:
+        return frames, 0.0
+    gain = min(db_to_amplitude(fmt.target_dbfs) / rms, db_to_amplitude(PEAK_DBFS) / peak)
+    return audioop.mul(frames, SAMPLE_WIDTH, gain), round(20 * math.log10(gain), 2)
+
+
+def process_file(path, fmt, cache_dir, force=False):
+    """处理一个文件并写入缓存，返回索引记录；在进程池中调用"""
+    st = os.stat(path)
+    checksum = file_checksum(path)
+    name = fmt.cache_name(checksum)
+    entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "checksum": checksum, "gain_db": 0.0}
+    target = os.path.join(cache_dir, name)
+    if os.path.exists(target) and not force:
+        entry["reused"] = True  # 相同内容已处理过
+        return entry
+
+    if path.lower().endswith(".wav"):
+        frames, rate, channels = decode_wav(path)
+        frames = convert_format(frames, rate, channels, fmt)
+    else:
+        frames, _, _ = decode_with_pygame(path, fmt)
+    frames = trim_silence(frames, fmt)
+    frames, entry["gain_db"] = normalize(frames, fmt)
+
+    tmp_path = target + f".{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(frames)
+    os.replace(tmp_path, target)
+    return entry
+
+
+# ---------- 缓存索引（在主进程中使用） ----------
+
+class PcmCache:
+    """已处理音频的磁盘缓存：路径 -> (修改时间, 大小, 内容哈希)，按内容哈希和处理参数命名缓存文件"""
+
+    def __init__(self, fmt, cache_dir=PCM_CACHE_DIR):
+        self.fmt = fmt
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.index = {}
+        self.lock = threading.Lock()
+        self.import_lock = threading.Lock()  # 同一时间只运行一次导入
+        self.load_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        with self.lock:
+            self.index = index if isinstance(index, dict) else {}
+
+    def save_index(self):
+        with self.lock:
+            text = json.dumps(self.index, ensure_ascii=False, indent=1)
+        write_atomic(self.index_path, text)
+
+    def cache_path(self, path, mtime_ns, size):
+        """文件当前版本对应的缓存文件路径，未处理或已变化时返回 None"""
+        with self.lock:
+            entry = self.index.get(path)
+        if entry is None or entry["mtime_ns"] != mtime_ns or entry["size"] != size:
+            return None
+        return os.path.join(self.cache_dir, self.fmt.cache_name(entry["checksum"]))
+
+    def read(self, key):
+        """按 audio_cache.file_key 的键读出处理后的 PCM，没有缓存时返回 None"""
+        target = self.cache_path(*key)
+        if target is None:
+            return None
+        try:
+            with open(target, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def pending(self, paths):
+        """需要（重新）处理的文件"""
+        result = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            target = self.cache_path(path, st.st_mtime_ns, st.st_size)
+            if target is None or not os.path.exists(target):
+                result.append(path)
+        return result
+
+    def import_files(self, paths, workers=None, force=False):
+        """在进程池中处理新增或变化的文件，返回 {路径: 索引记录或错误信息}；没有 audioop 时抛出 ImportError"""
+        if audioop is None:
+            raise ImportError("缺少 audioop（Python 3.13 及以上请安装 audioop-lts）")
+        with self.import_lock:
+            todo = list(paths) if force else self.pending(paths)
+            if not todo:
+                return {}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            results = {}
+            with ProcessPoolExecutor(max_workers=min(len(todo), workers or os.cpu_count() or 1)) as pool:
+                futures = {path: pool.submit(process_file, path, self.fmt, self.cache_dir, force) for path in todo}
+                for path, future in futures.items():
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        print(f"处理音频失败: {path} {str(e)}")
+                        results[path] = str(e)
+                        continue
+                    with self.lock:
+                        self.index[path] = entry
+                    results[path] = entry
+            self.save_index()
+            self.prune()
+            return results
+
+    def prune(self):
+        """删除索引中已不再引用的缓存文件"""
+        with self.lock:
+            keep = {self.fmt.cache_name(entry["checksum"]) for entry in self.index.values()}
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".pcm") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+def library_paths(base_dir="notification"):
+    """notification 下的全部音频文件"""
+    paths = []
+    for folder in SOUND_FOLDERS:
+        try:
+            names = sorted(os.listdir(os.path.join(base_dir, folder)))
+        except OSError:
+            continue
+        paths.extend(os.path.join(base_dir, folder, n) for n in names if n.lower().endswith(AUDIO_EXTENSIONS))
+    return paths
+
+
+def main(argv=None):
+    from audio_engine import MIXER_CHANNELS, MIXER_FREQUENCY
+
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（提示音导入）")
+    parser.add_argument("--config", default="config.json", help="配置文件路径（读取 audio_target_db），默认 config.json")
+    parser.add_argument("--base-dir", default="notification", help="提示音文件夹，默认 notification")
+    parser.add_argument("--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("--force", action="store_true", help="忽略已有缓存，全部重新处理")
+    args = parser.parse_args(argv)
+
+    # 格式和响度目标必须与程序一致，否则缓存文件名不同，双方的 prune() 会删除对方的文件
+    try:
+        config = load_config(args.config)
+    except FileNotFoundError:
+        config = DEFAULT_CONFIG
+    except (OSError, ConfigError) as e:
+        print(f"错误: 加载配置文件失败: {str(e)}", file=sys.stderr)
+        return 2
+    target = config.get("audio_target_db", DEFAULT_CONFIG["audio_target_db"])
+    cache = PcmCache(PcmFormat(MIXER_FREQUENCY, MIXER_CHANNELS, target))
+    try:
+        results = cache.import_files(library_paths(args.base_dir), args.workers, args.force)
+    except ImportError as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+    if not results:
+        print("没有需要处理的文件")
+    failed = 0
+    for path, entry in results.items():
+        if isinstance(entry, str):
+            failed += 1
+            print(f"失败  {path}: {entry}")
+        else:
+            print(f"{'复用' if entry.get('reused') else '完成'}  {path}  增益 {entry['gain_db']:+.1f} dB")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
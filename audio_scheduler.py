@@ -0,0 +1,121 @@
+"""
+预先安排的提示音：计时线程把时间线上下一个截止点的提示音提前交给专用的音频线程。
+
+- 截止点前 LEAD_SECONDS 取出（必要时解码）要播放的音频，检查文件是否被替换；
+- 之后等待到截止点前 SPIN_SECONDS，最后一小段忙等，到点立即在事件的保留声道上播放；
+- 暂停或重置时取消尚未播放的安排，继续后由计时线程按顺延后的截止点重新安排；
+- 计时线程处理到期事件时，已安排或已播放的提示音不再重复播放；
+  休眠等原因导致错过截止点超过 grace 秒的安排会被丢弃，交还给计时线程按追赶规则处理。
+"""
+import sys
+import threading
+import time
+
+from audio_engine import EVENT_CHANNELS
+
+LEAD_SECONDS = 0.3
+# Windows 默认的计时器精度约 15.6 毫秒，最后一段改为忙等
+SPIN_SECONDS = 0.016 if sys.platform == "win32" else 0.002
+
+
+class AudioScheduler:
+    """按截止时刻播放提示音的专用线程"""
+
+    def __init__(self, audio, grace=2.0, clock=time.monotonic):
+        self.audio = audio
+        self.grace = grace
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.armed = {}     # 键 -> [截止时刻, 提示音事件, 文件名, 已准备的 Sound]
+        self.fired = set()  # 本次会话已播放的键
+        self.thread = None
+
+    def arm(self, key, deadline, sound_type, sound_file):
+        """安排在 deadline（clock 时刻）播放；同一个键已安排时只更新截止时刻。混音器不可用时返回 False"""
+        if self.audio.pygame is None or not sound_file:
+            return False
+        with self.condition:
+            if key in self.fired:
+                return True
+            item = self.armed.get(key)
+            if item is not None:
+                if item[0] == deadline:
+                    return True
+                item[0] = deadline
+            else:
+                self.armed[key] = [deadline, sound_type, sound_file, None]
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True, name="audio-scheduler")
+                self.thread.start()
+            self.condition.notify()
+        return True
+
+    def claimed(self, key):
+        """该提示音是否由本线程负责（已播放，或已安排且没有过期）；过期的安排被取消"""
+        with self.condition:
+            if key in self.fired:
+                return True
+            item = self.armed.get(key)
+            if item is None:
+                return False
+            if self.clock() - item[0] > self.grace:
+                del self.armed[key]
+                return False
+            return True
+
+    def cancel(self):
+        """取消所有尚未播放的安排（暂停、重置时调用）"""
+        with self.condition:
+            self.armed.clear()
+            self.condition.notify()
+
+    def reset(self):
+        """开始新会话：同时清空已播放记录"""
+        with self.condition:
+            self.armed.clear()
+            self.fired.clear()
+            self.condition.notify()
+
+    def run(self):
+        condition = self.condition
+        while True:
+            with condition:
+                if not self.armed:
+                    condition.wait()
+                    continue
+                key, item = min(self.armed.items(), key=lambda pair: pair[1][0])
+                deadline, sound_type, sound_file, sound = item
+                remaining = deadline - self.clock()
+                if sound is not None and remaining > SPIN_SECONDS:
+                    condition.wait(remaining - SPIN_SECONDS)
+                    continue
+                if sound is None and remaining > LEAD_SECONDS:
+                    condition.wait(remaining - LEAD_SECONDS)
+                    continue
+
+            if sound is None:
+                # 在锁外准备音频，准备期间安排可能被取消或更新
+                sound = self.audio.prepare(sound_type, sound_file)
+                with condition:
+                    if self.armed.get(key) is item:
+                        if sound is None:
+                            del self.armed[key]  # 文件缺失或无法解码，已打印原因
+                        else:
+                            item[3] = sound
+                continue
+
+            while self.clock() < deadline:
+                pass
+            with condition:
+                if self.armed.get(key) is not item or item[0] != deadline:
+                    continue
+                del self.armed[key]
+                if self.clock() - deadline > self.grace:
+                    continue
+                self.fired.add(key)
+            self.audio.stop_preview()
+            self.audio.channels[EVENT_CHANNELS.get(sound_type, 0)].play(sound)
+            metrics = self.audio.metrics
+            if metrics.enabled:
+                # 预先安排的提示音从截止点算起
+                metrics.observe("audio_start_seconds", max(self.clock() - deadline, 0.0))
@@ -0,0 +1,174 @@
+"""
+性能基准：测量计时热路径上各步骤的单次耗时，用数字发现性能回退。
+
+    python benchmark.py                          # 运行全部基准
+    python benchmark.py tick format              # 只运行名称包含 tick 或 format 的基准
+    python benchmark.py --save baseline.json     # 保存结果
+    python benchmark.py --compare baseline.json  # 与保存的结果对比，变慢超过阈值时返回非零
+
+每个基准自动确定循环次数（每轮约 0.1 秒），重复 5 轮，取最小值和中位数（纳秒/次）。
+"""
+import argparse
+import importlib.util
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from audio_cache import AudioCache
+from audio_engine import EVENT_CHANNELS
+from config_store import DEFAULT_CONFIG
+from timer_engine import build_timeline
+
+REPEAT = 5
+ROUND_SECONDS = 0.1
+
+
+def load_app_module():
+    """导入主程序（文件名含空格，不能直接 import）；不会创建窗口"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Multi Stage Random Notification Timer.py")
+    spec = importlib.util.spec_from_file_location("timer_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func):
+    """返回 (最小值, 中位数)，单位为纳秒/次"""
+    # 先找到耗时不少于一轮十分之一的循环次数，再按比例放大到一轮
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= ROUND_SECONDS / 10:
+            break
+        number *= 10
+    number = max(1, int(number * ROUND_SECONDS / elapsed))
+    results = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        results.append((time.perf_counter() - start) / number * 1e9)
+    return min(results), statistics.median(results)
+
+
+# ---------- 基准 ----------
+
+def bench_build_timeline():
+    """生成 8 小时会话的时间线（开始计时时执行一次）"""
+    return lambda: build_timeline(DEFAULT_CONFIG, 1)
+
+
+def bench_tick():
+    """计时线程每次唤醒的工作：定位当前项、取出到期事件、计算状态和下一个截止点"""
+    timeline = build_timeline(DEFAULT_CONFIG, 1)
+    total = timeline.total_duration
+    state = {"elapsed": 0.0, "index": 0}
+
+    def tick():
+        elapsed = state["elapsed"] = (state["elapsed"] + 7.3) % total
+        previous = state["index"] if elapsed >= timeline.offsets[state["index"]] else 0
+        index = state["index"] = timeline.index_at(elapsed, previous)
+        timeline.events_between(previous, index)
+        timeline.state_at(elapsed, index)
+        timeline.next_offset(index)
+    return tick
+
+
+def bench_format_time(app):
+    """界面显示用的 HH:MM:SS 格式化"""
+    format_time = app.TimerApp.format_time
+    return lambda: format_time(28799)
+
+
+def bench_render_values(app):
+    """一次界面刷新需要计算的全部显示值（不含 Tk 调用）"""
+    format_time = app.TimerApp.format_time
+    timeline = build_timeline(DEFAULT_CONFIG, 1)
+    rendered = {}
+
+    def render():
+        state = timeline.state_at(12345.6, 40)
+        values = (
+            ("total", format_time(math.ceil(state.total_left))),
+            ("stage", format_time(math.ceil(state.stage_left))),
+            ("break", format_time(math.ceil(state.break_left))),
+            ("total_progress", round(state.total_progress, 1)),
+            ("stage_progress", round(state.phase_progress, 1)),
+        )
+        for key, value in values:
+            if rendered.get(key) != value:
+                rendered[key] = value
+    return render
+
+
+def bench_audio_dispatch():
+    """播放提示音前的查找：按路径取出已解码音频并选择事件声道"""
+    cache = AudioCache(1024 * 1024)
+    path = os.path.join("notification", "notis", "ding.wav")
+    sound = object()  # 只测缓存查找，不需要真实的 Sound
+    cache.put((path, 1, 1), sound, 1)
+
+    def dispatch():
+        cache.get_latest(path)
+        EVENT_CHANNELS.get("random", 0)
+    return dispatch
+
+
+def benchmarks():
+    app = load_app_module()
+    return {
+        "build_timeline": bench_build_timeline(),
+        "tick": bench_tick(),
+        "format_time": bench_format_time(app),
+        "render_values": bench_render_values(app),
+        "audio_dispatch": bench_audio_dispatch(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（性能基准）")
+    parser.add_argument("names", nargs="*", help="只运行名称包含这些字符串的基准")
+    parser.add_argument("--save", help="把结果保存为 JSON")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    parser.add_argument("--max-regression", type=float, default=25.0,
+                        help="对比时允许变慢的百分比，超过则返回 1（默认 25）")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressed = []
+    print(f"{'基准':<16}{'最小 ns':>12}{'中位 ns':>12}{'对比':>10}")
+    for name, func in benchmarks().items():
+        if args.names and not any(part in name for part in args.names):
+            continue
+        best, median = measure(func)
+        results[name] = {"min_ns": round(best, 1), "median_ns": round(median, 1)}
+        change = ""
+        if name in baseline:
+            percent = (best / baseline[name]["min_ns"] - 1) * 100
+            change = f"{percent:+.1f}%"
+            if percent > args.max_regression:
+                regressed.append(name)
+        print(f"{name:<16}{best:>12.1f}{median:>12.1f}{change:>10}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if regressed:
+        print(f"变慢超过 {args.max_regression}%: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+配置读写：带版本号的配置结构、类型校验、旧版本迁移，以及原子化、防抖的保存。
+
+- 读取时先按版本迁移，再校验每一项的类型和范围，错误信息指出具体的配置项；
+- 保存时先写临时文件并 fsync，再用 os.replace 原子替换，写入中途崩溃不会损坏原文件；
+- 短时间内的多次保存合并为一次写入，内容哈希与上次写入相同时直接跳过。
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from plan import PlanError, expand_plan
+from reminder_schedule import DISTRIBUTIONS
+
+SCHEMA_VERSION = 1
+
+DEFAULT_CONFIG = {
+    "version": SCHEMA_VERSION,
+    "total_time": {"hours": 8, "minutes": 0, "seconds": 0},
+    "stage_time": {"hours": 1, "minutes": 30, "seconds": 0},
+    "random_reminder": {"min": 5, "max": 10},
+    "short_break": {"minutes": 0, "seconds": 10},
+    "stage_break": {"minutes": 10, "seconds": 20},
+    "sounds": {
+        "start": "",
+        "random": [],
+        "stage_break_start": "",
+        "total_end": ""
+    },
+    "audio_cache_mb": 64,  # 已解码提示音缓存的内存预算（MB）
+    "audio_target_db": -20  # 提示音导入时响度归一的目标（dBFS），程序和 audio_import.py 共用
+}
+
+# audio_target_db 的取值范围（dBFS）
+TARGET_DB_RANGE = (-40, -3)
+
+# 整数配置项的取值范围：(路径, 最小值, 最大值)，最大值为 None 表示不限
+_INT_FIELDS = [
+    (("total_time", "hours"), 0, None),
+    (("total_time", "minutes"), 0, 59),
+    (("total_time", "seconds"), 0, 59),
+    (("stage_time", "hours"), 0, None),
+    (("stage_time", "minutes"), 0, 59),
+    (("stage_time", "seconds"), 0, 59),
+    (("random_reminder", "min"), 1, None),
+    (("random_reminder", "max"), 1, None),
+    (("short_break", "minutes"), 0, None),
+    (("short_break", "seconds"), 0, 59),
+    (("stage_break", "minutes"), 0, None),
+    (("stage_break", "seconds"), 0, 59),
+    (("audio_cache_mb",), 1, None),
+]
+
+# 可省略的整数配置项：(路径, 最小值)
+_OPTIONAL_INT_FIELDS = [
+    (("random_reminder", "jitter"), 0),
+    (("random_reminder", "min_gap_before_end"), 0),
+]
+
+_SOUND_FIELDS = {"start": str, "random": list, "stage_break_start": str, "total_end": str}
+
+# 可以通过 merge_config（控制接口的 PUT /config）修改的顶层配置项
+UPDATABLE_KEYS = tuple(key for key in DEFAULT_CONFIG if key != "version") + ("plan",)
+
+
+class ConfigError(ValueError):
+    """配置内容无效"""
+
+
+def _migrate_0_to_1(config):
+    """版本 0（无 version 字段）：补齐缺少的配置项"""
+    merged = copy.deepcopy(DEFAULT_CONFIG)
+    for key, value in config.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    merged["version"] = 1
+    return merged
+
+
+# 版本号 -> 迁移到下一版本的函数
+MIGRATIONS = {0: _migrate_0_to_1}
+
+
+def migrate(config):
+    """把任意旧版本的配置迁移到当前版本"""
+    version = config.get("version", 0)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ConfigError(f"不支持的配置版本: {version}")
+    while version < SCHEMA_VERSION:
+        config = MIGRATIONS[version](config)
+        version = config["version"]
+    return config
+
+
+def validate(config):
+    """校验配置项的类型和范围，出错时抛出 ConfigError"""
+    if not isinstance(config, dict):
+        raise ConfigError("配置文件内容必须是 JSON 对象")
+    version = config.get("version", SCHEMA_VERSION)
+    if not isinstance(version, int) or isinstance(version, bool) or version > SCHEMA_VERSION:
+        raise ConfigError(f"不支持的配置版本: {version}")
+    for path, low, high in _INT_FIELDS:
+        node = config
+        for key in path:
+            if not isinstance(node, dict) or key not in node:
+                raise ConfigError(f"缺少配置项 {'.'.join(path)}")
+            node = node[key]
+        name = ".".join(path)
+        if not isinstance(node, int) or isinstance(node, bool):
+            raise ConfigError(f"配置项 {name} 必须是整数")
+        if node < low or (high is not None and node > high):
+            limit = f"{low}-{high}" if high is not None else f"不小于 {low}"
+            raise ConfigError(f"配置项 {name} 超出范围（{limit}）: {node}")
+
+    for (section, key), low in _OPTIONAL_INT_FIELDS:
+        if key in config[section]:
+            value = config[section][key]
+            if not isinstance(value, int) or isinstance(value, bool) or value < low:
+                raise ConfigError(f"配置项 {section}.{key} 必须是不小于 {low} 的整数")
+
+    if config["random_reminder"]["max"] < config["random_reminder"]["min"]:
+        raise ConfigError("配置项 random_reminder.max 不能小于 random_reminder.min")
+    distribution = config["random_reminder"].get("distribution", "uniform")
+    if distribution not in DISTRIBUTIONS:
+        raise ConfigError(f"配置项 random_reminder.distribution 必须是 {'/'.join(DISTRIBUTIONS)} 之一")
+
+    if "audio_target_db" in config:
+        value = config["audio_target_db"]
+        low, high = TARGET_DB_RANGE
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or not low <= value <= high:
+            raise ConfigError(f"配置项 audio_target_db 必须是 {low} 到 {high} 之间的数")
+
+    sounds = config.get("sounds")
+    if not isinstance(sounds, dict):
+        raise ConfigError("配置项 sounds 必须是对象")
+    for key, kind in _SOUND_FIELDS.items():
+        if not isinstance(sounds.get(key), kind):
+            raise ConfigError(f"配置项 sounds.{key} 类型错误")
+    if not all(isinstance(name, str) for name in sounds["random"]):
+        raise ConfigError("配置项 sounds.random 必须是文件名列表")
+
+    if config.get("plan") is not None:
+        try:
+            expand_plan(config["plan"])
+        except PlanError as e:
+            raise ConfigError(f"配置项 plan 无效: {str(e)}")
+    return config
+
+
+def merge_config(config, changes):
+    """把部分配置合并到 config 的副本并校验；只接受 UPDATABLE_KEYS 中的配置项"""
+    if not isinstance(changes, dict):
+        raise ConfigError("配置修改必须是 JSON 对象")
+    unknown = set(changes) - set(UPDATABLE_KEYS)
+    if unknown:
+        raise ConfigError(f"不能修改的配置项: {', '.join(sorted(unknown))}")
+    merged = copy.deepcopy(config)
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(copy.deepcopy(value))
+        else:
+            merged[key] = copy.deepcopy(value)
+    return validate(merged)
+
+
+def parse_config(text):
+    """解析、迁移并校验配置文本"""
+    try:
+        config = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"配置文件不是有效的 JSON: {str(e)}")
+    if not isinstance(config, dict):
+        raise ConfigError("配置文件内容必须是 JSON 对象")
+    return validate(migrate(config))
+
+
+def load_config(path):
+    """读取配置文件；文件不存在时抛出 OSError，内容无效时抛出 ConfigError"""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_config(f.read())
+
+
+def dump_config(config):
+    """配置序列化为保存到文件的文本"""
+    return json.dumps(config, ensure_ascii=False, indent=4)
+
+
+def write_atomic(path, text):
+    """写临时文件、fsync 后原子替换目标文件；临时文件以目标文件名开头，便于辨认残留文件的来源"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # 同步目录项，确保重命名本身落盘（Windows 不支持）
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class ConfigStore:
+    """一个配置文件的读取和防抖保存"""
+
+    def __init__(self, path="config.json", delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.timer = None
+        self.pending = None     # 等待写入的文本
+        self.last_hash = None   # 最近一次读取或写入的内容哈希
+        self.on_error = None    # 后台写入失败时的回调 on_error(exception)
+
+    def load(self):
+        """读取配置；文件不存在时返回默认配置，内容无效时抛出 ConfigError"""
+        if not os.path.exists(self.path):
+            return copy.deepcopy(DEFAULT_CONFIG)
+        config = load_config(self.path)
+        self.last_hash = self.content_hash(dump_config(config))
+        return config
+
+    @staticmethod
+    def content_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def save(self, config):
+        """安排保存：delay 秒内的多次保存只写入最后一次"""
+        text = dump_config(validate(config))
+        with self.lock:
+            self.pending = text
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.start()
+
+    def flush(self):
+        """立即写入等待中的配置（程序退出前调用）"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            text, self.pending = self.pending, None
+            if text is None:
+                return
+            digest = self.content_hash(text)
+            if digest == self.last_hash:
+                print("配置无变化，跳过保存")
+                return
+            try:
+                write_atomic(self.path, text)
+            except OSError as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"保存配置文件失败: {str(e)}")
+                return
+            self.last_hash = digest
+        print("配置文件已成功保存！")
@@ -0,0 +1,244 @@
+"""
+本地控制接口：在 127.0.0.1 上提供一个轻量 HTTP 服务，供脚本、编辑器和状态栏控制计时器并订阅状态。
+
+    GET  /state                 当前状态（JSON）
+    POST /start /pause /resume /reset
+    PUT  /config                更新配置（JSON，只需包含要修改的项）
+    GET  /events                服务器推送事件（text/event-stream）
+    GET  /events?format=ndjson  每行一个 JSON 的事件流
+    GET  /metrics               热路径指标（Prometheus 文本格式，未设置 metrics_text 时为 404）
+
+POST 和 PUT 必须带 Content-Type: application/json：浏览器中的网页跨站发送这种请求前需要预检，
+本服务不响应预检，因此网页无法借用户的浏览器控制计时器。
+所有请求的 Host 头必须是 127.0.0.1:<端口> 或 localhost:<端口>，否则返回 403，
+防止网页通过 DNS 重绑定把自己的域名解析到 127.0.0.1 后以同源身份读取状态或发送命令。
+
+HTTP 请求在服务线程中处理，命令放入队列，由拥有者（Tk 线程）调用 process_commands() 执行，
+因此不会阻塞也不会跨线程操作界面。broadcast() 可在任意线程调用，直接写入每个订阅者的队列。
+"""
+import json
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COMMANDS = ("start", "pause", "resume", "reset")
+
+# 订阅者队列上限，慢订阅者超出后丢弃最旧的事件
+SUBSCRIBER_QUEUE_SIZE = 256
+# 等待拥有者执行命令的最长时间（秒）
+COMMAND_TIMEOUT = 2.0
+# 事件流空闲时发送心跳的间隔（秒），用于发现已断开的订阅者
+KEEPALIVE_INTERVAL = 15.0
+
+
+class ControlServer:
+    """本地控制服务"""
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.commands = queue.Queue()  # (命令, 参数, Future)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.last_state = {}
+        self.metrics_text = None  # 返回 Prometheus 文本的函数，在服务线程中调用
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def allowed_hosts(self):
+        """允许的 Host 头（小写）"""
+        port = self.address[1]
+        hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+        if port == 80:
+            hosts.update(("127.0.0.1", "localhost"))
+        return hosts
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.put(None)
+
+    # ---------- 命令 ----------
+
+    def submit(self, command, payload=None):
+        """服务线程调用：把命令交给拥有者执行并等待结果"""
+        future = Future()
+        self.commands.put((command, payload, future))
+        return future.result(COMMAND_TIMEOUT)
+
+    def process_commands(self, handler):
+        """拥有者线程调用：执行所有排队的命令，handler(command, payload) 返回 JSON 结果"""
+        while True:
+            try:
+                command, payload, future = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                future.set_result(handler(command, payload))
+            except Exception as e:
+                future.set_exception(e)
+
+    # ---------- 推送 ----------
+
+    def broadcast(self, state):
+        """推送状态变化给所有订阅者（任意线程可调用，不阻塞）"""
+        with self.lock:
+            self.last_state = state
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(state)
+            except queue.Full:
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(state)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def subscribe(self):
+        subscriber = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.last_state:
+                subscriber.put_nowait(self.last_state)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    # ---------- HTTP ----------
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # 不在控制台输出每个请求
+
+            def send_json(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def run_command(self, command, payload=None):
+                try:
+                    self.send_json(200, server.submit(command, payload))
+                except TimeoutError:
+                    self.send_json(503, {"error": "计时器未响应"})
+                except ValueError as e:
+                    self.send_json(400, {"error": str(e)})
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    return json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return None
+
+            def check_host(self):
+                """只接受以本机地址访问的请求，拒绝经 DNS 重绑定指向本机的其他域名"""
+                if self.headers.get("Host", "").strip().lower() in server.allowed_hosts():
+                    return True
+                self.close_connection = True
+                self.send_json(403, {"error": "Host 必须是 127.0.0.1 或 localhost"})
+                return False
+
+            def do_GET(self):
+                if not self.check_host():
+                    return
+                url = urlparse(self.path)
+                if url.path == "/state":
+                    self.run_command("state")
+                elif url.path == "/metrics" and server.metrics_text is not None:
+                    data = server.metrics_text().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                elif url.path == "/events":
+                    ndjson = parse_qs(url.query).get("format") == ["ndjson"]
+                    self.stream_events(ndjson)
+                else:
+                    self.send_json(404, {"error": "未知路径"})
+
+            def check_json_request(self):
+                """写操作只接受 JSON 请求，拒绝浏览器跨站的简单请求（表单、无类型的 fetch）"""
+                content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type == "application/json":
+                    return True
+                self.close_connection = True  # 请求体未读取，不再复用连接
+                self.send_json(415, {"error": "请求必须使用 Content-Type: application/json"})
+                return False
+
+            def do_POST(self):
+                if not self.check_host():
+                    return
+                command = urlparse(self.path).path.strip("/")
+                if command not in COMMANDS:
+                    self.send_json(404, {"error": "未知命令"})
+                    return
+                if not self.check_json_request():
+                    return
+                self.read_json()  # 命令没有参数，读出请求体以便复用连接
+                self.run_command(command)
+
+            def do_PUT(self):
+                if not self.check_host():
+                    return
+                if urlparse(self.path).path != "/config":
+                    self.send_json(404, {"error": "未知路径"})
+                    return
+                if not self.check_json_request():
+                    return
+                payload = self.read_json()
+                if not isinstance(payload, dict):
+                    self.send_json(400, {"error": "请求内容必须是 JSON 对象"})
+                    return
+                self.run_command("config", payload)
+
+            def stream_events(self, ndjson):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson" if ndjson else "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                subscriber = server.subscribe()
+                try:
+                    while True:
+                        try:
+                            state = subscriber.get(timeout=KEEPALIVE_INTERVAL)
+                        except queue.Empty:
+                            self.wfile.write(b"\n" if ndjson else b": keepalive\n\n")
+                            self.wfile.flush()
+                            continue
+                        if state is None:
+                            return
+                        data = json.dumps(state, ensure_ascii=False)
+                        line = f"{data}\n" if ndjson else f"event: state\ndata: {data}\n\n"
+                        self.wfile.write(line.encode("utf-8"))
+                        self.wfile.flush()
+                except OSError:
+                    pass  # 订阅者断开
+                finally:
+                    server.unsubscribe(subscriber)
+
+        return Handler
@@ -0,0 +1,78 @@
+"""
+调试面板：显示热路径指标的直方图汇总（毫秒）和音频缓存等计数，每秒刷新，可开关指标、清空和导出。
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+REFRESH_MS = 1000
+
+
+class MetricsPanel:
+    """指标调试窗口"""
+
+    def __init__(self, root, metrics):
+        self.metrics = metrics
+        self.window = tk.Toplevel(root)
+        self.window.title("调试：性能指标")
+        self.window.geometry("560x240")
+
+        columns = ("count", "p50", "p90", "p99", "max")
+        self.tree = ttk.Treeview(self.window, columns=columns, height=5)
+        self.tree.heading("#0", text="指标")
+        self.tree.column("#0", width=170)
+        for column, title in zip(columns, ("次数", "p50 ms", "p90 ms", "p99 ms", "最大 ms")):
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=70, anchor="e")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.counters_label = ttk.Label(self.window, text="", anchor="w")
+        self.counters_label.pack(fill=tk.X, padx=5)
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(fill=tk.X, pady=5)
+        self.enabled_var = tk.BooleanVar(value=metrics.enabled)
+        ttk.Checkbutton(button_frame, text="启用", variable=self.enabled_var,
+                        command=self.toggle).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="清空", command=self.clear).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="导出 Prometheus", command=lambda: self.export("prom")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="导出 JSON", command=lambda: self.export("json")).pack(side=tk.LEFT, padx=5)
+
+        self.refresh()
+
+    def toggle(self):
+        self.metrics.enabled = self.enabled_var.get()
+
+    def clear(self):
+        self.metrics.reset()
+        self.refresh(schedule=False)
+
+    def refresh(self, schedule=True):
+        if not self.window.winfo_exists():
+            return
+        for name, summary in self.metrics.snapshot().items():
+            values = (summary["count"],) + tuple(f"{summary[key] * 1000:.2f}" for key in ("p50", "p90", "p99", "max"))
+            if self.tree.exists(name):
+                self.tree.item(name, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=name, text=name, values=values)
+        counters = self.metrics.counters()
+        if counters:
+            cache = {key[len("audio_cache_"):]: value for key, value in counters.items() if key.startswith("audio_cache_")}
+            self.counters_label.config(
+                text=f"音频缓存：命中 {cache.get('hits', 0)} · 未命中 {cache.get('misses', 0)} · "
+                     f"淘汰 {cache.get('evictions', 0)} · {cache.get('entries', 0)} 个 · "
+                     f"{cache.get('bytes', 0) / 2 ** 20:.1f} / {cache.get('budget', 0) / 2 ** 20:.0f} MB")
+        if schedule:
+            self.window.after(REFRESH_MS, self.refresh)
+
+    def export(self, kind):
+        extension = ".prom" if kind == "prom" else ".json"
+        path = filedialog.asksaveasfilename(parent=self.window, title="导出指标", defaultextension=extension,
+                                            initialfile="timer-metrics" + extension)
+        if not path:
+            return
+        text = self.metrics.to_prometheus() if kind == "prom" else self.metrics.to_json()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            messagebox.showerror("错误", f"导出指标失败: {str(e)}", parent=self.window)
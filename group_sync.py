@@ -0,0 +1,348 @@
+"""
+小组同步：多台电脑按同一个时间线同时提醒。
+
+- 协调者（GroupCoordinator）在局域网 UDP 端口上发布当前会话：配置、随机种子、开始时刻（协调者的单调时钟）和是否暂停；
+- 成员（GroupClient）用 NTP 式的往返测量估计本机时钟与协调者时钟的偏移，把开始时刻换算到本机，
+  用同样的配置和种子生成同一个时间线，在本地调度提醒；
+- 偏移每隔 RESYNC_INTERVAL 秒重新测量，抵消不同电脑时钟频率的差异（每小时可差出上百毫秒）；
+- LocalTransport 在进程内代替网络（可设置延迟和抖动），不用真实网络也能检查同步精度。
+
+协议为 UDP 上的 JSON，每个请求一个数据报：
+    {"op": "time", "id": n, "t0": 发送时刻}  ->  {"op": "time", "id": n, "t0": ..., "t1": 协调者收到时刻, "t2": 协调者回复时刻}
+    {"op": "session", "id": n}             ->  {"op": "session", "id": n, "session": 会话或 null}
+
+用法示例：
+    python group_sync.py serve --config config.json --delay 5   # 无界面协调者：5 秒后开始一个小组会话
+    python group_sync.py probe 192.168.1.20                     # 测量与协调者的时钟偏移和往返延迟
+"""
+import argparse
+import itertools
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+DEFAULT_PORT = 47800
+SAMPLES = 8             # 每次测量的往返次数，取往返延迟最小的一次
+POLL_INTERVAL = 1.0     # 成员查询会话状态的间隔（秒）
+RESYNC_INTERVAL = 30.0  # 重新测量时钟偏移的间隔（秒）
+REQUEST_TIMEOUT = 0.5
+MIN_ADJUST = 0.002      # 换算后的开始时刻变化超过该值（秒）才通知调整
+MAX_DATAGRAM = 65507
+
+
+class GroupError(Exception):
+    """无法与协调者通信"""
+
+
+def estimate_offset(samples):
+    """由往返样本 [(t0, t1, t2, t3)] 估计时钟偏移，返回 (偏移, 往返延迟)
+
+    t0/t3 为本机发送/收到的时刻，t1/t2 为协调者收到/回复的时刻；偏移 = 协调者时钟 - 本机时钟。
+    延迟最小的样本受排队影响最小，取它的偏移（与 NTP 的时钟过滤相同）。
+    """
+    if not samples:
+        raise GroupError("没有可用的测量结果")
+    t0, t1, t2, t3 = min(samples, key=lambda s: (s[3] - s[0]) - (s[2] - s[1]))
+    return ((t1 - t0) + (t2 - t3)) / 2, (t3 - t0) - (t2 - t1)
+
+
+# ---------- 协调者 ----------
+
+class GroupCoordinator:
+    """发布会话的协调者
+
+    session_source() 返回当前会话 {"version", "config", "seed", "start", "paused"}，没有会话时返回 None；
+    在服务线程中调用，start 使用与 clock 相同的时钟。暂停时另外包含冻结的已用时间 "elapsed"（秒）。
+    """
+
+    def __init__(self, session_source, clock=time.monotonic):
+        self.session_source = session_source
+        self.clock = clock
+        self.sock = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def handle(self, message, received):
+        """处理一个请求，received 为收到请求的时刻；返回回复（不含 t2）或 None"""
+        op = message.get("op")
+        if op == "time":
+            return {"op": "time", "id": message.get("id"), "t0": message.get("t0"), "t1": received}
+        if op == "session":
+            return {"op": "session", "id": message.get("id"), "session": self.session_source()}
+        return None
+
+    def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        """在后台线程中监听 UDP 端口，端口被占用时抛出 OSError"""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.5)  # 定期检查是否需要停止
+        self.thread = threading.Thread(target=self.serve_loop, daemon=True, name="group-coordinator")
+        self.thread.start()
+
+    def serve_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            received = self.clock()
+            try:
+                reply = self.handle(json.loads(data), received)
+            except (ValueError, AttributeError):
+                continue
+            if reply is None:
+                continue
+            if reply["op"] == "time":
+                reply["t2"] = self.clock()
+            try:
+                self.sock.sendto(json.dumps(reply, ensure_ascii=False).encode("utf-8"), address)
+            except OSError as e:
+                print(f"小组回复失败: {address} {str(e)}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+# ---------- 传输 ----------
+
+class UdpTransport:
+    """通过 UDP 向协调者发送请求"""
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=REQUEST_TIMEOUT, clock=time.monotonic):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.clock = clock
+        self.ids = itertools.count(1)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.lock = threading.Lock()
+
+    def request(self, message):
+        """发送请求并等待对应的回复；time 请求的 t0 在发送前写入，回复中附加收到时刻 t3"""
+        with self.lock:
+            message = dict(message, id=next(self.ids))
+            deadline = self.clock() + self.timeout
+            if message["op"] == "time":
+                message["t0"] = self.clock()
+            try:
+                self.sock.sendto(json.dumps(message).encode("utf-8"), self.address)
+                while True:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        raise GroupError(f"协调者 {self.address[0]}:{self.address[1]} 没有响应")
+                    self.sock.settimeout(remaining)
+                    data, _ = self.sock.recvfrom(MAX_DATAGRAM)
+                    received = self.clock()
+                    try:
+                        reply = json.loads(data)
+                    except ValueError:
+                        continue
+                    if isinstance(reply, dict) and reply.get("id") == message["id"]:
+                        reply["t3"] = received
+                        return reply
+            except socket.timeout:
+                raise GroupError(f"协调者 {self.address[0]}:{self.address[1]} 没有响应")
+            except OSError as e:
+                raise GroupError(f"无法连接协调者: {str(e)}")
+
+    def close(self):
+        self.sock.close()
+
+
+class LocalTransport:
+    """进程内的协调者替身：直接调用 coordinator.handle，用 sleep 模拟单程延迟和抖动"""
+
+    def __init__(self, coordinator, delay=0.0, jitter=0.0, seed=None, clock=time.monotonic):
+        self.coordinator = coordinator
+        self.delay = delay
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.clock = clock
+
+    def one_way(self):
+        seconds = self.delay + self.rng.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def request(self, message):
+        message = dict(message)
+        if message["op"] == "time":
+            message["t0"] = self.clock()
+        self.one_way()
+        reply = self.coordinator.handle(message, self.coordinator.clock())
+        if reply is None:
+            raise GroupError(f"协调者不支持的请求: {message['op']}")
+        if reply["op"] == "time":
+            reply["t2"] = self.coordinator.clock()
+        self.one_way()
+        reply["t3"] = self.clock()
+        return reply
+
+    def close(self):
+        pass
+
+
+# ---------- 成员 ----------
+
+class GroupClient:
+    """小组成员：测量时钟偏移并跟随协调者发布的会话"""
+
+    def __init__(self, transport, clock=time.monotonic):
+        self.transport = transport
+        self.clock = clock
+        self.offset = None   # 协调者时钟 - 本机时钟（秒）
+        self.delay = None    # 测量时的往返延迟（秒）
+        self.synced_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sync(self, samples=SAMPLES):
+        """测量时钟偏移，返回 (偏移, 往返延迟)；全部请求失败时抛出 GroupError"""
+        results = []
+        error = None
+        for _ in range(samples):
+            try:
+                reply = self.transport.request({"op": "time"})
+            except GroupError as e:
+                error = e
+                continue
+            results.append((reply["t0"], reply["t1"], reply["t2"], reply["t3"]))
+        if not results:
+            raise error or GroupError("没有可用的测量结果")
+        self.offset, self.delay = estimate_offset(results)
+        self.synced_at = self.clock()
+        return self.offset, self.delay
+
+    def coordinator_time(self):
+        """按当前偏移换算的协调者时钟"""
+        return self.clock() + self.offset
+
+    def fetch(self):
+        """取得协调者当前的会话，附加换算到本机时钟的开始时刻 local_start；没有会话时返回 None"""
+        if self.offset is None:
+            self.sync()
+        session = self.transport.request({"op": "session"}).get("session")
+        if session is not None:
+            session["local_start"] = session["start"] - self.offset
+        return session
+
+    def follow(self, on_update):
+        """在后台线程中跟随协调者：会话开始、结束、暂停/继续或换算后的开始时刻变化时调用 on_update(会话或 None)"""
+        self.thread = threading.Thread(target=self.follow_loop, args=(on_update,), daemon=True, name="group-client")
+        self.thread.start()
+
+    def follow_loop(self, on_update):
+        last = None
+        reported = False
+        while not self.stop_event.is_set():
+            try:
+                if self.synced_at is None or self.clock() - self.synced_at >= RESYNC_INTERVAL:
+                    self.sync()
+                session = self.fetch()
+                reported = False
+            except GroupError as e:
+                if not reported:
+                    print(f"小组同步失败，稍后重试: {str(e)}")
+                    reported = True
+                session = last  # 暂时联系不上时保持当前会话
+            if self.changed(last, session):
+                on_update(session)
+            last = session
+            self.stop_event.wait(POLL_INTERVAL)
+
+    @staticmethod
+    def changed(last, session):
+        if last is None or session is None:
+            return last is not session
+        if last["version"] != session["version"] or last["paused"] != session["paused"]:
+            return True
+        if session["paused"]:
+            # 暂停时开始时刻没有意义，比较冻结的已用时间
+            return abs(last["elapsed"] - session["elapsed"]) > MIN_ADJUST
+        return abs(last["local_start"] - session["local_start"]) > MIN_ADJUST
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.transport.close()
+
+
+def parse_address(text):
+    """"主机" 或 "主机:端口" -> (主机, 端口)"""
+    host, _, port = text.strip().rpartition(":")
+    if not host:
+        return text.strip(), DEFAULT_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        raise GroupError(f"无效的端口: {port}")
+
+
+def main(argv=None):
+    from config_store import ConfigError, load_config
+
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（小组同步）")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="作为无界面协调者发布一个小组会话")
+    serve.add_argument("--config", default="config.json", help="配置文件路径，默认 config.json")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"UDP 端口，默认 {DEFAULT_PORT}")
+    serve.add_argument("--delay", type=float, default=5.0, help="多少秒后开始，留给成员加入，默认 5")
+    serve.add_argument("--seed", type=int, default=None, help="随机提醒的随机种子")
+    probe = commands.add_parser("probe", help="测量与协调者的时钟偏移和往返延迟")
+    probe.add_argument("address", help="协调者地址，主机或 主机:端口")
+    args = parser.parse_args(argv)
+
+    if args.command == "probe":
+        try:
+            host, port = parse_address(args.address)
+            client = GroupClient(UdpTransport(host, port))
+            offset, delay = client.sync()
+            session = client.fetch()
+        except GroupError as e:
+            print(f"错误: {str(e)}", file=sys.stderr)
+            return 2
+        print(f"时钟偏移: {offset * 1000:+.3f} ms，往返延迟: {delay * 1000:.3f} ms")
+        if session is None:
+            print("协调者当前没有会话")
+        else:
+            print(f"会话 {session['version']}: 距开始 {client.clock() - session['local_start']:+.1f} 秒"
+                  f"{'（已暂停）' if session['paused'] else ''}")
+        client.stop()
+        return 0
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ConfigError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    session = {"version": seed, "config": config, "seed": seed,
+               "start": time.monotonic() + args.delay, "paused": False}
+    coordinator = GroupCoordinator(lambda: session)
+    try:
+        coordinator.serve(port=args.port)
+    except OSError as e:
+        print(f"错误: 无法监听端口 {args.port}: {str(e)}", file=sys.stderr)
+        return 2
+    print(f"小组会话 {seed} 将在 {args.delay:g} 秒后开始，成员加入地址: {socket.gethostname()}:{args.port}（Ctrl+C 结束）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        coordinator.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+无界面运行模式：在服务器或 SSH 会话中按 config.json 运行计时，通过输出端发送提醒。
+
+不导入 tkinter，pygame 只有在使用 sound 输出端并第一次播放时才会导入。
+
+用法示例：
+    python headless.py --config config.json
+    python headless.py --sink json --sink "command:notify-send 计时器 {event}"
+    python headless.py --sink socket:/tmp/timer.sock --seed 42
+    python headless.py --group 192.168.1.20      # 加入小组会话，与协调者同时提醒
+"""
+import argparse
+import queue
+import sys
+import threading
+import time
+
+from config_store import DEFAULT_CONFIG, ConfigError, load_config, validate
+from group_sync import GroupClient, GroupError, UdpTransport, parse_address
+from notify_sinks import create_sink
+from timer_engine import build_timeline, catch_up
+
+
+class HeadlessRunner:
+    """按时间线驱动一次会话，在每个提示音事件到期时发送给所有输出端
+
+    clock 返回单调时间（秒），wait(timeout) 等待 timeout 秒（None 为一直等待），可被 stop()/reschedule() 提前打断；
+    模拟运行（simulate.py）传入虚拟时钟，不需要真的等待。
+    """
+
+    def __init__(self, timeline, sinks, clock=time.monotonic, wait=None):
+        self.timeline = timeline
+        self.sinks = sinks
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.clock = clock
+        self.wait = wait or self.wait_for_wake
+        self.start = None
+        self.paused = False
+        self.failed = set()  # 已报告过错误的输出端
+
+    def wait_for_wake(self, timeout):
+        self.wake_event.wait(timeout)
+        self.wake_event.clear()
+
+    def emit(self, offset, sound_event, index, sound_file=None):
+        state = self.timeline.state_at(offset, index)
+        event = {
+            "event": sound_event,
+            "phase": state.phase,
+            "offset": offset,
+            "total_left": state.total_left,
+        }
+        if sound_file is not None:
+            event["file"] = sound_file  # 计划中为该阶段指定的提示音
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                # 一个输出端出错不影响计时和其他输出端，同一输出端只报告一次
+                if sink not in self.failed:
+                    self.failed.add(sink)
+                    print(f"输出端 {type(sink).__name__} 处理事件失败: {str(e)}", file=sys.stderr)
+
+    def run(self, start=None):
+        """阻塞运行直到总计时结束或 stop() 被调用；start 为会话开始的时刻（clock 时间），默认为现在
+
+        start 已过去（中途加入小组会话）时不补发开始之后的全部事件：与界面相同，
+        只发送追赶宽限内的事件，都已过期时只发送最后一个（当前阶段）。
+        """
+        timeline = self.timeline
+        if start is not None:
+            self.start = start
+        elif self.start is None:
+            self.start = self.clock()
+        index = None  # 尚未开始
+        while not self.stop_event.is_set():
+            if self.paused:
+                self.wait(None)  # 等待 reschedule() 继续
+                continue
+            elapsed = self.clock() - self.start
+            if elapsed < 0:
+                self.wait(-elapsed)
+                continue
+            if index is None:
+                index = timeline.index_at(elapsed)
+                events = [(0.0, "start", timeline.sound_file(0))] + timeline.events_between(0, index)
+            else:
+                # 开始时刻被微调后不回退，已发送的事件不会重复发送
+                new_index = max(index, timeline.index_at(elapsed, index))
+                events = timeline.events_between(index, new_index)
+                index = new_index
+            for offset, sound_event, sound_file in catch_up(events, elapsed):
+                self.emit(offset, sound_event, timeline.index_at(offset), sound_file)
+            next_offset = timeline.next_offset(index)
+            if next_offset is None:
+                break
+            # 只在下一个时间线截止点唤醒
+            timeout = self.start + next_offset - self.clock()
+            if timeout > 0:
+                self.wait(timeout)
+
+    def reschedule(self, start=None, paused=None):
+        """调整开始时刻或暂停状态（小组成员跟随协调者），可在其他线程调用"""
+        if start is not None:
+            self.start = start
+        if paused is not None:
+            self.paused = paused
+        self.wake_event.set()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
+
+
+def run_group(client, sinks):
+    """跟随协调者运行：暂停/继续时调整开始时刻，重置后停止，重新开始时按新的会话重建时间线；Ctrl+C 结束"""
+    updates = queue.Queue()
+    client.follow(updates.put)
+    runner = None
+    thread = None
+    version = None
+    while True:
+        try:
+            session = updates.get(timeout=1.0)  # 定期返回，Windows 上 Ctrl+C 才能及时生效
+        except queue.Empty:
+            continue
+        if session is not None and session["version"] == version:
+            # 暂停期间开始时刻没有顺延，继续后协调者会发布新的开始时刻
+            runner.reschedule(None if session["paused"] else session["start"], session["paused"])
+            continue
+        if runner is not None:
+            runner.stop()
+            thread.join()
+            runner = None
+            version = None
+        if session is None:
+            print("协调者当前没有会话，等待开始…", file=sys.stderr)
+            continue
+        try:
+            timeline = build_timeline(validate(session["config"]), session["seed"])
+        except (ConfigError, ValueError) as e:
+            print(f"小组会话的配置无效: {str(e)}", file=sys.stderr)
+            continue
+        # 按协调者的时钟运行，偏移在后台定期重新测量
+        runner = HeadlessRunner(timeline, sinks, clock=client.coordinator_time)
+        runner.paused = session["paused"]
+        version = session["version"]
+        thread = threading.Thread(target=runner.run, args=(session["start"],), daemon=True)
+        thread.start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（无界面模式）")
+    parser.add_argument("--config", default="config.json", help="配置文件路径，默认 config.json")
+    parser.add_argument("--seed", type=int, default=None, help="随机提醒的随机种子，用于复现提醒时间")
+    parser.add_argument(
+        "--sink", action="append", default=[],
+        help="提醒输出端，可重复指定：stdout、json、command:<命令>、socket:<地址>、sound（默认 stdout）",
+    )
+    parser.add_argument("--group", help="跟随小组会话（协调者地址，主机 或 主机:端口）；计划来自协调者，--config 只提供提示音")
+    args = parser.parse_args(argv)
+
+    if args.group:
+        try:
+            client = GroupClient(UdpTransport(*parse_address(args.group)))
+            client.sync()
+            # 声音输出端使用本机配置中的提示音（没有配置文件时用默认设置）
+            try:
+                config = load_config(args.config)
+            except OSError:
+                config = DEFAULT_CONFIG
+            sinks = [create_sink(spec, config) for spec in args.sink or ["stdout"]]
+        except (ConfigError, GroupError, ValueError) as e:
+            print(f"错误: {str(e)}", file=sys.stderr)
+            return 2
+        try:
+            run_group(client, sinks)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.stop()
+            for sink in sinks:
+                sink.close()
+        return 0
+
+    try:
+        config = load_config(args.config)
+        timeline = build_timeline(config, args.seed)
+        sinks = [create_sink(spec, config) for spec in args.sink or ["stdout"]]
+    except (OSError, ConfigError, ValueError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+
+    runner = HeadlessRunner(timeline, sinks)
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        runner.stop()
+    finally:
+        for sink in sinks:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
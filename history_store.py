@@ -0,0 +1,326 @@
+"""
+会话历史：把计时过程中的每个事件追加到本地 SQLite 数据库，并提供按天、按周、按配置方案的汇总查询。
+
+- record()/begin_session()/end_session() 只把记录放入队列，不做任何 I/O，计时线程可以直接调用；
+- 后台写入线程把队列中的记录攒成一批，在一个事务中写入（默认最多每 2 秒一次）；
+- 事件表只存整数和浮点列（时间、日期序号、会话、事件编号、会话内偏移）；
+  写入同一批事件时顺便累加每天、每个方案、每类事件的计数（day_counts），
+  汇总查询只读计数表和会话表，耗时与原始事件的数量无关；
+- 统计页面使用的汇总表（每天专注秒数 day_focus、按天和小时的事件计数 hour_counts）同样增量维护：
+  事件写入时累加小时计数，会话结束时累加当天专注时长（只计计时阶段，不含休息），
+  打开统计页面不需要扫描原始事件。
+"""
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+HISTORY_FILE = "history.db"
+
+# 事件编号（数据库中存储编号，对外使用名称）
+EVENT_KINDS = ("started", "start", "random", "stage_break_start", "total_end", "paused", "resumed", "reset")
+_KIND_CODES = {name: code for code, name in enumerate(EVENT_KINDS)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    seed INTEGER,
+    started REAL NOT NULL,
+    day INTEGER NOT NULL,
+    ended REAL,
+    elapsed REAL,
+    completed INTEGER,
+    focus REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    day INTEGER NOT NULL,
+    session INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    offset REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS day_counts (
+    day INTEGER NOT NULL,
+    profile TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, profile, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS day_focus (
+    day INTEGER NOT NULL,
+    profile TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    sessions INTEGER NOT NULL,
+    PRIMARY KEY (day, profile)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hour_counts (
+    day INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    profile TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, hour, profile, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_session ON events (session);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions (day, profile);
+"""
+
+# 数据库结构版本（PRAGMA user_version），以后修改表结构时据此升级
+SCHEMA_VERSION = 1
+
+
+def day_number(ts):
+    """时间戳对应的本地日期序号（date.toordinal，序号 1 是星期一）"""
+    return datetime.date.fromtimestamp(ts).toordinal()
+
+
+def day_text(day):
+    return datetime.date.fromordinal(day).isoformat()
+
+
+class HistoryStore:
+    """会话历史数据库，写入在后台线程中批量进行"""
+
+    def __init__(self, path=HISTORY_FILE, flush_interval=2.0, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue()   # (表, 记录) 或 (None, threading.Event) 表示立即写入
+        self.thread = None
+        self.read_lock = threading.Lock()
+        self.reader = None
+        self.last_session = 0
+        self.profiles = {}           # 会话编号 -> 方案名，用于累加计数
+        conn = self.connect()
+        try:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            conn.close()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        self.thread = threading.Thread(target=self.writer_loop, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """写入剩余记录并停止写入线程（程序退出前调用）"""
+        if self.thread is not None:
+            self.queue.put((None, None))
+            self.thread.join()
+            self.thread = None
+        with self.read_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    # ---------- 写入（任意线程可调用，不阻塞） ----------
+
+    def begin_session(self, seed, profile="default"):
+        """记录会话开始，返回会话编号"""
+        now = time.time()
+        # 会话编号取开始时刻的毫秒数，不需要等待数据库分配
+        session = max(int(now * 1000), self.last_session + 1)
+        self.last_session = session
+        self.profiles[session] = profile
+        self.queue.put(("sessions", (session, profile, seed, now, day_number(now))))
+        return session
+
+    def resume_session(self, session, profile="default"):
+        """从断点恢复的会话继续使用原来的会话编号"""
+        self.profiles[session] = profile
+
+    def record(self, session, kind, offset):
+        """记录一个事件；offset 为会话已计时的秒数"""
+        now = time.time()
+        row = (now, day_number(now), session, _KIND_CODES[kind], round(offset, 3))
+        self.queue.put(("events", (row, self.profiles.get(session, "default"))))
+
+    def end_session(self, session, elapsed, completed, focus=None):
+        """记录会话结束；completed 表示总计时走完而不是被重置，focus 为其中计时阶段的秒数（不含休息）"""
+        focus = None if focus is None else round(focus, 3)
+        self.queue.put(("ended", (time.time(), round(elapsed, 3), int(completed), focus, session)))
+        self.profiles.pop(session, None)
+
+    def flush(self, timeout=5.0):
+        """等待队列中已有的记录写入数据库"""
+        if self.thread is None:
+            return
+        done = threading.Event()
+        self.queue.put((None, done))
+        done.wait(timeout)
+
+    # ---------- 后台写入 ----------
+
+    def writer_loop(self):
+        conn = self.connect()
+        try:
+            while True:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                # 攒一批记录再写，遇到立即写入请求时提前结束
+                while batch[-1][0] is not None and len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                self.write_batch(conn, batch)
+                table, done = batch[-1]
+                if table is None:
+                    if done is None:
+                        return
+                    done.set()
+        finally:
+            conn.close()
+
+    def write_batch(self, conn, batch):
+        rows = {"sessions": [], "events": [], "ended": []}
+        for table, row in batch:
+            if table is not None:
+                rows[table].append(row)
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO sessions (id, profile, seed, started, day) VALUES (?, ?, ?, ?, ?)",
+                                 rows["sessions"])
+                conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)", [row for row, _ in rows["events"]])
+                counts = Counter((row[1], profile, row[3]) for row, profile in rows["events"])
+                conn.executemany(
+                    "INSERT INTO day_counts VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (day, profile, kind) DO UPDATE SET count = count + excluded.count",
+                    [key + (count,) for key, count in counts.items()])
+                hours = Counter((row[1], time.localtime(row[0]).tm_hour, profile, row[3])
+                                for row, profile in rows["events"])
+                conn.executemany(
+                    "INSERT INTO hour_counts VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (day, hour, profile, kind) DO UPDATE SET count = count + excluded.count",
+                    [key + (count,) for key, count in hours.items()])
+                for ended in rows["ended"]:
+                    # 只有第一次结束才累加当天计时，重复结束不会重复计算
+                    cursor = conn.execute(
+                        "UPDATE sessions SET ended = ?, elapsed = ?, completed = ?, focus = ?"
+                        " WHERE id = ? AND ended IS NULL", ended)
+                    if cursor.rowcount:
+                        conn.execute(
+                            "INSERT INTO day_focus SELECT day, profile, COALESCE(focus, elapsed), 1 FROM sessions"
+                            " WHERE id = ? ON CONFLICT (day, profile) DO UPDATE"
+                            " SET seconds = seconds + excluded.seconds, sessions = sessions + 1",
+                            (ended[4],))
+        except sqlite3.Error as e:
+            print(f"写入会话历史失败: {str(e)}")
+
+    # ---------- 查询 ----------
+
+    def query(self, sql, params=()):
+        with self.read_lock:
+            if self.reader is None:
+                self.reader = self.connect()
+            return self.reader.execute(sql, params).fetchall()
+
+    def daily(self, first_day, last_day, profile=None):
+        """first_day 到 last_day（date 对象）之间每天的汇总，返回 {日期字符串: 汇总}"""
+        return self.aggregate("day", first_day, last_day, profile)
+
+    def weekly(self, first_day, last_day, profile=None):
+        """按周（星期一开始）汇总，键为该周星期一的日期字符串"""
+        return self.aggregate("(day - 1) / 7 * 7 + 1", first_day, last_day, profile)
+
+    def per_profile(self, first_day, last_day):
+        """按配置方案汇总，返回 {方案名: 汇总}"""
+        low, high = first_day.toordinal(), last_day.toordinal()
+        result = {}
+        rows = self.query(
+            "SELECT profile, COUNT(*), SUM(elapsed), SUM(completed) FROM sessions"
+            " WHERE day BETWEEN ? AND ? GROUP BY profile", (low, high))
+        for profile, sessions, elapsed, completed in rows:
+            result[profile] = self.empty_summary(sessions, elapsed, completed)
+        rows = self.query(
+            "SELECT profile, kind, SUM(count) FROM day_counts"
+            " WHERE day BETWEEN ? AND ? GROUP BY profile, kind", (low, high))
+        for profile, kind, count in rows:
+            result.setdefault(profile, self.empty_summary())[EVENT_KINDS[kind]] = count
+        return result
+
+    def aggregate(self, bucket, first_day, last_day, profile):
+        low, high = first_day.toordinal(), last_day.toordinal()
+        if profile is None:
+            profile_filter, params = "", (low, high)
+        else:
+            profile_filter, params = " AND profile = ?", (low, high, profile)
+        result = {}
+        rows = self.query(
+            f"SELECT {bucket} AS b, COUNT(*), SUM(elapsed), SUM(completed) FROM sessions"
+            f" WHERE day BETWEEN ? AND ?{profile_filter} GROUP BY b", params)
+        for key, sessions, elapsed, completed in rows:
+            result[day_text(key)] = self.empty_summary(sessions, elapsed, completed)
+        rows = self.query(
+            f"SELECT {bucket} AS b, kind, SUM(count) FROM day_counts"
+            f" WHERE day BETWEEN ? AND ?{profile_filter} GROUP BY b, kind", params)
+        for key, kind, count in rows:
+            result.setdefault(day_text(key), self.empty_summary())[EVENT_KINDS[kind]] = count
+        return result
+
+    def dashboard(self, days, profile=None):
+        """统计页面的数据：最近 days 天每天的专注秒数和各小时的随机提醒次数、连续天数"""
+        last = datetime.date.today().toordinal()
+        first = last - days + 1
+        profile_filter, params = ("", ()) if profile is None else (" AND profile = ?", (profile,))
+
+        focus = dict(self.query(
+            f"SELECT day, SUM(seconds) FROM day_focus WHERE day BETWEEN ? AND ?{profile_filter} GROUP BY day",
+            (first, last) + params))
+        hourly = [0] * 24
+        for hour, count in self.query(
+                f"SELECT hour, SUM(count) FROM hour_counts"
+                f" WHERE day BETWEEN ? AND ? AND kind = ?{profile_filter} GROUP BY hour",
+                (first, last, _KIND_CODES["random"]) + params):
+            hourly[hour] = count
+
+        active = [day for day, in self.query(
+            f"SELECT DISTINCT day FROM day_focus WHERE seconds > 0{profile_filter} ORDER BY day", params)]
+        return {
+            "first_day": day_text(first),
+            "focus": [focus.get(day, 0) for day in range(first, last + 1)],
+            "hourly": hourly,
+            "streak": current_streak(active, last),
+            "best_streak": best_streak(active),
+        }
+
+    @staticmethod
+    def empty_summary(sessions=0, elapsed=None, completed=None):
+        """一个时间段的汇总：会话数、计时秒数、完成的会话数和各类事件次数"""
+        summary = {"sessions": sessions, "seconds": round(elapsed or 0), "completed": completed or 0}
+        summary.update({kind: 0 for kind in EVENT_KINDS})
+        return summary
+
+
+def current_streak(days, today):
+    """截至今天（今天还没有计时则截至昨天）连续有计时的天数，days 为升序的日期序号"""
+    active = set(days)
+    day = today if today in active else today - 1
+    streak = 0
+    while day in active:
+        streak += 1
+        day -= 1
+    return streak
+
+
+def best_streak(days):
+    """历史最长连续天数"""
+    best = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day == previous + 1 else 1
+        best = max(best, run)
+        previous = day
+    return best
@@ -0,0 +1,141 @@
+"""
+热路径指标：计时唤醒的迟到时间、界面刷新的排队延迟、提示音开始播放的延迟。
+
+指标默认关闭；关闭时调用方只做一次属性判断，不取时间也不加锁：
+
+    metrics = self.metrics
+    if metrics.enabled:
+        metrics.observe("tick_lateness_seconds", lateness)
+
+开启后每个指标是一个固定分桶的直方图，可在调试面板中查看，
+或导出为 Prometheus 文本格式和 JSON。
+
+其他组件自己维护的计数（如已解码音频缓存的命中、未命中、淘汰次数和占用）通过 add_source 注册，
+导出时读取当前值，与指标是否开启无关。
+"""
+import json
+import threading
+from bisect import bisect_left
+
+# 直方图分桶上限（秒），覆盖 0.1 毫秒到 1 秒
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# 指标名称 -> 说明
+DESCRIPTIONS = {
+    "tick_lateness_seconds": "计时线程处理事件时相对时间线截止点的迟到时间",
+    "ui_apply_seconds": "界面刷新相对预定时间的排队延迟",
+    "ui_render_seconds": "一次界面刷新的耗时",
+    "audio_start_seconds": "播放请求到声道开始播放的耗时",
+}
+
+# 计数来源提供的值：名称 -> (Prometheus 类型, 说明)
+SOURCE_DESCRIPTIONS = {
+    "audio_cache_hits": ("counter", "已解码音频缓存的命中次数"),
+    "audio_cache_misses": ("counter", "已解码音频缓存的未命中次数"),
+    "audio_cache_evictions": ("counter", "超出预算被淘汰的音频数"),
+    "audio_cache_entries": ("gauge", "缓存中的音频数"),
+    "audio_cache_bytes": ("gauge", "缓存占用的字节数"),
+    "audio_cache_budget": ("gauge", "缓存的字节预算"),
+}
+
+
+class Histogram:
+    """固定分桶的直方图（非线程安全，由 Metrics 加锁）"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """按分桶估算分位数，返回所在分桶的上限（超过最大分桶时返回最大值）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {str(le): count for le, count in zip(BUCKETS + ("+Inf",), self.counts)},
+        }
+
+
+class Metrics:
+    """一组直方图指标"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {name: Histogram() for name in DESCRIPTIONS}
+        self.sources = {}  # 前缀 -> 返回 {名称: 数值} 的函数
+
+    def add_source(self, prefix, read):
+        """注册计数来源，导出时调用 read()，结果按 前缀_名称 命名"""
+        self.sources[prefix] = read
+
+    def counters(self):
+        """所有计数来源的当前值 {名称: 数值}"""
+        values = {}
+        for prefix, read in list(self.sources.items()):
+            for name, value in read().items():
+                values[f"{prefix}_{name}"] = value
+        return values
+
+    def observe(self, name, value):
+        """记录一个取值（秒）；调用前应先判断 enabled"""
+        with self.lock:
+            self.histograms[name].observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {name: Histogram() for name in DESCRIPTIONS}
+
+    def snapshot(self):
+        """{指标名称: 汇总}"""
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def to_json(self):
+        data = self.snapshot()
+        data["counters"] = self.counters()
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix="timer_"):
+        """Prometheus 文本格式（累计分桶）"""
+        lines = []
+        for name, summary in self.snapshot().items():
+            metric = prefix + name
+            lines.append(f"# HELP {metric} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for le, count in summary["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+            lines.append(f"{metric}_sum {summary['sum']}")
+            lines.append(f"{metric}_count {summary['count']}")
+        for name, value in self.counters().items():
+            metric = prefix + name
+            kind, description = SOURCE_DESCRIPTIONS.get(name, ("gauge", name))
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric}{'_total' if kind == 'counter' else ''} {value}")
+        return "\n".join(lines) + "\n"
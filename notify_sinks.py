@@ -0,0 +1,171 @@
+"""
+提醒输出端：无界面模式下把计时事件发送到标准输出、外部命令或本地套接字。
+
+每个输出端只需实现 emit(event) 和 close()，event 是一个可序列化为 JSON 的字典：
+{"event": 提示音事件, "phase": 阶段, "offset": 会话偏移秒, "total_left": 剩余总秒数}
+"""
+import json
+import os
+import random
+import re
+import shlex
+import socket
+import subprocess
+import sys
+
+# 命令参数中的占位符；其他花括号（如 awk 程序）原样保留，{{ 和 }} 表示单个花括号
+_PLACEHOLDER = re.compile(r"\{\{|\}\}|\{(event|phase|offset|total_left|file|session)\}")
+
+
+class StdoutSink:
+    """逐行输出到标准输出，as_json=True 时输出 JSON 行便于脚本处理"""
+
+    LABELS = {
+        "start": "开始计时",
+        "random": "随机提醒 - 短休息",
+        "stage_break_start": "阶段结束 - 阶段休息",
+        "total_end": "总计时结束",
+    }
+
+    def __init__(self, as_json=False, stream=None):
+        self.as_json = as_json
+        self.stream = stream or sys.stdout
+
+    def emit(self, event):
+        if self.as_json:
+            line = json.dumps(event, ensure_ascii=False)
+        else:
+            total_left = int(event["total_left"])
+            remaining = f"{total_left // 3600:02d}:{total_left % 3600 // 60:02d}:{total_left % 60:02d}"
+            line = f"[剩余 {remaining}] {self.LABELS.get(event['event'], event['event'])}"
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+def expand_placeholders(arg, event):
+    """替换参数中的 {event}、{phase}、{offset}、{total_left}、{file}、{session}，事件中没有的字段替换为空"""
+    def replace(match):
+        if match.group(1) is None:
+            return match.group(0)[0]
+        return str(event.get(match.group(1), ""))
+    return _PLACEHOLDER.sub(replace, arg)
+
+
+class CommandSink:
+    """每个事件启动一次外部命令（不等待其结束），命令参数中的 {event} 等占位符会被替换"""
+
+    def __init__(self, command):
+        self.args = shlex.split(command)
+
+    def emit(self, event):
+        args = [expand_placeholders(arg, event) for arg in self.args]
+        env = dict(os.environ, TIMER_EVENT=event["event"], TIMER_PHASE=event["phase"])
+        try:
+            subprocess.Popen(args, env=env, stdin=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"执行提醒命令失败: {str(e)}", file=sys.stderr)
+
+    def close(self):
+        pass
+
+
+class SocketSink:
+    """向本地套接字发送 JSON 行；地址为 Unix 套接字路径或 host:port，连接断开时下次事件自动重连"""
+
+    def __init__(self, address):
+        self.address = address
+        self.sock = None
+
+    def connect(self):
+        if ":" in self.address and not self.address.startswith("/"):
+            host, port = self.address.rsplit(":", 1)
+            return socket.create_connection((host, int(port)), timeout=1)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(1)
+        sock.connect(self.address)
+        return sock
+
+    def emit(self, event):
+        data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        for _ in range(2):
+            try:
+                if self.sock is None:
+                    self.sock = self.connect()
+                self.sock.sendall(data)
+                return
+            except OSError:
+                self.close()
+        print(f"无法发送到套接字: {self.address}", file=sys.stderr)
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+class SoundSink:
+    """播放配置中的提示音；pygame 仅在第一次播放时导入"""
+
+    def __init__(self, sounds, base_dir="notification"):
+        self.sounds = sounds
+        self.base_dir = base_dir
+        self.pygame = None
+        self.cache = {}
+
+    def emit(self, event):
+        sound_type = event["event"]
+        # 计划中为该阶段单独指定的提示音优先
+        setting = event.get("file")
+        if setting is None:
+            setting = self.sounds.get(sound_type, "")
+        if sound_type == "random":
+            choices = setting or []
+            sound_file = random.choice(choices) if choices else ""
+        else:
+            sound_file = setting
+        if not sound_file:
+            return
+        folder = "notis" if sound_type in ["start", "random"] else "pause"
+        file_path = os.path.join(self.base_dir, folder, sound_file)
+        if not os.path.exists(file_path):
+            print(f"音频文件未找到: {file_path}", file=sys.stderr)
+            return
+        try:
+            if self.pygame is None:
+                import pygame
+                pygame.mixer.init()
+                self.pygame = pygame
+            if file_path not in self.cache:
+                self.cache[file_path] = self.pygame.mixer.Sound(file_path)
+            self.cache[file_path].play()
+        except Exception as e:
+            print(f"播放音频失败: {str(e)}", file=sys.stderr)
+
+    def close(self):
+        if self.pygame is not None:
+            # 等待最后一个提示音播放完再退出
+            while self.pygame.mixer.get_busy():
+                self.pygame.time.wait(50)
+            self.pygame.mixer.quit()
+
+
+def create_sink(spec, config):
+    """根据命令行描述创建输出端：stdout、json、command:<命令>、socket:<地址>、sound"""
+    kind, _, arg = spec.partition(":")
+    if kind == "stdout":
+        return StdoutSink()
+    if kind == "json":
+        return StdoutSink(as_json=True)
+    if kind == "command" and arg:
+        return CommandSink(arg)
+    if kind == "socket" and arg:
+        return SocketSink(arg)
+    if kind == "sound":
+        return SoundSink(config.get("sounds", {}))
+    raise ValueError(f"未知的输出端: {spec}")
@@ -0,0 +1,139 @@
+"""
+学习计划：用一组阶段和循环描述一天的安排，代替固定的 阶段 → 短休息 → 阶段休息 循环。
+
+config.json 中的 "plan" 是一个列表，每一项是一个阶段或一个循环：
+
+    "plan": [
+        {"phase": "stage", "duration": {"minutes": 90}},
+        {"phase": "break", "duration": {"minutes": 20}},
+        {"repeat": 3, "phases": [
+            {"phase": "stage", "duration": {"minutes": 50},
+             "reminder": {"min": 3, "max": 5, "distribution": "poisson"},
+             "sounds": {"random": ["ding.mp3"]}},
+            {"phase": "break", "duration": {"minutes": 10}}
+        ]},
+        {"phase": "break", "duration": {"hours": 1}, "name": "午休"}
+    ]
+
+阶段：
+    phase        "stage"（计时阶段，期间有随机提醒和短休息）或 "break"（阶段休息）
+    duration     时长 {"hours", "minutes", "seconds"}
+    reminder     随机提醒设置（同 random_reminder），缺省使用全局设置，null 表示不提醒
+    short_break  短休息时长，缺省使用全局设置
+    sounds       该阶段的提示音（start / random / stage_break_start），缺省使用全局设置
+    name         可选的名称，仅用于阅读
+
+有计划时总时长为各阶段之和，total_time 和 stage_time 不再使用。
+计划在开始计时时由 timer_engine.build_timeline 一次编译为时间线。
+"""
+from reminder_schedule import DISTRIBUTIONS
+
+PHASE_KINDS = ("stage", "break")
+# 展开循环后允许的最多阶段数，防止写错的循环次数生成巨大的时间线
+MAX_PHASES = 10000
+
+_PHASE_KEYS = {"phase", "duration", "reminder", "short_break", "sounds", "name"}
+_DURATION_KEYS = {"hours", "minutes", "seconds"}
+_SOUND_KINDS = {"start": str, "random": list, "stage_break_start": str}
+
+
+class PlanError(ValueError):
+    """计划内容无效"""
+
+
+def expand_plan(plan):
+    """校验计划并展开所有循环，返回按顺序排列的阶段列表"""
+    if not isinstance(plan, list) or not plan:
+        raise PlanError("计划必须是非空列表")
+    phases = []
+    _expand(plan, "plan", phases)
+    return phases
+
+
+def plan_sounds(plan):
+    """计划中单独指定的所有提示音，格式同配置中的 sounds（用于预加载）"""
+    sounds = {}
+    for phase in expand_plan(plan):
+        for key, value in phase.get("sounds", {}).items():
+            files = sounds.setdefault(key, [])
+            for name in value if isinstance(value, list) else [value]:
+                if name and name not in files:
+                    files.append(name)
+    return sounds
+
+
+def _expand(items, where, phases):
+    for i, item in enumerate(items):
+        path = f"{where}[{i}]"
+        if not isinstance(item, dict):
+            raise PlanError(f"{path} 必须是对象")
+        if "repeat" in item:
+            repeat = item["repeat"]
+            if not _is_int(repeat) or repeat < 1:
+                raise PlanError(f"{path}.repeat 必须是正整数")
+            if not isinstance(item.get("phases"), list) or not item["phases"]:
+                raise PlanError(f"{path}.phases 必须是非空列表")
+            body = []
+            _expand(item["phases"], f"{path}.phases", body)
+            if len(phases) + len(body) * repeat > MAX_PHASES:
+                raise PlanError(f"计划展开后超过 {MAX_PHASES} 个阶段")
+            for _ in range(repeat):
+                phases.extend(body)
+        else:
+            _check_phase(item, path)
+            if len(phases) >= MAX_PHASES:
+                raise PlanError(f"计划展开后超过 {MAX_PHASES} 个阶段")
+            phases.append(item)
+
+
+def _check_phase(phase, path):
+    unknown = set(phase) - _PHASE_KEYS
+    if unknown:
+        raise PlanError(f"{path} 包含未知的配置项: {', '.join(sorted(unknown))}")
+    if phase.get("phase") not in PHASE_KINDS:
+        raise PlanError(f"{path}.phase 必须是 {'/'.join(PHASE_KINDS)} 之一")
+    if _check_duration(phase.get("duration"), f"{path}.duration") <= 0:
+        raise PlanError(f"{path}.duration 必须大于0")
+    if "short_break" in phase:
+        _check_duration(phase["short_break"], f"{path}.short_break")
+    if phase.get("reminder") is not None:
+        _check_reminder(phase["reminder"], f"{path}.reminder")
+    if "sounds" in phase:
+        sounds = phase["sounds"]
+        if not isinstance(sounds, dict):
+            raise PlanError(f"{path}.sounds 必须是对象")
+        for key, value in sounds.items():
+            kind = _SOUND_KINDS.get(key)
+            if kind is None or not isinstance(value, kind):
+                raise PlanError(f"{path}.sounds.{key} 类型错误")
+            if kind is list and not all(isinstance(name, str) for name in value):
+                raise PlanError(f"{path}.sounds.{key} 必须是文件名列表")
+
+
+def _check_duration(value, path):
+    """校验时长并返回秒数"""
+    if not isinstance(value, dict) or not value or set(value) - _DURATION_KEYS:
+        raise PlanError(f"{path} 必须是 {{\"hours\", \"minutes\", \"seconds\"}} 形式的时长")
+    for key, number in value.items():
+        if not _is_int(number) or number < 0:
+            raise PlanError(f"{path}.{key} 必须是不小于 0 的整数")
+    return value.get("hours", 0) * 3600 + value.get("minutes", 0) * 60 + value.get("seconds", 0)
+
+
+def _check_reminder(reminder, path):
+    if not isinstance(reminder, dict):
+        raise PlanError(f"{path} 必须是对象或 null")
+    for key in ("min", "max"):
+        if not _is_int(reminder.get(key)) or reminder[key] < 1:
+            raise PlanError(f"{path}.{key} 必须是正整数")
+    if reminder["max"] < reminder["min"]:
+        raise PlanError(f"{path}.max 不能小于 {path}.min")
+    if reminder.get("distribution", "uniform") not in DISTRIBUTIONS:
+        raise PlanError(f"{path}.distribution 必须是 {'/'.join(DISTRIBUTIONS)} 之一")
+    for key in ("jitter", "min_gap_before_end"):
+        if key in reminder and (not _is_int(reminder[key]) or reminder[key] < 0):
+            raise PlanError(f"{path}.{key} 必须是不小于 0 的整数")
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
@@ -0,0 +1,164 @@
+"""
+配置方案：把多套时间和提示音设置按名称保存在 profiles.json 中，切换时直接替换内存中的配置。
+
+    {"version": 1, "active": "深度工作", "profiles": {"深度工作": {...}, "考试复习": {...}}}
+
+每个方案只包含 PROFILE_KEYS 中的配置项，读取和导入时按完整配置校验。
+切换方案不重新扫描提示音文件夹，提示音由音频引擎在后台预解码；
+记录当前方案的写入与 config.json 一样防抖，并在后台线程中进行。
+"""
+import copy
+import json
+import os
+import threading
+
+from config_store import DEFAULT_CONFIG, ConfigError, validate, write_atomic
+
+PROFILES_FILE = "profiles.json"
+PROFILES_VERSION = 1
+
+# 方案中保存的配置项
+PROFILE_KEYS = ("total_time", "stage_time", "random_reminder", "short_break", "stage_break", "sounds", "plan")
+# 可以没有的配置项：方案中没有时，切换后配置中也不保留
+_OPTIONAL_KEYS = ("plan",)
+
+
+def apply_profile(config, profile):
+    """返回用方案覆盖 config 对应配置项后的新配置"""
+    merged = copy.deepcopy(config)
+    for key in PROFILE_KEYS:
+        if key in profile:
+            merged[key] = copy.deepcopy(profile[key])
+        elif key in _OPTIONAL_KEYS:
+            merged.pop(key, None)
+    return merged
+
+
+def check_profile(name, profile):
+    """校验一个方案，返回只包含方案配置项的副本"""
+    if not isinstance(name, str) or not name.strip():
+        raise ConfigError("方案名称不能为空")
+    if not isinstance(profile, dict):
+        raise ConfigError(f"方案 {name} 必须是 JSON 对象")
+    try:
+        validate(apply_profile(DEFAULT_CONFIG, profile))
+    except ConfigError as e:
+        raise ConfigError(f"方案 {name}: {str(e)}")
+    return {key: copy.deepcopy(profile[key]) for key in PROFILE_KEYS if key in profile}
+
+
+class ProfileStore:
+    """所有配置方案，按名称索引"""
+
+    def __init__(self, path=PROFILES_FILE, delay=0.5):
+        self.path = path
+        self.profiles = {}  # 名称 -> 方案
+        self.active = None
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.timer = None
+        self.pending = None   # 等待写入的文本
+        self.on_error = None  # 后台写入失败时的回调 on_error(exception)
+
+    def load(self):
+        """读取方案文件；文件不存在时为空，内容无效时抛出 ConfigError"""
+        if not os.path.exists(self.path):
+            return
+        profiles, active = self.read_document(self.path)
+        self.profiles = profiles
+        self.active = active if active in profiles else None
+
+    @staticmethod
+    def read_document(path):
+        """读取方案文件或导出文件，返回 ({名称: 方案}, 当前方案名)；单个 config.json 按文件名作为一个方案"""
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ConfigError(f"方案文件不是有效的 JSON: {str(e)}")
+        if isinstance(data, dict) and "profiles" not in data and "total_time" in data:
+            name = os.path.splitext(os.path.basename(path))[0]
+            return {name: check_profile(name, data)}, None
+        if not isinstance(data, dict) or not isinstance(data.get("profiles"), dict):
+            raise ConfigError("方案文件缺少 profiles")
+        if data.get("version", PROFILES_VERSION) > PROFILES_VERSION:
+            raise ConfigError(f"不支持的方案文件版本: {data.get('version')}")
+        profiles = {name: check_profile(name, profile) for name, profile in data["profiles"].items()}
+        return profiles, data.get("active")
+
+    def save(self):
+        """立即写入，取代等待中的写入"""
+        text = self.dump(self.profiles, self.active)
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.pending = None
+            write_atomic(self.path, text)
+
+    def save_later(self):
+        """安排保存：delay 秒内的多次保存只写入最后一次"""
+        text = self.dump(self.profiles, self.active)
+        with self.lock:
+            self.pending = text
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.start()
+
+    def flush(self):
+        """立即写入等待中的内容（程序退出前调用）"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            text, self.pending = self.pending, None
+            if text is None:
+                return
+            try:
+                write_atomic(self.path, text)
+            except OSError as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"保存配置方案失败: {str(e)}")
+
+    @staticmethod
+    def dump(profiles, active=None):
+        data = {"version": PROFILES_VERSION, "active": active, "profiles": profiles}
+        return json.dumps(data, ensure_ascii=False, indent=4)
+
+    def names(self):
+        return list(self.profiles)
+
+    def get(self, name):
+        return self.profiles[name]
+
+    def put(self, name, config):
+        """保存（或覆盖）方案并设为当前方案"""
+        name = name.strip()
+        self.profiles[name] = check_profile(name, {key: config[key] for key in PROFILE_KEYS if key in config})
+        self.active = name
+        self.save()
+
+    def delete(self, name):
+        del self.profiles[name]
+        if self.active == name:
+            self.active = None
+        self.save()
+
+    def set_active(self, name):
+        """切换当前方案（频繁调用，防抖保存）"""
+        self.active = name
+        self.save_later()
+
+    def export(self, path, names=None):
+        """导出指定方案（默认全部）"""
+        names = self.names() if names is None else names
+        write_atomic(path, self.dump({name: self.profiles[name] for name in names}))
+
+    def import_file(self, path):
+        """导入方案文件，同名方案被覆盖，返回导入的方案名列表"""
+        profiles, _ = self.read_document(path)
+        self.profiles.update(profiles)
+        self.save()
+        return list(profiles)
@@ -0,0 +1,68 @@
+"""
+随机提醒时间表：按命名的分布和每个会话独立的随机种子，为一个阶段一次性生成全部提醒时刻。
+
+配置（config.json 的 random_reminder）：
+    "min"/"max"           提醒间隔范围（分钟）
+    "distribution"        uniform（默认）、poisson 或 jittered
+    "jitter"              jittered 分布的抖动幅度（秒），默认 30
+    "min_gap_before_end"  阶段结束前多少秒内不再提醒，默认 0
+
+分布：
+    uniform   间隔在 [min, max] 分钟内均匀分布（整秒），与旧版本一致；
+    poisson   最短 min 分钟，超出部分服从指数分布，平均间隔为 (min+max)/2 分钟；
+    jittered  固定间隔 (min+max)/2 分钟，加减 jitter 秒的均匀抖动。
+"""
+import random
+from itertools import accumulate
+
+
+def _uniform(rng, low, high, jitter, count):
+    return [rng.randint(low, high) for _ in range(count)]
+
+
+def _poisson(rng, low, high, jitter, count):
+    if high == low:
+        return [low] * count
+    rate = 2 / (high - low)  # 超出最短间隔部分的平均值为 (high - low) / 2
+    return [low + round(rng.expovariate(rate)) for _ in range(count)]
+
+
+def _jittered(rng, low, high, jitter, count):
+    base = (low + high) // 2
+    return [max(base + rng.randint(-jitter, jitter), 1) for _ in range(count)]
+
+
+# 分布名称 -> 生成 count 个间隔（整秒）的函数
+DISTRIBUTIONS = {"uniform": _uniform, "poisson": _poisson, "jittered": _jittered}
+
+
+class ReminderSchedule:
+    """一个会话的提醒时间生成器"""
+
+    def __init__(self, reminder_config, seed=None):
+        self.low = reminder_config["min"] * 60
+        self.high = reminder_config["max"] * 60
+        self.distribution = reminder_config.get("distribution", "uniform")
+        self.jitter = reminder_config.get("jitter", 30)
+        self.min_gap_before_end = reminder_config.get("min_gap_before_end", 0)
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"未知的提醒分布: {self.distribution}")
+        if self.low <= 0 or self.high < self.low:
+            raise ValueError("随机提醒时间设置无效")
+        self.draw = DISTRIBUTIONS[self.distribution]
+        self.rng = random.Random(seed)
+
+    def stage_offsets(self, stage_length):
+        """一个阶段内全部提醒的时刻（相对阶段开始的阶段计时秒数），一次生成"""
+        limit = stage_length - self.min_gap_before_end
+        offsets = []
+        last = 0
+        while True:
+            # 按最短间隔估算需要的数量，一次生成一批
+            count = max(int((limit - last) // max(self.low, 1)) + 1, 1)
+            batch = list(accumulate(self.draw(self.rng, self.low, self.high, self.jitter, count), initial=last))[1:]
+            for offset in batch:
+                if offset >= limit:
+                    return offsets
+                offsets.append(offset)
+            last = batch[-1]
@@ -0,0 +1,230 @@
+"""
+多会话宿主：在一个进程、一个线程中运行任意数量互不相关的计时会话。
+
+每个会话有自己的配置和随机种子，时间线预先生成；宿主只维护一个按截止时间排序的小顶堆，
+线程睡到最早的截止时间再处理到期的会话，因此 CPU 占用只与事件数量有关，与会话数量无关。
+
+用法示例（每个配置文件一个会话）：
+    python session_host.py 学生A.json 学生B.json --sink json
+"""
+import argparse
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+from config_store import ConfigError, load_config
+from notify_sinks import create_sink
+from timer_engine import build_timeline, catch_up
+
+
+class HostedSession:
+    """宿主中的一个会话"""
+
+    def __init__(self, session_id, timeline, seed, on_event, start):
+        self.session_id = session_id
+        self.timeline = timeline
+        self.seed = seed
+        self.on_event = on_event
+        self.start = start            # 会话起点（时钟读数），暂停恢复时后移
+        self.index = 0
+        self.paused_at = None
+        self.generation = 0           # 重新排期时加一，使堆中的旧条目失效
+
+    def elapsed(self, now):
+        return (self.paused_at if self.paused_at is not None else now) - self.start
+
+
+class SessionHost:
+    """用一个小顶堆和一个线程驱动所有会话"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.sessions = {}
+        self.heap = []                    # (截止时间, 序号, 会话ID, generation)
+        self.pending = []                 # 待在宿主线程中发出的 (会话, 事件列表)，如新会话的 start
+        self.counter = itertools.count()  # 截止时间相同时保持先后顺序
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    # ---------- 会话管理 ----------
+
+    def add(self, session_id, config, seed=None, on_event=None):
+        """添加并立即开始一个会话；start 事件和之后的事件都在宿主线程中通过 on_event(event) 发出"""
+        timeline = build_timeline(config, seed)
+        with self.cond:
+            if session_id in self.sessions:
+                raise ValueError(f"会话已存在: {session_id}")
+            session = HostedSession(session_id, timeline, seed, on_event, self.clock())
+            self.sessions[session_id] = session
+            self.schedule(session)
+            self.pending.append((session, [(0.0, "start", 0, timeline.sound_file(0))]))
+            self.cond.notify()
+        return session
+
+    def remove(self, session_id):
+        """移除会话，堆中的条目在弹出时被丢弃"""
+        with self.cond:
+            self.sessions.pop(session_id, None)
+
+    def pause(self, session_id):
+        with self.cond:
+            session = self.sessions[session_id]
+            if session.paused_at is None:
+                session.paused_at = self.clock()
+                session.generation += 1
+
+    def resume(self, session_id):
+        with self.cond:
+            session = self.sessions[session_id]
+            if session.paused_at is not None:
+                session.start += self.clock() - session.paused_at
+                session.paused_at = None
+                self.schedule(session)
+                self.cond.notify()
+
+    def state(self, session_id):
+        """查询会话当前状态（timer_engine.SessionState）"""
+        with self.cond:
+            session = self.sessions[session_id]
+            return session.timeline.state_at(session.elapsed(self.clock()), session.index)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    # ---------- 事件循环 ----------
+
+    def start(self):
+        """启动宿主线程"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                if self.pending:
+                    due = [(session, events) for session, events in self.pending
+                           if self.sessions.get(session.session_id) is session]
+                    self.pending = []
+                elif not self.heap:
+                    self.cond.wait()
+                    continue
+                else:
+                    delay = self.heap[0][0] - self.clock()
+                    if delay > 0:
+                        self.cond.wait(delay)
+                        continue
+                    due = self.pop_due()
+            for session, events in due:
+                for offset, sound_event, index, sound_file in events:
+                    self.emit(session, offset, sound_event, index, sound_file)
+
+    def pop_due(self):
+        """弹出所有已到期的会话，推进它们的时间线并重新排期（需持有锁）"""
+        now = self.clock()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, session_id, generation = heapq.heappop(self.heap)
+            session = self.sessions.get(session_id)
+            if session is None or session.generation != generation or session.paused_at is not None:
+                continue  # 已移除、已暂停或已重新排期
+            timeline = session.timeline
+            previous = session.index
+            elapsed = session.elapsed(now)
+            session.index = timeline.index_at(elapsed, previous)
+            # 卡顿或休眠后只发出仍然及时的事件，不把错过的提醒一次性全部补上
+            events = [
+                (offset, sound_event, timeline.index_at(offset), sound_file)
+                for offset, sound_event, sound_file in catch_up(timeline.events_between(previous, session.index), elapsed)
+            ]
+            if timeline.next_offset(session.index) is None:
+                del self.sessions[session_id]  # 会话结束
+            else:
+                self.schedule(session)
+            due.append((session, events))
+        return due
+
+    def schedule(self, session):
+        """把会话的下一个截止时间放入堆（需持有锁）"""
+        next_offset = session.timeline.next_offset(session.index)
+        if next_offset is None:
+            return
+        session.generation += 1
+        heapq.heappush(self.heap, (session.start + next_offset, next(self.counter),
+                                   session.session_id, session.generation))
+
+    def emit(self, session, offset, sound_event, index, sound_file=None):
+        if session.on_event is None:
+            return
+        state = session.timeline.state_at(offset, index)
+        event = {
+            "session": session.session_id,
+            "event": sound_event,
+            "phase": state.phase,
+            "offset": offset,
+            "total_left": state.total_left,
+        }
+        if sound_file is not None:
+            event["file"] = sound_file  # 计划中为该阶段指定的提示音
+        try:
+            session.on_event(event)
+        except Exception as e:
+            print(f"会话 {session.session_id} 事件处理失败: {str(e)}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（多会话宿主）")
+    parser.add_argument("configs", nargs="+", help="每个配置文件对应一个会话")
+    parser.add_argument("--seed", type=int, default=None, help="第 N 个会话使用种子 seed+N")
+    parser.add_argument("--sink", default="json", help="提醒输出端（同 headless.py），默认 json")
+    args = parser.parse_args(argv)
+
+    host = SessionHost()
+    # 声音输出端按各会话自己配置的提示音播放，每个会话一个；其他输出端所有会话共用
+    per_session = args.sink.partition(":")[0] == "sound"
+    sinks = []
+    try:
+        if not per_session:
+            sinks.append(create_sink(args.sink, {}))
+        for n, path in enumerate(args.configs):
+            seed = None if args.seed is None else args.seed + n
+            session_id = path if path not in host.sessions else f"{path}#{n}"
+            config = load_config(path)
+            if per_session:
+                sinks.append(create_sink(args.sink, config))
+            host.add(session_id, config, seed, sinks[-1].emit)
+    except (OSError, ConfigError, ValueError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+
+    host.start()
+    try:
+        while len(host) and host.thread.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.stop()
+        for sink in sinks:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+会话日志：计时过程中把检查点追加到一个很小的预写日志，进程崩溃或重启后可以从断点继续。
+
+时间线由配置和随机种子完全确定，所以日志只需要记录：
+- 第一行：会话头（配置、随机种子、历史记录中的会话编号、开始时间）；
+- 之后每行：检查点（已计时秒数、是否暂停），在阶段切换时和每隔固定时间写入。
+恢复时只读取第一行和最后一行，耗时与会话长短无关；日志超过上限时压缩为头 + 最后一个检查点。
+"""
+import json
+import os
+import threading
+import time
+
+from config_store import write_atomic
+
+JOURNAL_FILE = "session.journal"
+
+
+class SessionJournal:
+    """一个正在进行的会话的检查点日志，线程安全"""
+
+    def __init__(self, path=JOURNAL_FILE, interval=10.0, max_bytes=64 * 1024):
+        self.path = path
+        self.interval = interval      # 非阶段切换时两次检查点的最小间隔（秒）
+        self.max_bytes = max_bytes    # 超过后压缩日志
+        self.lock = threading.Lock()
+        self.file = None
+        self.header = None
+        self.last_write = 0.0
+
+    def begin(self, config, seed, elapsed=0.0, paused=False, session=None):
+        """开始（或恢复）一个会话：重写日志为会话头 + 第一个检查点"""
+        with self.lock:
+            self.close_file()
+            self.header = {"type": "session", "config": config, "seed": seed, "session": session,
+                           "started": time.time()}
+            self.rewrite(self.checkpoint_record(elapsed, paused))
+
+    def checkpoint(self, elapsed, paused=False, boundary=False):
+        """追加检查点；boundary=True（阶段切换、暂停）时立即写入并落盘，否则按间隔节流"""
+        with self.lock:
+            if self.file is None:
+                return
+            now = time.monotonic()
+            if not boundary and now - self.last_write < self.interval:
+                return
+            record = self.checkpoint_record(elapsed, paused)
+            if self.file.tell() > self.max_bytes:
+                self.close_file()
+                self.rewrite(record)
+                return
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            if boundary:
+                os.fsync(self.file.fileno())
+            self.last_write = now
+
+    def finish(self):
+        """会话正常结束或被重置：删除日志"""
+        with self.lock:
+            self.close_file()
+            self.header = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    # 以下方法需在持有锁时调用
+
+    @staticmethod
+    def checkpoint_record(elapsed, paused):
+        return {"type": "checkpoint", "elapsed": round(elapsed, 3), "paused": paused, "wall": time.time()}
+
+    def rewrite(self, record):
+        """原子地写入会话头和一个检查点，然后以追加方式打开"""
+        write_atomic(self.path, json.dumps(self.header, ensure_ascii=False) + "\n" + json.dumps(record) + "\n")
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.last_write = time.monotonic()
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # ---------- 恢复 ----------
+
+    @staticmethod
+    def recover(path=JOURNAL_FILE):
+        """读取未完成的会话，返回 {"config", "seed", "session", "elapsed", "paused", "wall"}；没有或已损坏时返回 None"""
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                # 只读取文件末尾，找到最后一个完整的检查点
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(size - 4096, 0))
+                lines = f.read().splitlines()
+        except (OSError, ValueError):
+            return None
+        if header.get("type") != "session":
+            return None
+        for line in reversed(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 崩溃时写了一半的行
+            if record.get("type") == "checkpoint":
+                return {
+                    "config": header["config"],
+                    "seed": header["seed"],
+                    "session": header.get("session"),
+                    "elapsed": record["elapsed"],
+                    "paused": record["paused"],
+                    "wall": record["wall"],
+                }
+        return None
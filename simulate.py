@@ -0,0 +1,153 @@
+"""
+加速模拟：用虚拟时钟运行完整会话，不真的等待，一个 8 小时的会话在毫秒级完成。
+
+每次运行使用不同的随机种子，汇总报告：
+- 阶段切换和提醒的触发误差（实际触发时刻 - 时间线上的时刻），可用 --wake-latency 模拟系统唤醒延迟；
+- 随机提醒间隔的分布（阶段计时内的秒数）；
+- 每模拟小时的 CPU 时间和唤醒次数。
+
+用法示例：
+    python simulate.py --config config.json --runs 1000
+    python simulate.py --runs 200 --wake-latency 0.005 --json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+from config_store import ConfigError, load_config
+from headless import HeadlessRunner
+from timer_engine import SOUND_EVENTS, STAGE, build_timeline
+
+
+class SimulatedClock:
+    """虚拟单调时钟：wait() 直接把时间推进到唤醒时刻，再加上随机的唤醒延迟"""
+
+    def __init__(self, wake_latency=0.0, seed=None):
+        self.now = 0.0
+        self.wake_latency = wake_latency
+        self.rng = random.Random(seed)
+        self.wakeups = 0
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, timeout):
+        self.wakeups += 1
+        self.now += timeout + self.rng.uniform(0, self.wake_latency)
+        return False
+
+
+class RecordingSink:
+    """记录每个事件的实际触发时刻与时间线时刻之差"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.start = clock()
+        self.errors = []
+
+    def emit(self, event):
+        self.errors.append(self.clock() - self.start - event["offset"])
+
+    def close(self):
+        pass
+
+
+def reminder_gaps(timeline):
+    """时间线中相邻两次随机提醒之间的间隔（阶段计时秒数，每个阶段从阶段开始算起）"""
+    random_code = SOUND_EVENTS.index("random")
+    gaps = []
+    last = 0.0
+    for i in range(len(timeline)):
+        length = timeline.stage_length[i]
+        if timeline.phases[i] == STAGE and timeline.stage_left[i] == length:
+            last = 0.0  # 新阶段
+        elif timeline.sounds[i] == random_code:
+            position = length - timeline.stage_left[i]
+            gaps.append(position - last)
+            last = position
+    return gaps
+
+
+def percentiles(values, points=(50, 90, 99, 100)):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in points}
+
+
+def simulate(config, runs, seed=0, wake_latency=0.0):
+    """运行 runs 次完整会话，返回汇总结果"""
+    errors = []
+    gaps = []
+    wakeups = 0
+    simulated = 0.0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for run in range(runs):
+        timeline = build_timeline(config, seed + run)
+        clock = SimulatedClock(wake_latency, seed + run)
+        sink = RecordingSink(clock)
+        HeadlessRunner(timeline, [sink], clock=clock, wait=clock.wait).run()
+        errors.extend(sink.errors)
+        gaps.extend(reminder_gaps(timeline))
+        wakeups += clock.wakeups
+        simulated += timeline.total_duration
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    hours = simulated / 3600
+
+    # 提醒间隔按分钟分组
+    histogram = Counter(int(gap // 60) for gap in gaps)
+    return {
+        "runs": runs,
+        "simulated_hours": round(hours, 2),
+        "speedup": round(simulated / wall) if wall else None,
+        "events": len(errors),
+        "fire_error_ms": {k: round(v * 1000, 3) for k, v in percentiles(errors).items()},
+        "reminder_gap_s": percentiles(gaps),
+        "reminder_gap_minutes": {str(minute): histogram[minute] for minute in sorted(histogram)},
+        "cpu_ms_per_hour": round(cpu * 1000 / hours, 3) if hours else None,
+        "wakeups_per_hour": round(wakeups / hours, 1) if hours else None,
+    }
+
+
+def print_report(result):
+    print(f"模拟 {result['runs']} 次，共 {result['simulated_hours']} 小时（约为实时的 {result['speedup']} 倍）")
+    print(f"事件数: {result['events']}")
+    print(f"触发误差 (ms): {result['fire_error_ms']}")
+    print(f"提醒间隔 (秒): {result['reminder_gap_s']}")
+    print("提醒间隔分布（分钟: 次数）:")
+    total = sum(result["reminder_gap_minutes"].values()) or 1
+    for minute, count in result["reminder_gap_minutes"].items():
+        print(f"  {minute:>3} {'#' * max(1, count * 50 // total)} {count}")
+    print(f"每模拟小时 CPU: {result['cpu_ms_per_hour']} ms，唤醒: {result['wakeups_per_hour']} 次")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多阶段随机提醒计时器（加速模拟）")
+    parser.add_argument("--config", default="config.json", help="配置文件路径，默认 config.json")
+    parser.add_argument("--runs", type=int, default=1000, help="模拟的会话次数")
+    parser.add_argument("--seed", type=int, default=0, help="第一次运行的随机种子，之后依次加一")
+    parser.add_argument("--wake-latency", type=float, default=0.0, help="模拟的最大唤醒延迟（秒）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        result = simulate(config, args.runs, args.seed, args.wake_latency)
+    except (OSError, ConfigError, ValueError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+提示音库索引：启动时扫描一次 notification 下的音频文件，之后由后台监视线程增量更新。
+
+界面和播放都从索引查询文件列表，不再各自调用 os.listdir。
+标准库没有跨平台的 inotify 接口，监视线程以轮询方式比较文件的修改时间和大小，
+只有新增或变化的文件才会重新读取时长和校验和。
+
+查询从不等待扫描：首次扫描期间返回已发布的部分索引（indexed 之前可能为空）。
+每次扫描先发布名称、大小和时长，再逐个补上需要读完整个文件的校验和。
+"""
+import hashlib
+import os
+import threading
+import time
+import wave
+from collections import namedtuple
+
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+SOUND_FOLDERS = ("notis", "pause")
+
+# 索引中的一条记录，duration 无法识别时为 None，checksum 尚未计算时为 None
+SoundInfo = namedtuple("SoundInfo", "name folder path format size mtime_ns duration checksum")
+
+# MPEG-1 Layer III 比特率表（kbps）和采样率表
+_MP3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MP3_SAMPLE_RATES = (44100, 48000, 32000)
+
+
+def file_checksum(path):
+    """文件内容的校验和（blake2b-128，十六进制）"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe_duration(path, fmt):
+    """读取音频时长（秒）：wav 读文件头，mp3 按首帧比特率估算"""
+    try:
+        if fmt == "wav":
+            with wave.open(path, "rb") as w:
+                return w.getnframes() / w.getframerate()
+        if fmt == "mp3":
+            return _mp3_duration(path)
+    except (OSError, EOFError, wave.Error):
+        pass
+    return None
+
+
+def _mp3_duration(path):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(10)
+        offset = 0
+        if head[:3] == b"ID3" and len(head) == 10:
+            # 跳过 ID3v2 标签（长度为 4 个 7 位字节）
+            offset = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+        f.seek(offset)
+        data = f.read(4096)
+    for i in range(len(data) - 3):
+        if data[i] == 0xFF and (data[i + 1] & 0xFE) == 0xFA:  # MPEG-1 Layer III 帧同步
+            bitrate_index = data[i + 2] >> 4
+            rate_index = (data[i + 2] >> 2) & 0x3
+            if 0 < bitrate_index < len(_MP3_BITRATES) and rate_index < len(_MP3_SAMPLE_RATES):
+                bitrate = _MP3_BITRATES[bitrate_index] * 1000
+                return (size - offset - i) * 8 / bitrate
+    return None
+
+
+class SoundLibrary:
+    """notification 文件夹的音频索引"""
+
+    def __init__(self, base_dir="notification", folders=SOUND_FOLDERS):
+        self.base_dir = base_dir
+        self.folders = folders
+        self.index = {folder: {} for folder in folders}  # 文件夹 -> {文件名: SoundInfo}
+        self.lock = threading.Lock()
+        self.scan_lock = threading.Lock()  # 监视线程和手动刷新不同时扫描
+        self.indexed = threading.Event()  # 首次扫描的文件名索引已发布
+        self.ready = threading.Event()    # 首次扫描（含校验和与回调）完成
+        self.ready_at = None  # 首次扫描完成的时刻（perf_counter），用于启动耗时统计
+        self.listeners = []
+        self.stop_event = threading.Event()
+        self.watcher = None
+
+    # ---------- 查询 ----------
+
+    def files(self, folder):
+        """文件夹中的音频文件名（已排序）"""
+        with self.lock:
+            return sorted(self.index.get(folder, {}))
+
+    def get(self, folder, name):
+        """查询一条记录，不存在时返回 None"""
+        with self.lock:
+            return self.index.get(folder, {}).get(name)
+
+    def has_any(self):
+        """是否至少有一个音频文件"""
+        with self.lock:
+            return any(self.index.values())
+
+    @property
+    def scanning(self):
+        """首次扫描的文件名索引是否尚未发布"""
+        return not self.indexed.is_set()
+
+    # ---------- 扫描 ----------
+
+    def add_listener(self, callback):
+        """注册变化回调 callback(changes)，changes 为 [(added/changed/removed, SoundInfo)]，在监视线程中调用"""
+        self.listeners.append(callback)
+
+    def start(self, interval=2.0):
+        """在后台完成首次扫描，然后每隔 interval 秒增量检查一次"""
+        if self.watcher is None:
+            self.watcher = threading.Thread(target=self.watch, args=(interval,), daemon=True)
+            self.watcher.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def watch(self, interval):
+        self.refresh(on_indexed=self.indexed.set)
+        self.ready_at = time.perf_counter()
+        self.ready.set()
+        while not self.stop_event.wait(interval):
+            self.refresh()
+
+    def refresh(self, on_indexed=None):
+        """增量扫描所有文件夹，返回变化列表并通知监听者；on_indexed 在文件名索引发布后、计算校验和前调用"""
+        with self.scan_lock:
+            changes = []
+            for folder in self.folders:
+                changes.extend(self.refresh_folder(folder))
+            if on_indexed is not None:
+                on_indexed()
+            changes = self.add_checksums(changes)
+        if changes:
+            for callback in self.listeners:
+                try:
+                    callback(changes)
+                except Exception as e:
+                    print(f"音频库回调失败: {str(e)}")
+        return changes
+
+    def refresh_folder(self, folder):
+        folder_path = os.path.join(self.base_dir, folder)
+        found = {}
+        try:
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                        st = entry.stat()
+                        found[entry.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+
+        with self.lock:
+            known = dict(self.index[folder])
+
+        changes = []
+        for name, (mtime_ns, size) in found.items():
+            info = known.get(name)
+            if info is not None and info.mtime_ns == mtime_ns and info.size == size:
+                continue
+            changes.append(("changed" if info else "added", self.describe(folder, name, mtime_ns, size)))
+        for name, info in known.items():
+            if name not in found:
+                changes.append(("removed", info))
+
+        if changes:
+            with self.lock:
+                for kind, info in changes:
+                    if kind == "removed":
+                        self.index[folder].pop(info.name, None)
+                    else:
+                        self.index[folder][info.name] = info
+        return changes
+
+    def add_checksums(self, changes):
+        """为新增或变化的记录补上校验和并更新索引，返回更新后的变化列表（需持有 scan_lock）"""
+        result = []
+        for kind, info in changes:
+            if kind != "removed":
+                try:
+                    info = info._replace(checksum=file_checksum(info.path))
+                except OSError:
+                    pass  # 文件已消失，下次扫描时移除
+                else:
+                    with self.lock:
+                        self.index[info.folder][info.name] = info
+            result.append((kind, info))
+        return result
+
+    def describe(self, folder, name, mtime_ns, size):
+        """读取一个文件的时长（只读文件头），校验和稍后由 add_checksums 补上"""
+        path = os.path.join(self.base_dir, folder, name)
+        fmt = os.path.splitext(name)[1].lower().lstrip(".")
+        return SoundInfo(name, folder, path, fmt, size, mtime_ns, probe_duration(path, fmt), None)
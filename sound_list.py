@@ -0,0 +1,147 @@
+"""
+虚拟化的提示音列表控件：只创建可见的几行控件，滚动时复用这些行显示不同的文件。
+
+选中状态保存在一个集合中，而不是每个文件一个 Tk 变量；支持按名称搜索过滤，
+多选模式下可以一次勾选或清除当前过滤结果。
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualSoundList(ttk.Frame):
+    """提示音选择列表"""
+
+    def __init__(self, parent, files, selected=(), multiple=True, on_play=None, visible_rows=6):
+        super().__init__(parent)
+        self.files = list(files)
+        self.filtered = self.files
+        self.selected = set(selected)
+        self.multiple = multiple
+        self.on_play = on_play
+        self.visible_rows = visible_rows
+        self.first = 0  # 第一行可见行对应的过滤结果下标
+
+        # 搜索栏
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(search_frame, text="搜索").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.apply_filter())
+        ttk.Entry(search_frame, textvariable=self.search_var, width=16).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        if multiple:
+            ttk.Button(search_frame, text="全选", width=4, command=self.select_filtered).pack(side=tk.LEFT, padx=2)
+            ttk.Button(search_frame, text="清空", width=4, command=self.clear_filtered).pack(side=tk.LEFT, padx=2)
+
+        # 固定数量的行控件，滚动时只更换内容
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        rows_frame = ttk.Frame(body)
+        rows_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.rows = []
+        for slot in range(visible_rows):
+            frame = ttk.Frame(rows_frame)
+            frame.pack(fill=tk.X, pady=2)
+            var = tk.BooleanVar()
+            chk = ttk.Checkbutton(frame, variable=var, command=lambda s=slot: self.on_toggle(s))
+            chk.pack(side=tk.LEFT, padx=5)
+            btn = ttk.Button(frame, text="播放", command=lambda s=slot: self.on_play_row(s))
+            btn.pack(side=tk.RIGHT, padx=5)
+            self.rows.append((chk, var, btn))
+
+        for widget in (self, rows_frame) + tuple(w for row in self.rows for w in (row[0], row[2])):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_to(self.first - 1))
+            widget.bind("<Button-5>", lambda e: self.scroll_to(self.first + 1))
+
+        self.redraw()
+
+    # ---------- 数据 ----------
+
+    def set_files(self, files):
+        """更换文件列表（刷新音频列表时调用），保留仍存在的选中项"""
+        self.files = list(files)
+        self.selected &= set(self.files)
+        self.apply_filter()
+
+    def set_selected(self, selected):
+        """更换选中项（切换配置方案时调用）"""
+        self.selected = set(selected) & set(self.files)
+        self.redraw()
+
+    def get_selected(self):
+        """按文件列表顺序返回选中的文件"""
+        return [f for f in self.files if f in self.selected]
+
+    def apply_filter(self):
+        text = self.search_var.get().strip().lower()
+        self.filtered = [f for f in self.files if text in f.lower()] if text else self.files
+        self.scroll_to(0)
+
+    def select_filtered(self):
+        self.selected.update(self.filtered)
+        self.redraw()
+
+    def clear_filtered(self):
+        self.selected.difference_update(self.filtered)
+        self.redraw()
+
+    # ---------- 显示 ----------
+
+    def redraw(self):
+        """把当前可见范围的文件填入行控件，并更新滚动条"""
+        for slot, (chk, var, btn) in enumerate(self.rows):
+            index = self.first + slot
+            if index < len(self.filtered):
+                name = self.filtered[index]
+                chk.config(text=name, state=tk.NORMAL)
+                var.set(name in self.selected)
+                btn.config(state=tk.NORMAL)
+            else:
+                chk.config(text="", state=tk.DISABLED)
+                var.set(False)
+                btn.config(state=tk.DISABLED)
+
+        total = len(self.filtered)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + self.visible_rows) / total)
+
+    def scroll_to(self, first):
+        max_first = max(len(self.filtered) - self.visible_rows, 0)
+        self.first = min(max(int(first), 0), max_first)
+        self.redraw()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.filtered)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.first - (1 if event.delta > 0 else -1))
+
+    # ---------- 交互 ----------
+
+    def on_toggle(self, slot):
+        index = self.first + slot
+        if index >= len(self.filtered):
+            return
+        name = self.filtered[index]
+        if self.rows[slot][1].get():
+            if not self.multiple:
+                # 单选：勾选新文件时取消其他文件
+                self.selected.clear()
+            self.selected.add(name)
+        else:
+            self.selected.discard(name)
+        self.redraw()
+
+    def on_play_row(self, slot):
+        index = self.first + slot
+        if index < len(self.filtered) and self.on_play:
+            self.on_play(self.filtered[index])
@@ -0,0 +1,47 @@
+"""
+启动耗时统计：记录启动各步骤的开始和结束时刻（相对主程序开始执行），--profile-startup 时打印报告。
+
+    startup = StartupProfile(origin)
+    with startup.phase("界面"):
+        self.setup_ui()
+
+后台线程中的步骤同样可以记录，报告中标注所在线程。
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """启动各步骤的耗时记录，线程安全"""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []  # (名称, 开始, 结束, 线程名)，时刻相对 origin（秒）
+        self.lock = threading.Lock()
+
+    def mark(self, name, start, end=None):
+        """记录一个步骤，start/end 为 perf_counter 时刻，end 省略时为现在"""
+        end = time.perf_counter() if end is None else end
+        thread = threading.current_thread()
+        thread_name = "主线程" if thread is threading.main_thread() else thread.name
+        with self.lock:
+            self.phases.append((name, start - self.origin, end - self.origin, thread_name))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, start)
+
+    def report(self):
+        """按开始时刻排序的耗时报告（毫秒）"""
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        lines = ["启动耗时（毫秒，从主程序开始执行算起）:",
+                 f"  {'步骤':<14}{'开始':>8}{'结束':>8}{'耗时':>8}  线程"]
+        for name, start, end, thread_name in phases:
+            lines.append(f"  {name:<14}{start * 1000:>8.1f}{end * 1000:>8.1f}{(end - start) * 1000:>8.1f}  {thread_name}")
+        return "\n".join(lines)
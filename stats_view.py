@@ -0,0 +1,75 @@
+"""
+统计页面：在 Tk Canvas 上绘制每天的计时时长、各小时的随机提醒次数和连续天数。
+
+数据来自 HistoryStore.dashboard() 读取的汇总表，不扫描原始事件；
+天数多于画布能容纳的柱子时，先把相邻几天合并为一根柱子（取平均）再绘制。
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# 时间范围选项：显示文本 -> 天数
+RANGES = {"最近 30 天": 30, "最近 90 天": 90, "最近一年": 365, "最近三年": 1095}
+# 每根柱子的最小宽度（像素）
+MIN_BAR_WIDTH = 4
+
+
+def downsample(values, max_points):
+    """把 values 按顺序分组，每组取平均，使结果不超过 max_points 个"""
+    if len(values) <= max_points:
+        return list(values)
+    size = -(-len(values) // max_points)  # 向上取整
+    return [sum(values[i:i + size]) / len(values[i:i + size]) for i in range(0, len(values), size)]
+
+
+class StatsView(ttk.Frame):
+    """统计页签"""
+
+    def __init__(self, parent, history, width=380, height=200):
+        super().__init__(parent)
+        self.history = history
+        self.width = width
+        self.height = height
+
+        top = ttk.Frame(self)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        self.range_var = tk.StringVar(value=next(iter(RANGES)))
+        combo = ttk.Combobox(top, textvariable=self.range_var, values=list(RANGES), state="readonly", width=10)
+        combo.pack(side=tk.LEFT)
+        combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+        self.streak_label = ttk.Label(top, text="")
+        self.streak_label.pack(side=tk.RIGHT)
+
+        self.canvas = tk.Canvas(self, width=width, height=height, bg="white", highlightthickness=0)
+        self.canvas.pack(padx=5)
+
+    def refresh(self):
+        """重新读取汇总数据并重绘（切换到该页签或更换时间范围时调用）"""
+        data = self.history.dashboard(RANGES[self.range_var.get()])
+        self.streak_label.config(text=f"连续 {data['streak']} 天 · 最长 {data['best_streak']} 天")
+
+        self.canvas.delete("all")
+        half = self.height // 2
+        minutes = [seconds / 60 for seconds in data["focus"]]
+        self.draw_bars(minutes, 0, half, "#4a90d9", f"每天专注（分钟，不含休息），自 {data['first_day']}")
+        self.draw_bars(data["hourly"], half, half, "#e8a33d", "各小时随机提醒次数（0-23 时）")
+
+    def draw_bars(self, values, top, height, color, title):
+        """在画布的 [top, top + height) 区域画一组柱状图"""
+        self.canvas.create_text(4, top + 2, text=title, anchor="nw", fill="#555")
+        chart_top = top + 18
+        chart_height = height - 24
+        values = downsample(values, self.width // MIN_BAR_WIDTH)
+        peak = max(values) if values else 0
+        self.canvas.create_text(self.width - 4, top + 2, text=f"最大 {peak:.0f}", anchor="ne", fill="#555")
+        if not peak:
+            return
+        bar_width = self.width / len(values)
+        bottom = chart_top + chart_height
+        for i, value in enumerate(values):
+            if value <= 0:
+                continue
+            x = i * bar_width
+            bar_height = value / peak * chart_height
+            self.canvas.create_rectangle(x + 1, bottom - bar_height, x + bar_width - 1, bottom,
+                                         fill=color, outline="")
+        self.canvas.create_line(0, bottom, self.width, bottom, fill="#999")
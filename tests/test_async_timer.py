@@ -0,0 +1,93 @@
+"""
+asyncio 计时核心：事件顺序与时间线一致，暂停顺延，取消时输出 SessionEnded(cancelled=True)。
+
+假时钟直接跳到下一个截止点，events() 不需要真正等待。
+"""
+import asyncio
+import copy
+
+from async_timer import AsyncTimer, PhaseStarted, Reminder, SessionEnded
+from config_store import DEFAULT_CONFIG, validate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_config():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": 1, "minutes": 0, "seconds": 0}
+    config["stage_time"] = {"hours": 0, "minutes": 20, "seconds": 0}
+    return validate(config)
+
+
+def test_events_follow_timeline():
+    clock = FakeClock()
+    timer = AsyncTimer(make_config(), seed=3, clock=clock)
+    timeline = timer.timeline
+
+    async def collect():
+        events = []
+        stream = timer.events()
+        events.append(await stream.__anext__())
+        while True:
+            next_offset = timeline.next_offset(timer.index)
+            if next_offset is None:
+                break
+            clock.now = timer.start + next_offset
+            events.append(await stream.__anext__())
+        return events
+
+    events = asyncio.run(collect())
+    assert events == [timer.make_event(i) for i in range(len(timeline))]
+    assert isinstance(events[0], PhaseStarted) and events[0].offset == 0
+    assert any(isinstance(event, Reminder) for event in events)
+    assert events[-1] == SessionEnded(3600)
+
+
+def test_pause_delays_next_event():
+    clock = FakeClock()
+    timer = AsyncTimer(make_config(), seed=3, clock=clock)
+    first = timer.timeline.next_offset(0)
+
+    async def scenario():
+        stream = timer.events()
+        await stream.__anext__()
+        clock.now += 10
+        paused = await timer.pause()
+        pending = asyncio.ensure_future(stream.__anext__())
+        clock.now += first * 2  # 暂停期间不计时
+        await asyncio.sleep(0)
+        assert not pending.done()
+        resumed = await timer.resume()
+        assert resumed.total_left == paused.total_left
+        clock.now += first - 10
+        timer.notify()
+        return await pending
+
+    event = asyncio.run(scenario())
+    assert event.offset == first
+
+
+def test_cancel_ends_session():
+    clock = FakeClock()
+    timer = AsyncTimer(make_config(), seed=3, clock=clock)
+
+    async def scenario():
+        stream = timer.events()
+        await stream.__anext__()
+        clock.now += 5
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await timer.cancel()
+        ended = await pending
+        rest = [event async for event in stream]
+        return ended, rest
+
+    ended, rest = asyncio.run(scenario())
+    assert ended == SessionEnded(5, cancelled=True)
+    assert rest == []
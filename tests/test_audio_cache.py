@@ -0,0 +1,70 @@
+"""
+已解码音频缓存：LRU 淘汰、字节预算、文件替换后失效，以及计数导出为指标。
+"""
+import os
+
+from audio_cache import AudioCache, file_key
+from metrics import Metrics
+
+
+def test_evicts_least_recently_used():
+    cache = AudioCache(budget=300)
+    for name in "abc":
+        assert cache.put((name, 1, 1), name.upper(), 100)
+    assert cache.get(("a", 1, 1)) == "A"  # a 变为最近使用
+    cache.put(("d", 1, 1), "D", 100)
+    assert cache.get(("b", 1, 1)) is None
+    assert [cache.get((name, 1, 1)) for name in "acd"] == ["A", "C", "D"]
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 300 and stats["entries"] == 3
+    assert stats["hits"] == 4 and stats["misses"] == 1
+
+
+def test_oversized_entry_is_not_cached():
+    cache = AudioCache(budget=100)
+    assert not cache.put(("big", 1, 1), "BIG", 101)
+    assert cache.get(("big", 1, 1)) is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_set_budget_evicts_immediately():
+    cache = AudioCache(budget=300)
+    for name in "abc":
+        cache.put((name, 1, 1), name, 100)
+    cache.set_budget(150)
+    assert cache.stats()["entries"] == 1
+    assert cache.get(("c", 1, 1)) == "c"
+
+
+def test_replaced_file_drops_old_version(tmp_path):
+    path = str(tmp_path / "ding.wav")
+    with open(path, "wb") as f:
+        f.write(b"old")
+    old_key = file_key(path)
+    cache = AudioCache(budget=1000)
+    cache.put(old_key, "old", 10)
+    with open(path, "wb") as f:
+        f.write(b"newer")
+    os.utime(path, ns=(old_key[1] + 10 ** 9, old_key[1] + 10 ** 9))
+    new_key = file_key(path)
+    assert new_key != old_key
+    assert cache.get(new_key) is None
+    cache.put(new_key, "new", 10)
+    assert cache.get(old_key) is None
+    assert cache.get_latest(path) == "new"
+    cache.invalidate(path)
+    assert cache.get_latest(path) is None and cache.stats()["bytes"] == 0
+
+
+def test_cache_counters_are_exported():
+    cache = AudioCache(budget=100)
+    cache.put(("a", 1, 1), "A", 60)
+    cache.get(("a", 1, 1))
+    cache.get(("b", 1, 1))
+    metrics = Metrics()
+    metrics.add_source("audio_cache", cache.stats)
+    assert metrics.counters()["audio_cache_hits"] == 1
+    text = metrics.to_prometheus()
+    assert "timer_audio_cache_misses_total 1" in text
+    assert "# TYPE timer_audio_cache_bytes gauge" in text and "timer_audio_cache_bytes 60" in text
+    assert '"audio_cache_evictions": 0' in metrics.to_json()
@@ -0,0 +1,102 @@
+"""
+提示音导入：缓存文件命名、索引和待处理文件、处理流程（去静音、响度归一、格式转换），
+以及命令行与程序使用同一格式和响度目标。
+"""
+import json
+import math
+import os
+import struct
+import wave
+
+import pytest
+
+import audio_import
+from audio_cache import file_key
+from audio_engine import MIXER_CHANNELS, MIXER_FREQUENCY, AudioEngine
+from audio_import import PcmCache, PcmFormat, library_paths, process_file
+
+needs_audioop = pytest.mark.skipif(audio_import.audioop is None, reason="缺少 audioop")
+
+
+def write_wav(path, seconds=0.5, rate=22050, amplitude=3000, silence=0.2):
+    """单声道 16 位正弦波，前后各有 silence 秒静音"""
+    quiet = [0] * int(rate * silence)
+    tone = [int(amplitude * math.sin(2 * math.pi * 440 * i / rate)) for i in range(int(rate * seconds))]
+    samples = quiet + tone + quiet
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def test_cache_name_depends_on_format():
+    fmt = PcmFormat(44100, 2)
+    assert fmt.cache_name("abc") == PcmFormat(44100, 2, -20).cache_name("abc")  # 整数与浮点目标相同
+    assert fmt.cache_name("abc") != PcmFormat(44100, 2, -18).cache_name("abc")
+    assert fmt.cache_name("abc") != PcmFormat(48000, 2).cache_name("abc")
+    assert fmt.cache_name("abc") != fmt.cache_name("abd")
+    assert fmt.cache_name("abc").endswith(".pcm")
+
+
+def test_index_pending_and_read(tmp_path):
+    sound = tmp_path / "ding.wav"
+    sound.write_bytes(b"RIFF")
+    fmt = PcmFormat(44100, 2)
+    cache = PcmCache(fmt, str(tmp_path / "cache"))
+    assert cache.pending([str(sound), str(tmp_path / "missing.wav")]) == [str(sound)]
+
+    key = file_key(str(sound))
+    cache.index[str(sound)] = {"mtime_ns": key[1], "size": key[2], "checksum": "abc", "gain_db": 0.0}
+    os.makedirs(cache.cache_dir)
+    (tmp_path / "cache" / fmt.cache_name("abc")).write_bytes(b"pcm")
+    cache.save_index()
+    assert PcmCache(fmt, cache.cache_dir).read(key) == b"pcm"
+    assert cache.pending([str(sound)]) == []
+
+    sound.write_bytes(b"RIFF-changed")  # 文件变化后缓存失效
+    assert cache.read(file_key(str(sound))) is None
+    assert cache.pending([str(sound)]) == [str(sound)]
+
+
+@needs_audioop
+def test_process_file_trims_normalizes_and_converts(tmp_path):
+    source = tmp_path / "ding.wav"
+    write_wav(source)
+    fmt = PcmFormat(44100, 2, -20)
+    entry = process_file(str(source), fmt, str(tmp_path))
+    frames = (tmp_path / fmt.cache_name(entry["checksum"])).read_bytes()
+
+    seconds = len(frames) / (44100 * 2 * 2)
+    assert 0.5 <= seconds < 0.55  # 首尾静音已去掉，两端各保留一个窗口
+    rms = audio_import.audioop.rms(frames, 2)
+    assert 20 * math.log10(rms / audio_import.FULL_SCALE) == pytest.approx(-20, abs=0.5)
+    assert entry["gain_db"] > 0
+    assert process_file(str(source), fmt, str(tmp_path))["reused"] is True
+
+
+@needs_audioop
+def test_cli_uses_configured_target_and_app_format(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("notification/notis")
+    write_wav(tmp_path / "notification" / "notis" / "ding.wav")
+    with open("config.json", "w", encoding="utf-8") as f:
+        json.dump({"total_time": {"hours": 1, "minutes": 0, "seconds": 0}, "audio_target_db": -18}, f)
+    assert audio_import.main(["--workers", "1"]) == 0
+
+    # 程序按混音器格式和同一配置创建的缓存能直接读到命令行处理的结果
+    engine = AudioEngine()
+    engine.set_target_db(-18)
+    with engine.pcm_lock:
+        cache = engine.new_pcm_cache(MIXER_FREQUENCY, MIXER_CHANNELS)
+    path = library_paths()[0]
+    assert cache.read(file_key(path))
+    cache.prune()
+    assert len([name for name in os.listdir("sound_cache") if name.endswith(".pcm")]) == 1
+
+
+def test_cli_rejects_invalid_config(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text('{"version": 99}', encoding="utf-8")
+    assert audio_import.main([]) == 2
+    assert "加载配置文件失败" in capsys.readouterr().err
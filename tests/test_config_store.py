@@ -0,0 +1,103 @@
+"""
+配置：校验、旧版本迁移、部分修改的合并，以及原子化、防抖的保存。
+"""
+import copy
+import json
+import os
+import tempfile
+
+import pytest
+
+import config_store
+from config_store import (DEFAULT_CONFIG, SCHEMA_VERSION, ConfigError, ConfigStore, merge_config, parse_config,
+                          validate, write_atomic)
+
+
+def test_default_config_is_valid():
+    validate(copy.deepcopy(DEFAULT_CONFIG))
+
+
+@pytest.mark.parametrize("change", [
+    lambda c: c.pop("stage_time"),
+    lambda c: c["total_time"].update(minutes=60),
+    lambda c: c["short_break"].update(seconds="10"),
+    lambda c: c["random_reminder"].update(min=True),
+    lambda c: c["random_reminder"].update(min=10, max=5),
+    lambda c: c["random_reminder"].update(distribution="gauss"),
+    lambda c: c["random_reminder"].update(jitter=-1),
+    lambda c: c["sounds"].update(random="ding.mp3"),
+    lambda c: c["sounds"].update(random=[1]),
+    lambda c: c.update(plan=[{"phase": "stage"}]),
+    lambda c: c.update(version=SCHEMA_VERSION + 1),
+    lambda c: c.update(version="1"),
+    lambda c: c.update(audio_target_db=-60),
+    lambda c: c.update(audio_target_db=True),
+])
+def test_validate_rejects(change):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    change(config)
+    with pytest.raises(ConfigError):
+        validate(config)
+
+
+def test_old_config_is_migrated():
+    config = parse_config(json.dumps({"total_time": {"hours": 2, "minutes": 0, "seconds": 0}}))
+    assert config["version"] == SCHEMA_VERSION
+    assert config["total_time"]["hours"] == 2
+    assert config["stage_time"] == DEFAULT_CONFIG["stage_time"]
+    with pytest.raises(ConfigError):
+        parse_config(json.dumps(dict(DEFAULT_CONFIG, version=SCHEMA_VERSION + 1)))
+
+
+def test_merge_config_updates_known_keys_only():
+    merged = merge_config(DEFAULT_CONFIG, {"random_reminder": {"min": 3}, "audio_cache_mb": 16})
+    assert merged["random_reminder"] == {"min": 3, "max": 10}
+    assert merged["audio_cache_mb"] == 16
+    assert DEFAULT_CONFIG["random_reminder"]["min"] == 5  # 原配置不变
+    for changes in ({"version": 99}, {"colour": "red"}, {"random_reminder": {"min": 20}}, ["total_time"]):
+        with pytest.raises(ConfigError):
+            merge_config(DEFAULT_CONFIG, changes)
+
+
+def test_write_atomic_uses_target_name_for_temp_file(tmp_path, monkeypatch):
+    prefixes = []
+    mkstemp = tempfile.mkstemp
+
+    def recording_mkstemp(**kwargs):
+        prefixes.append(kwargs["prefix"])
+        return mkstemp(**kwargs)
+
+    monkeypatch.setattr(tempfile, "mkstemp", recording_mkstemp)
+    target = tmp_path / "session.journal"
+    write_atomic(str(target), "内容")
+    assert target.read_text(encoding="utf-8") == "内容"
+    assert prefixes == [".session.journal-"]
+
+
+def test_write_atomic_failure_keeps_original(tmp_path, monkeypatch):
+    target = tmp_path / "config.json"
+    target.write_text("old", encoding="utf-8")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_atomic(str(target), "new")
+    assert target.read_text(encoding="utf-8") == "old"
+    assert os.listdir(tmp_path) == ["config.json"]
+
+
+def test_config_store_debounces_and_skips_unchanged(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(config_store, "write_atomic", lambda path, text: writes.append(text))
+    store = ConfigStore(str(tmp_path / "config.json"), delay=60)
+    for minutes in (1, 2, 3):
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config["stage_time"]["minutes"] = minutes
+        store.save(config)
+    store.flush()
+    assert len(writes) == 1 and json.loads(writes[0])["stage_time"]["minutes"] == 3
+    store.save(config)
+    store.flush()
+    assert len(writes) == 1  # 内容与上次写入相同
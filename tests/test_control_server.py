@@ -0,0 +1,99 @@
+"""
+本地控制接口：Host 校验（防 DNS 重绑定）、写操作必须是 JSON、命令在拥有者线程中执行、事件推送。
+"""
+import http.client
+import json
+import threading
+
+import pytest
+
+from control_server import ControlServer
+
+
+@pytest.fixture
+def server():
+    server = ControlServer(port=0)
+    server.start()
+    calls = []
+    stop = threading.Event()
+
+    def handler(command, payload):
+        calls.append((command, payload, threading.current_thread()))
+        if command == "config" and "bad" in payload:
+            raise ValueError("配置无效")
+        return {"command": command}
+
+    def owner():
+        while not stop.wait(0.01):
+            server.process_commands(handler)
+
+    thread = threading.Thread(target=owner, daemon=True)
+    thread.start()
+    server.calls = calls
+    server.owner = thread
+    yield server
+    stop.set()
+    thread.join()
+    server.stop()
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.address, timeout=5)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        connection.close()
+
+
+JSON = {"Content-Type": "application/json"}
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/state"), ("POST", "/start"), ("PUT", "/config")])
+def test_foreign_host_is_rejected(server, method, path):
+    headers = dict(JSON, Host=f"attacker.example:{server.address[1]}")
+    status, body = request(server, method, path, "{}", headers)
+    assert status == 403 and "error" in body
+    assert server.calls == []
+
+
+def test_localhost_names_are_accepted(server):
+    port = server.address[1]
+    assert request(server, "GET", "/state", headers={"Host": f"localhost:{port}"})[0] == 200
+    assert request(server, "GET", "/state")[0] == 200  # http.client 默认 Host 为 127.0.0.1:<端口>
+
+
+def test_write_requires_json(server):
+    status, _ = request(server, "POST", "/start", "", {"Content-Type": "text/plain"})
+    assert status == 415
+    assert server.calls == []
+
+
+def test_command_runs_on_owner_thread(server):
+    status, body = request(server, "POST", "/pause", "", JSON)
+    assert (status, body) == (200, {"command": "pause"})
+    command, payload, thread = server.calls[0]
+    assert command == "pause" and payload is None and thread is server.owner
+
+
+def test_config_payload_and_errors(server):
+    assert request(server, "PUT", "/config", '{"audio_cache_mb": 32}', JSON)[0] == 200
+    assert server.calls[-1][1] == {"audio_cache_mb": 32}
+    assert request(server, "PUT", "/config", "[1]", JSON)[0] == 400
+    assert request(server, "PUT", "/config", '{"bad": 1}', JSON)[0] == 400
+    assert request(server, "POST", "/unknown", "", JSON)[0] == 404
+
+
+def test_events_stream_receives_broadcast(server):
+    server.broadcast({"phase": "stage"})
+    connection = http.client.HTTPConnection(*server.address, timeout=5)
+    try:
+        connection.request("GET", "/events?format=ndjson")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.readline()) == {"phase": "stage"}  # 订阅时先收到最近的状态
+        server.broadcast({"phase": "short_break"})
+        assert json.loads(response.readline()) == {"phase": "short_break"}
+    finally:
+        connection.close()
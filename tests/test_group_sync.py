@@ -0,0 +1,26 @@
+"""
+小组同步：按往返延迟最小的样本估计时钟偏移，以及通过本地传输与协调者同步。
+"""
+import time
+
+import pytest
+
+from group_sync import GroupClient, GroupCoordinator, LocalTransport, estimate_offset
+
+
+def test_estimate_offset_prefers_lowest_delay():
+    # 协调者时钟快 5 秒；第二个样本去程排队 0.2 秒
+    samples = [(0.0, 5.01, 5.01, 0.02), (1.0, 6.21, 6.21, 1.22)]
+    offset, delay = estimate_offset(samples)
+    assert offset == pytest.approx(5.0)
+    assert delay == pytest.approx(0.02)
+
+
+def test_sync_with_local_transport():
+    coordinator = GroupCoordinator(lambda: None, clock=lambda: time.monotonic() + 5.0)
+    client = GroupClient(LocalTransport(coordinator, delay=0.002, jitter=0.002, seed=1))
+    offset, delay = client.sync()
+    assert offset == pytest.approx(5.0, abs=0.01)
+    assert delay >= 0.004
+    assert client.coordinator_time() == pytest.approx(time.monotonic() + 5.0, abs=0.01)
+    assert client.fetch() is None
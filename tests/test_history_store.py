@@ -0,0 +1,98 @@
+"""
+会话历史：批量写入后按天、按周、按方案的汇总，统计页面数据和连续天数，以及数据库结构版本。
+"""
+import datetime
+import sqlite3
+
+import pytest
+
+from history_store import SCHEMA_VERSION, HistoryStore, best_streak, current_streak
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), flush_interval=0.01)
+    store.start()
+    yield store
+    store.close()
+
+
+def test_schema_version(tmp_path):
+    path = str(tmp_path / "history.db")
+    HistoryStore(path).close()
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+        assert "focus" in columns
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(hour_counts)")]
+        assert columns[:2] == ["day", "hour"]
+    finally:
+        conn.close()
+
+
+def test_daily_weekly_and_profile_rollups(store):
+    today = datetime.date.today()
+    first = store.begin_session(seed=1, profile="数学")
+    store.record(first, "started", 0)
+    store.record(first, "random", 300)
+    store.record(first, "random", 700)
+    store.end_session(first, 3600, completed=True, focus=3000)
+    second = store.begin_session(seed=2)
+    store.record(second, "random", 400)
+    store.end_session(second, 600, completed=False)
+    store.end_session(second, 900, completed=True)  # 重复结束被忽略
+    store.flush()
+
+    day = store.daily(today, today)[today.isoformat()]
+    assert (day["sessions"], day["seconds"], day["completed"]) == (2, 4200, 1)
+    assert day["random"] == 3 and day["started"] == 1 and day["reset"] == 0
+
+    monday = today - datetime.timedelta(days=today.weekday())
+    assert store.weekly(today, today)[monday.isoformat()]["sessions"] == 2
+
+    profiles = store.per_profile(today, today)
+    assert profiles["数学"]["random"] == 2 and profiles["数学"]["seconds"] == 3600
+    assert profiles["default"]["random"] == 1 and profiles["default"]["completed"] == 0
+
+    assert store.daily(today, today, profile="数学")[today.isoformat()]["sessions"] == 1
+    yesterday = today - datetime.timedelta(days=1)
+    assert store.daily(yesterday, yesterday) == {}
+
+
+def run_session(store, monkeypatch, when, focus, reminders=1, profile="default"):
+    """在 when（datetime）记录一个会话"""
+    monkeypatch.setattr("history_store.time.time", lambda: when.timestamp())
+    session = store.begin_session(seed=1, profile=profile)
+    for _ in range(reminders):
+        store.record(session, "random", 60)
+    store.end_session(session, focus + 600, completed=True, focus=focus)
+    monkeypatch.undo()
+
+
+def test_dashboard_focus_hours_and_range(store, monkeypatch):
+    today = datetime.date.today()
+    at = lambda days_ago, hour: datetime.datetime.combine(today - datetime.timedelta(days=days_ago), datetime.time(hour))
+    run_session(store, monkeypatch, at(0, 9), focus=1800, reminders=2)
+    run_session(store, monkeypatch, at(1, 21), focus=1200, reminders=3)
+    run_session(store, monkeypatch, at(10, 9), focus=600, reminders=5)  # 不在最近 7 天内
+    store.flush()
+
+    data = store.dashboard(7)
+    assert data["first_day"] == (today - datetime.timedelta(days=6)).isoformat()
+    assert data["focus"][-1] == 1800 and data["focus"][-2] == 1200  # 只计专注秒数，不含休息
+    assert sum(data["focus"]) == 3000
+    assert data["hourly"][9] == 2 and data["hourly"][21] == 3
+    assert data["streak"] == 2 and data["best_streak"] == 2
+
+    assert store.dashboard(30)["hourly"][9] == 7
+    assert store.dashboard(7, profile="其他")["focus"] == [0] * 7
+
+
+def test_streaks():
+    assert current_streak([], 100) == 0
+    assert current_streak([98, 99, 100], 100) == 3
+    assert current_streak([98, 99], 100) == 2      # 今天还没计时，截至昨天
+    assert current_streak([97, 98], 100) == 0
+    assert best_streak([1, 2, 3, 10, 11]) == 3
+    assert best_streak([5]) == 1
@@ -0,0 +1,75 @@
+"""
+提醒输出端：命令参数的占位符替换，以及出错的输出端不会中断无界面运行。
+"""
+import copy
+import subprocess
+
+from config_store import DEFAULT_CONFIG, validate
+from headless import HeadlessRunner
+from notify_sinks import CommandSink
+from timer_engine import build_timeline
+
+EVENT = {"event": "random", "phase": "short_break", "offset": 300.0, "total_left": 100.0}
+
+
+def run_command(monkeypatch, command, event=EVENT):
+    calls = []
+    monkeypatch.setattr(subprocess, "Popen", lambda args, **kwargs: calls.append(args))
+    CommandSink(command).emit(event)
+    return calls[0]
+
+
+def test_placeholders_are_replaced(monkeypatch):
+    args = run_command(monkeypatch, "notify-send 计时器 {event} {phase}")
+    assert args == ["notify-send", "计时器", "random", "short_break"]
+
+
+def test_missing_field_becomes_empty(monkeypatch):
+    args = run_command(monkeypatch, "sh -c 'echo {file}'")
+    assert args == ["sh", "-c", "echo "]
+    args = run_command(monkeypatch, "sh -c 'echo {file}'", dict(EVENT, file="ding.mp3"))
+    assert args == ["sh", "-c", "echo ding.mp3"]
+
+
+def test_literal_braces_are_kept(monkeypatch):
+    assert run_command(monkeypatch, "awk 'BEGIN{print 1}'") == ["awk", "BEGIN{print 1}"]
+    assert run_command(monkeypatch, "echo {unknown} {{event}}") == ["echo", "{unknown}", "{event}"]
+
+
+class BrokenSink:
+    def __init__(self):
+        self.calls = 0
+
+    def emit(self, event):
+        self.calls += 1
+        raise KeyError("file")
+
+    def close(self):
+        pass
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event["event"])
+
+    def close(self):
+        pass
+
+
+def test_failing_sink_does_not_stop_the_run(capsys):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": 2, "minutes": 0, "seconds": 0}
+    timeline = build_timeline(validate(config), seed=1)
+    now = [0.0]
+
+    def wait(timeout):
+        now[0] += timeout  # 虚拟时钟：直接跳到下一个截止点
+
+    broken, good = BrokenSink(), ListSink()
+    HeadlessRunner(timeline, [broken, good], clock=lambda: now[0], wait=wait).run(0.0)
+    assert good.events[0] == "start" and good.events[-1] == "total_end"
+    assert broken.calls == len(good.events)
+    assert capsys.readouterr().err.count("BrokenSink") == 1
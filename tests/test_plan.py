@@ -0,0 +1,60 @@
+"""
+学习计划：循环按顺序展开、计划时间线的总时长、展开数量上限和无效计划。
+"""
+import copy
+
+import pytest
+
+from config_store import DEFAULT_CONFIG, validate
+from plan import MAX_PHASES, PlanError, expand_plan
+from timer_engine import build_timeline
+
+
+def make_config(**changes):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": 3, "minutes": 0, "seconds": 0}
+    config["stage_time"] = {"hours": 0, "minutes": 50, "seconds": 0}
+    config.update(changes)
+    return validate(config)
+
+
+def stage(minutes, **extra):
+    return dict({"phase": "stage", "duration": {"minutes": minutes}}, **extra)
+
+
+def rest(minutes):
+    return {"phase": "break", "duration": {"minutes": minutes}}
+
+
+def test_plan_loops_expand_in_order():
+    plan = [stage(90), {"repeat": 2, "phases": [stage(50), {"repeat": 2, "phases": [rest(5)]}]}, rest(60)]
+    minutes = [phase["duration"]["minutes"] for phase in expand_plan(plan)]
+    assert minutes == [90, 50, 5, 5, 50, 5, 5, 60]
+
+
+def test_plan_timeline_total_is_sum_of_phases():
+    config = make_config(plan=[{"repeat": 3, "phases": [stage(25, reminder=None), rest(5)]}])
+    timeline = build_timeline(config, seed=1)
+    assert timeline.total_duration == 3 * 30 * 60
+    assert [timeline.entry(i)[1] for i in range(len(timeline))] == ["stage", "stage_break"] * 3 + ["finished"]
+
+
+def test_plan_expansion_limit():
+    assert len(expand_plan([{"repeat": MAX_PHASES, "phases": [rest(1)]}])) == MAX_PHASES
+    with pytest.raises(PlanError):
+        expand_plan([{"repeat": MAX_PHASES + 1, "phases": [rest(1)]}])
+    with pytest.raises(PlanError):
+        expand_plan([{"repeat": 1000, "phases": [{"repeat": 1000, "phases": [rest(1)]}]}])
+
+
+@pytest.mark.parametrize("plan", [
+    [],
+    [{"repeat": 0, "phases": [rest(1)]}],
+    [{"phase": "nap", "duration": {"minutes": 1}}],
+    [{"phase": "stage", "duration": {"minutes": 0}}],
+    [stage(10, sounds={"random": "ding.mp3"})],
+    [stage(10, reminder={"min": 5, "max": 3})],
+])
+def test_invalid_plan(plan):
+    with pytest.raises(PlanError):
+        expand_plan(plan)
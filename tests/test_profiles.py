@@ -0,0 +1,93 @@
+"""
+配置方案：保存和删除、切换时替换配置项、导入导出、防抖记录当前方案。
+"""
+import copy
+import json
+
+import pytest
+
+from config_store import DEFAULT_CONFIG, ConfigError
+from profiles import ProfileStore, apply_profile
+
+
+def make_config(hours, **changes):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": hours, "minutes": 0, "seconds": 0}
+    config.update(changes)
+    return config
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_put_reload_and_delete(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    store = ProfileStore(path)
+    store.put(" 深度工作 ", make_config(4))
+    store.put("考试复习", make_config(2))
+    assert store.names() == ["深度工作", "考试复习"] and store.active == "考试复习"
+    assert "audio_cache_mb" not in store.get("深度工作")  # 只保存方案配置项
+
+    loaded = ProfileStore(path)
+    loaded.load()
+    assert loaded.profiles == store.profiles and loaded.active == "考试复习"
+    loaded.delete("考试复习")
+    assert loaded.active is None and read(path)["profiles"].keys() == {"深度工作"}
+
+
+def test_invalid_profile_is_rejected(tmp_path):
+    store = ProfileStore(str(tmp_path / "profiles.json"))
+    with pytest.raises(ConfigError):
+        store.put("坏方案", make_config(1, random_reminder={"min": 10, "max": 5}))
+    with pytest.raises(ConfigError):
+        store.put("  ", make_config(1))
+    assert store.names() == []
+
+
+def test_apply_profile_replaces_profile_keys():
+    config = make_config(8, plan=[{"minutes": 25}], audio_cache_mb=16)
+    merged = apply_profile(config, {"total_time": {"hours": 1, "minutes": 0, "seconds": 0}})
+    assert merged["total_time"]["hours"] == 1
+    assert "plan" not in merged            # 方案中没有的可选项不保留
+    assert merged["audio_cache_mb"] == 16  # 不属于方案的配置项不变
+    assert config["total_time"]["hours"] == 8
+
+
+def test_export_and_import(tmp_path):
+    source = ProfileStore(str(tmp_path / "a.json"))
+    source.put("甲", make_config(1))
+    source.put("乙", make_config(2))
+    exported = str(tmp_path / "export.json")
+    source.export(exported, ["乙"])
+
+    target = ProfileStore(str(tmp_path / "b.json"))
+    target.put("乙", make_config(5))
+    assert target.import_file(exported) == ["乙"]
+    assert target.get("乙")["total_time"]["hours"] == 2  # 同名方案被覆盖
+
+    single = tmp_path / "晚自习.json"
+    single.write_text(json.dumps(make_config(3)), encoding="utf-8")
+    assert target.import_file(str(single)) == ["晚自习"]
+
+
+def test_newer_version_is_rejected(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"version": 99, "profiles": {}}), encoding="utf-8")
+    with pytest.raises(ConfigError):
+        ProfileStore(str(path)).load()
+
+
+def test_set_active_is_debounced(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    store = ProfileStore(path, delay=60)
+    store.put("甲", make_config(1))
+    store.put("乙", make_config(2))
+    store.set_active("甲")
+    store.set_active("乙")
+    store.set_active("甲")
+    assert read(path)["active"] == "乙"  # 还没有写入
+    store.flush()
+    assert read(path)["active"] == "甲" and store.timer is None
+    store.flush()  # 没有等待中的内容时什么也不做
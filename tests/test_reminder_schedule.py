@@ -0,0 +1,63 @@
+"""
+随机提醒时间表：各分布的间隔范围和均值、种子可复现、阶段末尾留白和无效配置。
+"""
+import pytest
+
+from reminder_schedule import DISTRIBUTIONS, ReminderSchedule
+
+LONG_STAGE = 200 * 3600  # 足够长，统计均值时样本充足
+
+
+def gaps(offsets):
+    return [b - a for a, b in zip([0] + offsets, offsets)]
+
+
+def schedule(seed=1, **reminder):
+    config = {"min": 5, "max": 10}
+    config.update(reminder)
+    return ReminderSchedule(config, seed)
+
+
+def test_uniform_gaps_within_range():
+    intervals = gaps(schedule().stage_offsets(LONG_STAGE))
+    assert min(intervals) >= 300 and max(intervals) <= 600
+    assert 430 < sum(intervals) / len(intervals) < 470
+
+
+def test_poisson_gaps_have_minimum_and_mean():
+    intervals = gaps(schedule(distribution="poisson").stage_offsets(LONG_STAGE))
+    assert min(intervals) >= 300
+    assert max(intervals) > 600  # 指数分布的尾部可以超出 max
+    assert 420 < sum(intervals) / len(intervals) < 480
+
+
+def test_jittered_gaps_around_midpoint():
+    intervals = gaps(schedule(distribution="jittered", jitter=20).stage_offsets(LONG_STAGE))
+    assert min(intervals) >= 430 and max(intervals) <= 470
+
+
+@pytest.mark.parametrize("distribution", sorted(DISTRIBUTIONS))
+def test_same_seed_same_offsets(distribution):
+    first = schedule(seed=42, distribution=distribution).stage_offsets(3600)
+    assert first == schedule(seed=42, distribution=distribution).stage_offsets(3600)
+    assert first != schedule(seed=43, distribution=distribution).stage_offsets(3600)
+    assert first == sorted(first) and all(0 < offset < 3600 for offset in first)
+
+
+def test_min_gap_before_end():
+    offsets = schedule(min_gap_before_end=900).stage_offsets(3600)
+    assert offsets and max(offsets) < 3600 - 900
+
+
+def test_stage_shorter_than_minimum_has_no_reminders():
+    assert schedule().stage_offsets(299) == []
+
+
+@pytest.mark.parametrize("reminder", [
+    {"min": 5, "max": 10, "distribution": "gaussian"},
+    {"min": 0, "max": 10},
+    {"min": 10, "max": 5},
+])
+def test_invalid_config(reminder):
+    with pytest.raises(ValueError):
+        ReminderSchedule(reminder)
@@ -0,0 +1,98 @@
+"""
+多会话宿主：start 事件在宿主线程中发出、到期事件按截止时间推进、卡顿后只补发及时的事件、暂停和恢复。
+"""
+import copy
+import threading
+
+from config_store import DEFAULT_CONFIG, validate
+from session_host import SessionHost
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_config():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": 1, "minutes": 0, "seconds": 0}
+    config["stage_time"] = {"hours": 0, "minutes": 20, "seconds": 0}
+    return validate(config)
+
+
+def flush(host, due):
+    for session, events in due:
+        for event in events:
+            host.emit(session, *event)
+
+
+def test_start_event_is_emitted_on_host_thread():
+    threads, done = [], threading.Event()
+
+    def on_event(event):
+        threads.append((event["event"], threading.current_thread()))
+        done.set()
+
+    host = SessionHost()
+    host.add("a", make_config(), seed=1, on_event=on_event)
+    assert threads == []  # add() 不在调用者线程中发出事件
+    host.start()
+    try:
+        assert done.wait(5)
+    finally:
+        host.stop()
+    assert threads[0][0] == "start" and threads[0][1] is not threading.current_thread()
+
+
+def test_pop_due_advances_each_session():
+    clock = FakeClock()
+    host = SessionHost(clock)
+    received = []
+    host.add("a", make_config(), seed=1, on_event=received.append)
+    clock.now += 1
+    host.add("b", make_config(), seed=1, on_event=received.append)  # 同一时间线，晚一秒开始
+    session = host.sessions["a"]
+    timeline = session.timeline
+    clock.now = session.start + timeline.next_offset(0)
+    flush(host, host.pop_due())
+    assert [event["session"] for event in received] == ["a"]
+    assert received[0]["offset"] == timeline.next_offset(0)
+    assert host.pop_due() == []
+
+
+def test_pop_due_catches_up_after_stall():
+    clock = FakeClock()
+    host = SessionHost(clock)
+    received = []
+    host.add("a", make_config(), seed=1, on_event=received.append)
+    clock.now += 40 * 60  # 线程卡住了 40 分钟
+    flush(host, host.pop_due())
+    assert len(received) == 1  # 错过的提醒不会一次性全部响起
+    assert received[0]["offset"] <= 40 * 60
+
+
+def test_paused_session_is_not_due_until_resumed():
+    clock = FakeClock()
+    host = SessionHost(clock)
+    received = []
+    host.add("a", make_config(), seed=1, on_event=received.append)
+    first = host.sessions["a"].timeline.next_offset(0)
+    host.pause("a")
+    clock.now += first + 60
+    assert host.pop_due() == []
+    host.resume("a")
+    clock.now += first
+    flush(host, host.pop_due())
+    assert [event["offset"] for event in received] == [first]
+
+
+def test_finished_session_is_removed():
+    clock = FakeClock()
+    host = SessionHost(clock)
+    host.add("a", make_config(), seed=1)
+    clock.now += 3600
+    host.pop_due()
+    assert len(host) == 0
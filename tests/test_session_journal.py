@@ -0,0 +1,61 @@
+"""
+会话日志：检查点节流、崩溃后从最后一个完整检查点恢复、日志压缩和正常结束。
+"""
+import os
+
+from session_journal import SessionJournal
+
+CONFIG = {"total_time": {"hours": 1}}
+
+
+def test_recover_returns_last_checkpoint(tmp_path):
+    path = str(tmp_path / "session.journal")
+    journal = SessionJournal(path, interval=3600)
+    journal.begin(CONFIG, seed=7, session=123)
+    journal.checkpoint(10.0)                    # 间隔内的普通检查点被节流
+    journal.checkpoint(20.0, boundary=True)
+    journal.checkpoint(25.5, paused=True, boundary=True)
+    recovered = SessionJournal.recover(path)
+    assert recovered["config"] == CONFIG and recovered["seed"] == 7 and recovered["session"] == 123
+    assert recovered["elapsed"] == 25.5 and recovered["paused"] is True
+    with open(path, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 4  # 头 + 初始检查点 + 两个阶段切换
+
+
+def test_partial_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / "session.journal")
+    journal = SessionJournal(path)
+    journal.begin(CONFIG, seed=1, elapsed=5.0)
+    journal.checkpoint(42.0, boundary=True)
+    journal.close_file()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "checkpoint", "elap')  # 崩溃时写了一半
+    assert SessionJournal.recover(path)["elapsed"] == 42.0
+
+
+def test_missing_or_corrupt_journal(tmp_path):
+    path = str(tmp_path / "session.journal")
+    assert SessionJournal.recover(path) is None
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("not json\n")
+    assert SessionJournal.recover(path) is None
+
+
+def test_large_journal_is_compacted(tmp_path):
+    path = str(tmp_path / "session.journal")
+    journal = SessionJournal(path, max_bytes=1024)
+    journal.begin(CONFIG, seed=1)
+    for second in range(200):
+        journal.checkpoint(float(second), boundary=True)
+    assert os.path.getsize(path) < 2048
+    assert SessionJournal.recover(path)["elapsed"] == 199.0
+
+
+def test_finish_removes_journal(tmp_path):
+    path = str(tmp_path / "session.journal")
+    journal = SessionJournal(path)
+    journal.begin(CONFIG, seed=1)
+    journal.finish()
+    assert not os.path.exists(path)
+    journal.checkpoint(1.0, boundary=True)  # 结束后的检查点被忽略
+    assert SessionJournal.recover(path) is None
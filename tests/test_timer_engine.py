@@ -0,0 +1,85 @@
+"""
+时间线：顺序、边界查询、短休息冻结阶段计时、专注秒数、随机种子和卡顿补发。
+"""
+import copy
+
+import pytest
+
+from config_store import DEFAULT_CONFIG, validate
+from timer_engine import FINISHED, SHORT_BREAK, STAGE, build_timeline, catch_up
+
+
+def make_config(**changes):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["total_time"] = {"hours": 3, "minutes": 0, "seconds": 0}
+    config["stage_time"] = {"hours": 0, "minutes": 50, "seconds": 0}
+    config.update(changes)
+    return validate(config)
+
+
+def test_timeline_is_ordered_and_bounded():
+    timeline = build_timeline(make_config(), seed=1)
+    offsets = list(timeline.offsets)
+    assert offsets == sorted(offsets)
+    assert timeline.entry(0) == (0, "stage", "start")
+    assert timeline.entry(len(timeline) - 1) == (3 * 3600, "finished", "total_end")
+    assert timeline.phases[-1] == FINISHED
+    assert timeline.next_offset(len(timeline) - 1) is None
+
+
+def test_index_at_boundaries():
+    timeline = build_timeline(make_config(), seed=1)
+    offsets = timeline.offsets
+    assert timeline.index_at(-5) == 0
+    assert timeline.index_at(10 ** 9) == len(timeline) - 1
+    for i in range(len(timeline) - 1):
+        if offsets[i] == offsets[i + 1]:
+            continue
+        # 截止点本身属于新的一项，之前一点仍属于上一项
+        assert timeline.index_at(offsets[i]) == i
+        assert timeline.index_at(offsets[i + 1] - 0.001) == i
+        assert timeline.index_at(offsets[i + 1] - 0.001, hint=i) == i
+
+
+def test_events_between_skips_silent_entries():
+    timeline = build_timeline(make_config(), seed=1)
+    events = timeline.events_between(0, len(timeline) - 1)
+    assert [offset for offset, _, _ in events] == sorted(offset for offset, _, _ in events)
+    assert events[-1][:2] == (3 * 3600, "total_end")
+    assert all(name for _, name, _ in events)
+
+
+def test_stage_left_frozen_during_short_break():
+    timeline = build_timeline(make_config(), seed=1)
+    breaks = [i for i in range(len(timeline)) if timeline.phases[i] == SHORT_BREAK]
+    assert breaks
+    for i in breaks:
+        start, end = timeline.offsets[i], timeline.offsets[i + 1]
+        frozen = timeline.state_at(start).stage_left
+        assert timeline.state_at((start + end) / 2).stage_left == frozen
+        # 短休息结束后从冻结的剩余时间继续倒计时
+        assert timeline.phases[i + 1] == STAGE
+        assert timeline.state_at(end).stage_left == frozen
+        assert timeline.state_at(end + 1).stage_left == pytest.approx(frozen - 1)
+
+
+def test_stage_seconds_excludes_breaks():
+    timeline = build_timeline(make_config(), seed=1)
+    total = timeline.total_duration
+    breaks = sum(timeline.offsets[i + 1] - timeline.offsets[i]
+                 for i in range(len(timeline) - 1) if timeline.phases[i] != STAGE)
+    assert timeline.stage_seconds(total) == pytest.approx(total - breaks)
+    assert timeline.stage_seconds(0) == 0
+
+
+def test_same_seed_same_timeline():
+    config = make_config()
+    assert build_timeline(config, seed=42).entries() == build_timeline(config, seed=42).entries()
+    assert build_timeline(config, seed=42).entries() != build_timeline(config, seed=43).entries()
+
+
+def test_catch_up_keeps_recent_or_last():
+    events = [(10.0, "random", None), (100.0, "start", None), (199.0, "random", None)]
+    assert catch_up(events, 200.0) == [events[2]]
+    assert catch_up(events, 500.0) == [events[2]]
+    assert catch_up([], 500.0) == []
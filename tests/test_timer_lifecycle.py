@@ -0,0 +1,67 @@
+"""
+计时线程生命周期：重新开始时作废旧线程、停止立即唤醒等待、旧线程结束不影响新会话。
+"""
+import threading
+
+from timer_lifecycle import TimerLifecycle
+
+
+def waiting_worker(started, finished):
+    def target(token):
+        started.set()
+        while token.wait(30):
+            pass
+        finished.append(token.generation)
+    return target
+
+
+def test_restart_cancels_previous_worker():
+    lifecycle = TimerLifecycle()
+    started, finished = threading.Event(), []
+    first = lifecycle.start(waiting_worker(started, finished))
+    assert started.wait(5)
+    old_thread = lifecycle.thread
+    second = lifecycle.start(lambda token: None)
+    old_thread.join(5)
+    assert not old_thread.is_alive() and finished == [1]  # 旧线程在 30 秒等待中被立即唤醒
+    assert not lifecycle.is_current(first) and lifecycle.is_current(second)
+    assert second.generation == 2
+
+
+def test_stop_wakes_worker():
+    lifecycle = TimerLifecycle()
+    started, finished = threading.Event(), []
+    token = lifecycle.start(waiting_worker(started, finished))
+    assert started.wait(5)
+    lifecycle.stop()
+    lifecycle.join(5)
+    assert finished == [1] and not token.active and lifecycle.token is None
+
+
+def test_wake_keeps_token_active():
+    lifecycle = TimerLifecycle()
+    woke = []
+    ready, release = threading.Event(), threading.Event()
+
+    def target(token):
+        ready.set()
+        woke.append(token.wait(30))
+        release.wait(5)
+
+    token = lifecycle.start(target)
+    assert ready.wait(5)
+    lifecycle.wake()
+    release.set()
+    lifecycle.join(5)
+    assert woke == [True] and lifecycle.is_current(token)
+
+
+def test_release_only_affects_own_generation():
+    lifecycle = TimerLifecycle()
+    old = lifecycle.start(lambda token: None)
+    new = lifecycle.start(lambda token: None)
+    lifecycle.release(old)  # 旧线程结束得晚，不能作废新会话
+    assert lifecycle.is_current(new)
+    lifecycle.release(new)
+    assert not new.active and lifecycle.token is None
+    lifecycle.join(5)
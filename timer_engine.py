@@ -0,0 +1,244 @@
+"""
+计时引擎：不依赖任何界面，根据 config.json 的结构和随机种子预先生成整个会话的时间线。
+
+时间线是按开始偏移排序的数组，每一项为 (开始偏移秒, 阶段, 提示音事件)。
+界面、命令行和测试都通过 Timeline.state_at(t) 查询任意时刻的状态，
+不再需要每秒修改计时变量。
+
+配置中有 "plan"（见 plan.py）时按计划逐个阶段编译，否则按固定的
+阶段 → 短休息 → 阶段休息 循环生成；两者生成的时间线结构相同，计时时的开销与计划的复杂程度无关。
+"""
+import random
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+from plan import expand_plan
+from reminder_schedule import ReminderSchedule
+
+# 阶段编号（数组中存储编号，对外使用名称）
+STAGE, SHORT_BREAK, STAGE_BREAK, FINISHED = range(4)
+PHASES = ("stage", "short_break", "stage_break", "finished")
+
+# 提示音事件编号，0 表示该项不播放提示音
+SOUND_EVENTS = ("", "start", "random", "stage_break_start", "total_end")
+_SOUND_CODES = {name: code for code, name in enumerate(SOUND_EVENTS)}
+
+# 追赶宽限（秒）：唤醒时晚于截止点超过此值的提示音视为过期
+CATCH_UP_GRACE = 2.0
+
+# 某一时刻的会话状态，时间单位均为秒（浮点数），进度为 0-100
+SessionState = namedtuple(
+    "SessionState",
+    "index phase total_left stage_left break_left total_progress phase_progress",
+)
+
+
+def hms_to_seconds(value):
+    """将 {"hours", "minutes", "seconds"} 形式的配置转换为秒数，缺省的键按 0 处理"""
+    return value.get("hours", 0) * 3600 + value.get("minutes", 0) * 60 + value.get("seconds", 0)
+
+
+class Timeline:
+    """预先计算好的会话时间线"""
+
+    def __init__(self, total_duration, stage_duration):
+        self.total_duration = total_duration
+        self.stage_duration = stage_duration
+        self.offsets = array("d")      # 每一项的开始偏移（秒）
+        self.phases = array("b")       # 阶段编号
+        self.sounds = array("b")       # 提示音事件编号
+        self.stage_left = array("d")   # 该项开始时阶段计时的剩余秒数
+        self.stage_length = array("d") # 该项所在阶段的总时长
+        self.files = []                # 计划中单独指定的提示音（文件名或文件名列表），未指定为 None
+
+    def append(self, offset, phase, sound, stage_left, stage_length=None, sound_file=None):
+        """追加一项，offset 必须不小于上一项"""
+        self.offsets.append(offset)
+        self.phases.append(phase)
+        self.sounds.append(_SOUND_CODES[sound])
+        self.stage_left.append(stage_left)
+        self.stage_length.append(self.stage_duration if stage_length is None else stage_length)
+        self.files.append(sound_file)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def entry(self, index):
+        """返回第 index 项的 (开始偏移, 阶段名称, 提示音事件)"""
+        return self.offsets[index], PHASES[self.phases[index]], SOUND_EVENTS[self.sounds[index]]
+
+    def entries(self):
+        """按顺序返回所有项"""
+        return [self.entry(i) for i in range(len(self))]
+
+    def index_at(self, t, hint=None):
+        """返回时刻 t 所在项的下标；hint 命中时为常数时间，否则二分查找"""
+        offsets = self.offsets
+        if hint is not None and 0 <= hint < len(offsets) and offsets[hint] <= t:
+            if hint + 1 == len(offsets) or t < offsets[hint + 1]:
+                return hint
+            if hint + 2 == len(offsets) or t < offsets[hint + 2]:
+                return hint + 1
+        return max(bisect_right(offsets, t) - 1, 0)
+
+    def next_offset(self, index):
+        """返回下一项的开始偏移，已是最后一项时返回 None"""
+        if index + 1 < len(self.offsets):
+            return self.offsets[index + 1]
+        return None
+
+    def sound_file(self, index):
+        """第 index 项单独指定的提示音，未指定时返回 None（使用配置中的提示音）"""
+        return self.files[index]
+
+    def events_between(self, start_index, end_index):
+        """返回下标 (start_index, end_index] 之间需要播放的 [(偏移, 提示音事件, 指定的提示音)]"""
+        return [
+            (self.offsets[i], SOUND_EVENTS[self.sounds[i]], self.files[i])
+            for i in range(start_index + 1, end_index + 1)
+            if self.sounds[i]
+        ]
+
+    def stage_seconds(self, t):
+        """时刻 t 之前处于计时阶段的总秒数（不含短休息和阶段休息），用于统计专注时长"""
+        t = min(max(t, 0.0), self.total_duration)
+        offsets = self.offsets
+        total = 0.0
+        for i in range(self.index_at(t) + 1):
+            if self.phases[i] == STAGE:
+                end = offsets[i + 1] if i + 1 < len(offsets) else offsets[i]
+                total += min(end, t) - offsets[i]
+        return total
+
+    def state_at(self, t, hint=None):
+        """查询时刻 t（会话开始后的秒数）的状态"""
+        t = min(max(t, 0.0), self.total_duration)
+        i = self.index_at(t, hint)
+        phase = self.phases[i]
+        start = self.offsets[i]
+        end = self.offsets[i + 1] if i + 1 < len(self.offsets) else start
+
+        stage_left = 0.0
+        break_left = 0.0
+        if phase == STAGE:
+            stage_left = self.stage_left[i] - (t - start)
+        elif phase == SHORT_BREAK:
+            # 短休息期间阶段计时冻结
+            stage_left = self.stage_left[i]
+            break_left = end - t
+        elif phase == STAGE_BREAK:
+            break_left = end - t
+
+        if phase == STAGE:
+            stage_length = self.stage_length[i]
+            phase_progress = (stage_length - stage_left) / stage_length * 100
+        elif phase != FINISHED and end > start:
+            phase_progress = (t - start) / (end - start) * 100
+        else:
+            phase_progress = 0.0
+
+        return SessionState(
+            index=i,
+            phase=PHASES[phase],
+            total_left=self.total_duration - t,
+            stage_left=stage_left,
+            break_left=break_left,
+            total_progress=t / self.total_duration * 100,
+            phase_progress=phase_progress,
+        )
+
+
+def catch_up(events, elapsed, grace=CATCH_UP_GRACE):
+    """卡顿、休眠或中途加入后一次性到期的事件中只保留仍然“及时”的；全部过期时只保留最后一个（当前阶段）"""
+    recent = [event for event in events if elapsed - event[0] <= grace]
+    if not recent and events:
+        recent = [events[-1]]
+    return recent
+
+
+def build_timeline(config, seed=None):
+    """根据配置和随机种子生成整个会话的时间线"""
+    if config.get("plan"):
+        return build_plan_timeline(config, seed)
+
+    total = hms_to_seconds(config["total_time"])
+    stage = hms_to_seconds(config["stage_time"])
+    short_break = hms_to_seconds(config["short_break"])
+    stage_break = hms_to_seconds(config["stage_break"])
+
+    if total <= 0 or stage <= 0:
+        raise ValueError("总时间和阶段时间必须大于0")
+
+    schedule = ReminderSchedule(config["random_reminder"], seed)
+    timeline = Timeline(total, stage)
+    timeline.append(0, STAGE, "start", stage)
+    _fill_stages(timeline, schedule, total, stage, short_break, stage_break)
+    # 总计时结束优先于同时到期的阶段切换
+    timeline.append(total, FINISHED, "total_end", 0)
+    return timeline
+
+
+def _fill_stages(timeline, schedule, total, stage, short_break, stage_break):
+    """依次生成各阶段：阶段内的提醒 → 短休息，阶段结束 → 阶段休息，直到总时间用完"""
+    t = 0
+    while True:
+        previous = 0
+        for reminder in schedule.stage_offsets(stage):
+            # 随机提醒 → 短休息，结束后继续本阶段剩余时间
+            t += reminder - previous
+            previous = reminder
+            if t >= total:
+                return
+            timeline.append(t, SHORT_BREAK, "random", stage - reminder)
+            t += short_break
+            if t >= total:
+                return
+            timeline.append(t, STAGE, "start", stage - reminder)
+
+        # 阶段结束 → 阶段休息 → 新阶段
+        t += stage - previous
+        if t >= total:
+            return
+        timeline.append(t, STAGE_BREAK, "stage_break_start", 0)
+        t += stage_break
+        if t >= total:
+            return
+        timeline.append(t, STAGE, "start", stage)
+
+
+def build_plan_timeline(config, seed=None):
+    """按计划编译时间线：逐个阶段生成，总时长为各阶段（含短休息）之和"""
+    phases = expand_plan(config["plan"])
+    # 每个阶段的提醒使用从会话种子派生的独立种子，同一种子得到同一时间线
+    rng = random.Random(seed)
+    timeline = Timeline(0, 1)
+    t = 0
+    for phase in phases:
+        length = hms_to_seconds(phase["duration"])
+        sounds = phase.get("sounds", {})
+        if phase["phase"] == "break":
+            timeline.append(t, STAGE_BREAK, "stage_break_start", 0, length, sounds.get("stage_break_start"))
+            t += length
+            continue
+
+        timeline.append(t, STAGE, "start", length, length, sounds.get("start"))
+        reminder = phase.get("reminder", config["random_reminder"])
+        short_break = hms_to_seconds(phase.get("short_break", config["short_break"]))
+        previous = 0
+        if reminder is not None:
+            schedule = ReminderSchedule(reminder, rng.getrandbits(64))
+            for offset in schedule.stage_offsets(length):
+                t += offset - previous
+                previous = offset
+                timeline.append(t, SHORT_BREAK, "random", length - offset, length, sounds.get("random"))
+                t += short_break
+                timeline.append(t, STAGE, "start", length - offset, length, sounds.get("start"))
+        t += length - previous
+
+    if t <= 0:
+        raise ValueError("计划的总时长必须大于0")
+    timeline.total_duration = t
+    timeline.stage_duration = max(timeline.stage_length)
+    timeline.append(t, FINISHED, "total_end", 0, 0)
+    return timeline
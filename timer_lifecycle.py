@@ -0,0 +1,86 @@
+"""
+计时线程的生命周期：每个会话只有一个工作线程，由一个递增的代号（generation）标识。
+
+- start() 先作废当前代号，再为新会话创建新的代号和线程，旧线程即使还没退出也不会再推进计时；
+- stop() 作废当前代号并立即唤醒等待中的线程；
+- 工作线程通过自己的 SessionToken 等待（可被暂停/继续/停止立即打断），
+  并在修改共享状态前用 is_current(token) 确认自己仍是当前代号。
+"""
+import threading
+
+
+class SessionToken:
+    """一个会话工作线程的代号和可取消的等待"""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.cancelled = threading.Event()
+        self.wake_event = threading.Event()
+
+    @property
+    def active(self):
+        return not self.cancelled.is_set()
+
+    def wait(self, timeout=None):
+        """等待 timeout 秒（None 为一直等待），被唤醒或取消时立即返回；返回是否仍然有效"""
+        self.wake_event.wait(timeout)
+        self.wake_event.clear()
+        return self.active
+
+    def wake(self):
+        self.wake_event.set()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.wake_event.set()
+
+
+class TimerLifecycle:
+    """会话工作线程的唯一拥有者"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.token = None
+        self.thread = None
+
+    def start(self, target):
+        """作废旧会话并启动新的工作线程 target(token)，返回新代号的 token"""
+        with self.lock:
+            if self.token is not None:
+                self.token.cancel()
+            self.generation += 1
+            token = self.token = SessionToken(self.generation)
+            self.thread = threading.Thread(target=target, args=(token,), daemon=True,
+                                           name=f"timer-{self.generation}")
+            self.thread.start()
+        return token
+
+    def stop(self):
+        """作废当前会话，工作线程在下一次检查时退出（等待中的线程立即被唤醒）"""
+        with self.lock:
+            if self.token is not None:
+                self.token.cancel()
+                self.token = None
+
+    def release(self, token):
+        """工作线程正常结束时调用：只有 token 仍是当前代号时才作废，不影响已开始的新会话"""
+        with self.lock:
+            if self.token is token:
+                token.cancel()
+                self.token = None
+
+    def wake(self):
+        """唤醒当前会话的工作线程（暂停/继续后重新计算下一个截止点）"""
+        with self.lock:
+            if self.token is not None:
+                self.token.wake()
+
+    def is_current(self, token):
+        return token.active and token is self.token
+
+    def join(self, timeout=None):
+        """等待最近启动的工作线程退出"""
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)